@@ -0,0 +1 @@
+"""Performance benchmarks run against local stand-ins for the cloud services."""
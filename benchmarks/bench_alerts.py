@@ -0,0 +1,88 @@
+"""Alert mails: one per job vs immediate alerts plus per-recipient digests
+
+Run from the repository root:
+
+    python -m benchmarks.bench_alerts --recipients 20 --runs 12 --jobs 15 --latency 0.005
+
+Simulates ``--runs`` runs within one digest period, each approving
+``--jobs`` jobs for every one of ``--recipients`` subscribers, with
+scores spread like Agent 4's output (50%+ is IMMEDIATE, the rest BATCH).
+Mails them to a local fake SMTP relay the way the "Send a message" node
+does (one mail and one connection per job) and through AlertDispatcher,
+and counts mails and SMTP connections.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fakes import FakeSMTPServer
+from jobalert.alerts import AlertDispatcher, SmtpMailer
+
+
+def make_deliveries(recipients, runs, jobs, seed):
+    rng = random.Random(seed)
+    all_runs = []
+    for run in range(runs):
+        deliveries = []
+        for recipient in range(recipients):
+            approved = []
+            for index in range(jobs):
+                score = min(95, int(rng.gauss(42, 8)))
+                approved.append({
+                    'title': f"Python Developer #{run}-{index}",
+                    'company': f"Company {index % 17}",
+                    'location': "Remote",
+                    'url': f"https://example.com/jobs/{run}-{recipient}-{index}",
+                    'relevance_score': score,
+                    'alert_type': 'IMMEDIATE' if score >= 50 else 'BATCH',
+                    'ai_summary': "Python, asyncio and APIs."
+                })
+            deliveries.append((f"user{recipient}@example.com", approved))
+        all_runs.append(deliveries)
+    return all_runs
+
+
+def one_per_job(server, runs):
+    mailer = SmtpMailer(server.host, server.port, starttls=False)
+    dispatcher = AlertDispatcher(mailer)
+    for deliveries in runs:
+        for recipient, jobs in deliveries:
+            for job in jobs:
+                # Every job as an immediate mail of its own, each on a fresh connection
+                dispatcher.dispatch([(recipient, [{**job, 'alert_type': 'IMMEDIATE'}])])
+    return mailer
+
+
+def dispatched(server, runs):
+    mailer = SmtpMailer(server.host, server.port, starttls=False)
+    dispatcher = AlertDispatcher(mailer)
+    for deliveries in runs:
+        dispatcher.dispatch(deliveries)
+    dispatcher.send_digests()
+    return mailer
+
+
+def main(args):
+    runs = make_deliveries(args.recipients, args.runs, args.jobs, args.seed)
+    jobs = args.recipients * args.runs * args.jobs
+    immediate = sum(job['alert_type'] == 'IMMEDIATE' for deliveries in runs for _, batch in deliveries for job in batch)
+    print(f"{args.recipients} recipients × {args.runs} runs × {args.jobs} approved jobs = {jobs} alerts "
+          f"({immediate} IMMEDIATE, {jobs - immediate} BATCH)\n")
+    for label, send in (("one mail per job", one_per_job), ("immediate + digest", dispatched)):
+        with FakeSMTPServer(latency=args.latency) as server:
+            started = time.perf_counter()
+            send(server, runs)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<20} {elapsed:7.2f}s  mails={server.requests_served:<6} "
+                  f"SMTP connections={server.connections_opened}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=12)
+    parser.add_argument("--jobs", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated relay latency per message in seconds")
+    parser.add_argument("--seed", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+"""Throughput of the AI analysis stage against a local fake LLM endpoint
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analysis --jobs 64 --latency 0.5
+
+Compares the serial per-job calls of the n8n "AI analyser" node with
+bounded concurrency, token-bucket pacing and batched prompts.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import FakeLLMServer
+from jobalert.pipeline import AnalyzeStage, ParseStage, RunContext, FALLBACK_ANALYSIS
+
+
+def make_jobs(count, ctx):
+    return [
+        {
+            'id': f"bench-job-{index}",
+            'title': f"Senior Python Engineer #{index}",
+            'company': f"Company {index % 13}",
+            'location': 'Remote',
+            'description': "Build asyncio services and REST APIs in Python.",
+            'url': f"https://example.com/jobs/{index}",
+            'source': 'Arbeitnow',
+            'processed_by': ["Agent 1 - Job Scraper"],
+            'agent_chain': "Agent1",
+            'batch_id': ctx.batch_id,
+            'job_index': index
+        }
+        for index in range(count)
+    ]
+
+
+async def measure(label, stage, server, jobs_count):
+    ctx = RunContext()
+    jobs = make_jobs(jobs_count, ctx)
+    calls_before = server.requests_served
+
+    started = time.perf_counter()
+    jobs = await ParseStage().run(await stage.run(jobs, ctx), ctx)
+    elapsed = time.perf_counter() - started
+
+    fallbacks = sum(job['ai_summary'] == FALLBACK_ANALYSIS['summary'] for job in jobs)
+    print(f"{label:<34} {elapsed:7.2f}s  {jobs_count / elapsed:8.1f} jobs/s  "
+          f"llm_calls={server.requests_served - calls_before:<4} fallbacks={fallbacks}")
+
+
+async def main(args):
+    with FakeLLMServer(latency=args.latency) as server:
+        def stage(**kwargs):
+            return AnalyzeStage(base_url=server.base_url, api_key="bench", **kwargs)
+
+        await measure("serial (n8n node behaviour)", stage(concurrency=1), server, args.jobs)
+        await measure(f"concurrency={args.concurrency}",
+                      stage(concurrency=args.concurrency), server, args.jobs)
+        await measure(f"concurrency={args.concurrency} @ {args.rps} req/s",
+                      stage(concurrency=args.concurrency, requests_per_second=args.rps),
+                      server, args.jobs)
+        await measure(f"batch={args.batch} concurrency={args.concurrency}",
+                      stage(concurrency=args.concurrency, batch_size=args.batch),
+                      server, args.jobs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="simulated model latency per request in seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=10.0,
+                        help="token-bucket rate for the rate-limited run")
+    parser.add_argument("--batch", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""Load test: upstream calls for bursts of identical launches, with and without coalescing
+
+Run from the repository root:
+
+    python -m benchmarks.bench_coalesce --users 50 --searches 5 --latency 0.5
+
+Fires ``--users`` concurrent launches spread over ``--searches`` distinct
+searches (keyword order and case vary between users) at the n8n and local
+backends, all served by local fakes, and counts the webhook, job board
+and LLM calls each burst causes. Launches go through the run queue as the
+UI's do, so the worker pool and the per-user limits shape the burst and
+only runs that are in flight at the same time can be shared: with 4
+workers taking users in turn over round-robin searches, few of the
+running launches share a search unless ``--searches`` is small (with
+``--searches 1``, 20 n8n launches make 5 webhook calls instead of 20).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeJobBoardServer, FakeLLMServer, FakeWebhookServer
+
+SEARCHES = [
+    "Python, Backend",
+    "Data Engineer",
+    "DevOps, Kubernetes",
+    "Frontend, React",
+    "Machine Learning",
+    "Go, Rust",
+    "QA Automation",
+    "Product Manager"
+]
+
+
+def user_search(index, searches):
+    """The search of user ``index``, spelled differently by different users"""
+    terms = [term.strip() for term in SEARCHES[index % searches].split(',')]
+    if index % 2:
+        terms = [term.lower() for term in reversed(terms)]
+    return ", ".join(terms)
+
+
+async def launch(ui, index, searches):
+    """Queue one user's launch and follow its log to the end, as the UI does"""
+    output = ""
+    async for output, _ in ui.stream_multiagent_system(user_search(index, searches), "Remote", 40,
+                                                       f"user{index}@example.com"):
+        pass
+    return output
+
+
+async def burst(ui, users, searches):
+    started = time.perf_counter()
+    outputs = await asyncio.gather(*(launch(ui, index, searches) for index in range(users)))
+    elapsed = time.perf_counter() - started
+    ok = sum("✅ SUCCESS" in output for output in outputs)
+    busy = sum("🚦 SYSTEM BUSY" in output for output in outputs)
+    return elapsed, ok, busy
+
+
+async def main(args):
+    # Keep the benchmark's state files out of the real data directory
+    os.environ.setdefault("JOBALERT_DATA_DIR", tempfile.mkdtemp(prefix="jobalert-bench-"))
+    import multiagentjobalert
+    from jobalert.fetcher import ArbeitnowFetcher
+    from jobalert.pipeline import AlertStage, AnalyzeStage, FilterStage, ParseStage, Pipeline, ScrapeStage
+
+    with FakeWebhookServer(latency=args.latency) as webhook, \
+            FakeJobBoardServer(per_page=50, latency=args.latency / 5) as board, \
+            FakeLLMServer(latency=args.latency) as llm:
+        ui = multiagentjobalert.MultiAgentJobAlertUI()
+        ui.health.stop()
+        ui.scheduler.stop()
+        ui.n8n_webhook_url = webhook.webhook_url
+
+        print(f"{args.users} concurrent launches over {args.searches} distinct searches, "
+              f"{ui.workers.workers} workers\n")
+        for backend in ("n8n", "local"):
+            ui.backend = backend
+            for coalesce in (False, True):
+                ui.flights.enabled = coalesce
+                # Fresh pipeline without cache or seen index so every run does the full work
+                ui.pipeline = Pipeline([
+                    ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, max_pages=2), max_jobs=20),
+                    AnalyzeStage(base_url=llm.base_url, api_key="bench", concurrency=8),
+                    ParseStage(),
+                    FilterStage(),
+                    AlertStage()
+                ], tracer=ui.tracer)
+                before = (webhook.requests_served, board.requests_served, llm.requests_served)
+                elapsed, ok, busy = await burst(ui, args.users, args.searches)
+                webhook_calls, board_calls, llm_calls = (
+                    after - start for after, start in
+                    zip((webhook.requests_served, board.requests_served, llm.requests_served), before)
+                )
+                label = f"{backend}, {'coalesced' if coalesce else 'independent'}"
+                print(f"{label:<24} {elapsed:6.2f}s  ok={ok:<4} busy={busy:<4} webhook calls={webhook_calls:<4} "
+                      f"job board calls={board_calls:<5} LLM calls={llm_calls:<5}")
+        print(f"\nruns started={ui.flights.leaders} shared={ui.flights.joined}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--searches", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
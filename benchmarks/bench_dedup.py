@@ -0,0 +1,100 @@
+"""Near-duplicate detection: accuracy and lookup cost as the signature index grows
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dedup --sizes 1000 10000 50000 --probes 500
+
+Fills a DedupIndex with ``--sizes`` distinct synthetic postings, then
+looks up ``--probes`` reposts (new slug, same role), cross-listings
+(another company, lightly edited description), look-alikes (same company
+and boilerplate, different role) and fresh postings. Reports how many
+duplicates are caught, how many distinct jobs are wrongly dropped, and
+the time and candidates checked per lookup, which should stay flat as
+the index grows.
+"""
+import argparse
+import random
+import time
+
+from jobalert.dedup import DedupIndex, signature
+
+TITLES = ["Senior Python Developer", "Backend Engineer", "Data Engineer", "Machine Learning Engineer",
+          "DevOps Engineer", "Full Stack Developer", "Frontend Developer", "QA Automation Engineer",
+          "Product Manager", "Site Reliability Engineer", "Mobile Developer", "Security Engineer"]
+LOCATIONS = ["Berlin", "Munich", "Hamburg", "Remote", "Amsterdam", "Vienna"]
+
+
+class Generator:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.vocabulary = [f"word{index}" for index in range(3000)]
+        self.count = 0
+
+    def description(self, words=60):
+        return " ".join(self.rng.choice(self.vocabulary) for _ in range(words))
+
+    def posting(self):
+        self.count += 1
+        return {
+            'url': f"https://example.com/jobs/{self.count}",
+            'title': f"{self.rng.choice(TITLES)} {self.rng.choice(['', 'II', 'Platform', 'Payments', 'Core'])}",
+            'company': f"Company {self.rng.randrange(10 ** 6)} GmbH",
+            'location': self.rng.choice(LOCATIONS),
+            'description': self.description()
+        }
+
+    def repost(self, job):
+        self.count += 1
+        return {**job, 'url': f"https://example.com/jobs/{self.count}", 'title': job['title'] + " (m/w/d)"}
+
+    def cross_listing(self, job):
+        self.count += 1
+        words = job['description'].split()
+        for _ in range(3):
+            words[self.rng.randrange(len(words))] = self.rng.choice(self.vocabulary)
+        return {**job, 'url': f"https://example.com/jobs/{self.count}", 'company': "Recruiting Partners Ltd",
+                'description': " ".join(words)}
+
+    def look_alike(self, job):
+        """Same company and description boilerplate, different role"""
+        self.count += 1
+        other = self.rng.choice([title for title in TITLES if title.split()[0] not in job['title']])
+        return {**job, 'url': f"https://example.com/jobs/{self.count}", 'title': other}
+
+
+def main(args):
+    generator = Generator(args.seed)
+    index = DedupIndex()
+    stored = []
+    print(f"{'index size':>10}  {'dups caught':>11}  {'distinct dropped':>16}  {'ms/lookup':>9}  "
+          f"{'candidates/lookup':>17}")
+    for size in args.sizes:
+        batch = [generator.posting() for _ in range(size - len(stored))]
+        signatures = [signature(job) for job in batch]
+        index.add(signatures)
+        stored.extend(batch)
+
+        originals = generator.rng.sample(stored, args.probes)
+        duplicates = [generator.repost(job) for job in originals[:args.probes // 2]] + \
+                     [generator.cross_listing(job) for job in originals[args.probes // 2:]]
+        distinct = [generator.look_alike(job) for job in originals[:args.probes // 2]] + \
+                   [generator.posting() for _ in range(args.probes // 2)]
+
+        probes = [signature(job) for job in duplicates + distinct]
+        lookups, candidates = index.lookups, index.candidates_checked
+        started = time.perf_counter()
+        found = [index.find(sig) is not None for sig in probes]
+        elapsed = time.perf_counter() - started
+        caught = sum(found[:len(duplicates)])
+        dropped = sum(found[len(duplicates):])
+        per_lookup = (index.candidates_checked - candidates) / (index.lookups - lookups)
+        print(f"{size:>10,}  {caught:>5}/{len(duplicates):<5}  {dropped:>10}/{len(distinct):<5}  "
+              f"{elapsed / len(probes) * 1000:9.3f}  {per_lookup:17.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--probes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=11)
+    main(parser.parse_args())
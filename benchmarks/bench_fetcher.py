@@ -0,0 +1,54 @@
+"""Job board fetch time: first page only vs parallel pagination vs revalidation
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fetcher --postings 2000 --per-page 100 --latency 0.1
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import FakeJobBoardServer, make_postings
+from jobalert.fetcher import ArbeitnowFetcher, ValidatorStore
+
+
+async def measure(label, fetcher, server, keywords, location):
+    requests_before = server.requests_served
+    started = time.perf_counter()
+    first_posting_at = None
+    count = 0
+    async for _ in fetcher.postings(keywords, location):
+        if first_posting_at is None:
+            first_posting_at = time.perf_counter() - started
+        count += 1
+    elapsed = time.perf_counter() - started
+    print(f"{label:<30} {elapsed:6.2f}s  first posting after {(first_posting_at or 0) * 1000:7.1f}ms  "
+          f"postings={count:<5} requests={server.requests_served - requests_before:<3} "
+          f"not_modified={fetcher.pages_not_modified}")
+
+
+async def main(args):
+    postings = make_postings(args.postings)
+    with FakeJobBoardServer(postings=postings, per_page=args.per_page, latency=args.latency) as server:
+        def fetcher(**kwargs):
+            return ArbeitnowFetcher(base_url=server.api_url, max_pages=1000, **kwargs)
+
+        await measure("sequential pages", fetcher(workers=1), server, args.keywords, args.location)
+        await measure(f"{args.workers} workers", fetcher(workers=args.workers), server,
+                      args.keywords, args.location)
+
+        revalidating = fetcher(workers=args.workers, validators=ValidatorStore())
+        await measure("conditional, cold", revalidating, server, args.keywords, args.location)
+        revalidating.pages_not_modified = 0
+        await measure("conditional, warm (304s)", revalidating, server, args.keywords, args.location)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--keywords", default="")
+    parser.add_argument("--location", default="")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+"""Per-call connections vs the shared keep-alive pool for webhook calls
+
+Run from the repository root:
+
+    python -m benchmarks.bench_http_pool --requests 500 --threads 8
+
+The stand-in webhook runs on localhost over plain HTTP, so the numbers only
+show TCP setup and per-session overhead; against the real n8n host each
+new connection also pays DNS and a TLS handshake.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.fakes import FakeWebhookServer
+from jobalert.http import HttpPoolConfig, configure_http, get_session
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(label, send, total, threads):
+    def timed(_):
+        started = time.perf_counter()
+        send()
+        return time.perf_counter() - started
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(timed, range(total)))
+    wall = time.perf_counter() - wall_started
+
+    print(f"{label:<22} p50={percentile(latencies, 50) * 1000:7.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:7.2f}ms "
+          f"mean={statistics.mean(latencies) * 1000:7.2f}ms "
+          f"throughput={total / wall:8.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="server-side delay per request in seconds")
+    args = parser.parse_args()
+
+    payload = {"keywords": "Python Developer", "location": "Remote", "source": "benchmark"}
+    configure_http(HttpPoolConfig(per_host_limit=args.threads))
+
+    with FakeWebhookServer(latency=args.latency) as server:
+        url = server.webhook_url
+
+        # Warm up both paths so the first-request costs are excluded
+        requests.post(url, json=payload, timeout=10)
+        get_session().post(url, json=payload, timeout=10)
+
+        opened = server.connections_opened
+        run("per-call requests.post", lambda: requests.post(url, json=payload, timeout=10),
+            args.requests, args.threads)
+        per_call_connections = server.connections_opened - opened
+
+        opened = server.connections_opened
+        run("pooled session", lambda: get_session().post(url, json=payload, timeout=10),
+            args.requests, args.threads)
+        pooled_connections = server.connections_opened - opened
+
+    print(f"connections opened: per-call={per_call_connections} pooled={pooled_connections}")
+
+
+if __name__ == "__main__":
+    main()
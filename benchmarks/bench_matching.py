@@ -0,0 +1,103 @@
+"""Fan-out matching: scoring jobs against many subscriber profiles, full scan vs skill index
+
+Run from the repository root:
+
+    python -m benchmarks.bench_matching --jobs 500 --profiles 5000 --vocabulary 400
+
+Generates jobs mentioning a handful of skills each and subscriber profiles
+of three to six skills drawn from a ``--vocabulary`` of skills, then
+matches every job against every profile (the work of a per-subscriber
+loop) and through the inverted index, and reports the (job, profile) pairs
+each approach scores and how long it takes. Both must find the same matches.
+"""
+import argparse
+import random
+import time
+
+from jobalert.matching import ProfileIndex, SubscriberProfile, phrases
+
+BASE_SKILLS = ["Python", "Asyncio", "API Development", "Django", "FastAPI", "PostgreSQL", "Kubernetes",
+               "Docker", "React", "TypeScript", "Go", "Rust", "C++", "Machine Learning", "Data Engineering",
+               "Spark", "AWS", "GCP", "Terraform", "GraphQL"]
+
+
+def vocabulary(size):
+    skills = list(BASE_SKILLS)
+    while len(skills) < size:
+        skills.append(f"skill{len(skills)}")
+    return skills[:size]
+
+
+def make_jobs(count, skills, rng):
+    jobs = []
+    for index in range(count):
+        mentioned = rng.sample(skills, 6)
+        jobs.append({
+            'id': f"bench-job-{index}",
+            'title': f"{mentioned[0]} Engineer",
+            'description': f"We use {', '.join(mentioned[1:])} every day.",
+            'location': "Remote"
+        })
+    return jobs
+
+
+def make_profiles(count, skills, rng):
+    return [
+        SubscriberProfile(index, rng.sample(skills, rng.randint(3, 6)), min_score=20, location="Remote")
+        for index in range(count)
+    ]
+
+
+def full_scan(jobs, profiles):
+    """Every job against every profile, as one pipeline pass per subscriber would"""
+    index = ProfileIndex()
+    matches = {}
+    for job in jobs:
+        title_phrases = phrases(job['title'])
+        job_phrases = title_phrases | phrases(job['description'])
+        for profile in profiles:
+            index.pairs_scored += 1
+            matched = {
+                skill: 1.0 if skill in title_phrases else 0.75
+                for skill in profile.skills if skill in job_phrases
+            }
+            if matched and index.score(profile, matched) >= profile.min_score:
+                matches.setdefault(profile.profile_id, set()).add(job['id'])
+    return matches, index.pairs_scored
+
+
+def indexed(jobs, profiles):
+    index = ProfileIndex(profiles)
+    matches = {
+        profile_id: {match.job['id'] for match in profile_matches}
+        for profile_id, profile_matches in index.match(jobs).items()
+    }
+    return matches, index.pairs_scored
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    skills = vocabulary(args.vocabulary)
+    jobs = make_jobs(args.jobs, skills, rng)
+    profiles = make_profiles(args.profiles, skills, rng)
+
+    print(f"{args.jobs} jobs × {args.profiles} profiles over {args.vocabulary} skills "
+          f"({args.jobs * args.profiles:,} pairs)\n")
+    results = {}
+    for label, matcher in (("full scan", full_scan), ("skill index", indexed)):
+        started = time.perf_counter()
+        matches, scored = matcher(jobs, profiles)
+        elapsed = time.perf_counter() - started
+        results[label] = matches
+        found = sum(len(job_ids) for job_ids in matches.values())
+        print(f"{label:<12} {elapsed:7.3f}s  pairs scored={scored:<10,} matches={found:,}")
+    assert results["full scan"] == results["skill index"], "the index must find the same matches"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument("--vocabulary", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
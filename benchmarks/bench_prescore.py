@@ -0,0 +1,94 @@
+"""Local pre-scoring: LLM calls saved and precision/recall on labeled jobs
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prescore --latency 0.2
+
+Scores the hand-labeled postings in ``benchmarks/fixtures/labeled_jobs.json``
+against the target skills and, for a range of thresholds, reports how
+many LLM calls the gate saves and its precision and recall (a job is
+"predicted relevant" when it is sent to the LLM). Then runs the analysis
+stage over the fixtures against a local fake LLM with and without the
+pre-scorer and counts the calls made.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.fakes import FakeLLMServer
+from jobalert.pipeline import TARGET_SKILLS, AnalyzeStage, ParseStage, RunContext
+from jobalert.prescore import DEFAULT_THRESHOLD, PreScorer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "labeled_jobs.json")
+
+THRESHOLDS = [0.005, 0.01, DEFAULT_THRESHOLD, 0.02, 0.03, 0.04, 0.05, 0.075, 0.1]
+
+
+def load_jobs(ctx):
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+    return [
+        {
+            **fixture,
+            'company': "Fixture GmbH",
+            'location': "Remote",
+            'url': f"https://example.com/jobs/{fixture['id']}",
+            'source': 'Arbeitnow',
+            'processed_by': ["Agent 1 - Job Scraper"],
+            'agent_chain': "Agent1",
+            'batch_id': ctx.batch_id
+        }
+        for fixture in fixtures
+    ]
+
+
+def gate_quality(jobs, similarities, threshold):
+    sent = [similarity >= threshold for similarity in similarities]
+    true_positives = sum(kept and job['relevant'] for job, kept in zip(jobs, sent))
+    relevant = sum(job['relevant'] for job in jobs)
+    precision = true_positives / sum(sent) if any(sent) else 1.0
+    recall = true_positives / relevant if relevant else 1.0
+    return len(jobs) - sum(sent), precision, recall
+
+
+async def analyze(server, jobs, prescorer):
+    ctx = RunContext()
+    stage = AnalyzeStage(base_url=server.base_url, api_key="bench", concurrency=8, prescorer=prescorer)
+    calls_before = server.requests_served
+    started = time.perf_counter()
+    analyzed = await ParseStage().run(await stage.run(jobs, ctx), ctx)
+    return time.perf_counter() - started, server.requests_served - calls_before, analyzed
+
+
+async def main(args):
+    jobs = load_jobs(RunContext())
+    relevant = sum(job['relevant'] for job in jobs)
+    started = time.perf_counter()
+    similarities = PreScorer(TARGET_SKILLS).scores(jobs)
+    elapsed = time.perf_counter() - started
+    print(f"{len(jobs)} labeled jobs ({relevant} relevant), pre-scored in {elapsed * 1000:.1f} ms\n")
+
+    print(f"{'threshold':>9}  {'LLM calls saved':>15}  {'precision':>9}  {'recall':>6}")
+    for threshold in THRESHOLDS:
+        saved, precision, recall = gate_quality(jobs, similarities, threshold)
+        marker = "  (default)" if threshold == DEFAULT_THRESHOLD else ""
+        print(f"{threshold:9.3f}  {saved:>8} ({saved / len(jobs):4.0%})  {precision:9.2f}  {recall:6.2f}{marker}")
+    saved, precision, recall = gate_quality(jobs, similarities, -1)
+    print(f"{'no gate':>9}  {saved:>8} ({saved / len(jobs):4.0%})  {precision:9.2f}  {recall:6.2f}\n")
+
+    with FakeLLMServer(latency=args.latency) as server:
+        for label, prescorer in (("every job to the LLM", None),
+                                 (f"pre-score >= {args.threshold}", PreScorer(TARGET_SKILLS, args.threshold))):
+            elapsed, calls, analyzed = await analyze(server, jobs, prescorer)
+            lost = sum(job['relevant'] and job['ai_summary'].startswith("Skipped") for job in analyzed)
+            print(f"{label:<22} {elapsed:6.2f}s  LLM calls={calls:<4} relevant jobs skipped={lost}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="simulated model latency per request in seconds")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    asyncio.run(main(parser.parse_args()))
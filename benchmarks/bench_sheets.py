@@ -0,0 +1,106 @@
+"""Results sheet writes: per-row appendOrUpdate vs the batched sink
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sheets --runs 10 --jobs 40 --overlap 0.5 --latency 0.05
+
+Writes ``--runs`` batches of approved jobs (a share ``--overlap`` of each
+run's jobs were already in the sheet) to a local fake Sheets API, once
+the way the n8n node does it (look the URL up, then update or append, per
+row) and once through ``SheetSink``, and counts the API calls each makes.
+Both must leave the sheet with the same rows.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import FakeSheetsServer
+from jobalert.sheets import SHEET_COLUMNS, GoogleSheetsBackend, SheetSink, job_row
+
+
+def make_runs(runs, jobs, overlap):
+    """Jobs of each run; a share of them repeat URLs from the previous run"""
+    batches = []
+    next_id = 0
+    previous = []
+    for run in range(runs):
+        repeated = previous[:int(jobs * overlap)]
+        fresh = []
+        while len(repeated) + len(fresh) < jobs:
+            fresh.append(next_id)
+            next_id += 1
+        ids = repeated + fresh
+        batches.append([
+            {
+                'title': f"Python Developer #{job_id}",
+                'company': f"Company {job_id % 31}",
+                'location': "Remote",
+                'description': "Python, asyncio and REST APIs.",
+                'url': f"https://example.com/jobs/{job_id}",
+                'source': "Arbeitnow",
+                'relevance_score': 40 + (job_id + run) % 50,
+                'match_reasons': ["Python expertise"],
+                'ai_summary': f"Run {run}",
+                'analyzed_at': f"2026-01-01T00:{run:02d}:00.000Z"
+            }
+            for job_id in ids
+        ])
+        previous = ids
+    return batches
+
+
+async def per_row(backend, runs):
+    """The node's behaviour: one lookup plus one write for every row"""
+    for jobs in runs:
+        for job in jobs:
+            urls = await backend.read_urls()
+            if not urls:
+                await backend.append_rows([SHEET_COLUMNS])
+                urls = ['url']
+            if job['url'] in urls:
+                await backend.update_rows({urls.index(job['url']) + 1: job_row(job)})
+            else:
+                await backend.append_rows([job_row(job)])
+
+
+async def batched(backend, runs, max_rows):
+    sink = SheetSink(backend, max_rows=max_rows)
+    for jobs in runs:
+        sink.add(jobs)
+        if sink.pending() >= max_rows:
+            await sink.flush()
+    await sink.flush()
+    return sink
+
+
+async def main(args):
+    runs = make_runs(args.runs, args.jobs, args.overlap)
+    rows = sum(len(jobs) for jobs in runs)
+    print(f"{args.runs} runs × {args.jobs} approved jobs ({args.overlap:.0%} already in the sheet), "
+          f"{rows} row writes\n")
+    sheets = {}
+    for label in ("per-row appendOrUpdate", f"SheetSink max_rows={args.max_rows}"):
+        with FakeSheetsServer(latency=args.latency) as server:
+            backend = GoogleSheetsBackend("bench", base_url=server.api_url)
+            started = time.perf_counter()
+            if label.startswith("per-row"):
+                await per_row(backend, runs)
+            else:
+                await batched(backend, runs, args.max_rows)
+            elapsed = time.perf_counter() - started
+            sheets[label] = server.rows
+            print(f"{label:<26} {elapsed:7.2f}s  API calls={server.requests_served:<5} "
+                  f"(reads={server.reads}, writes={server.writes})  sheet rows={len(server.rows) - 1}")
+    first, second = sheets.values()
+    assert sorted(map(tuple, first)) == sorted(map(tuple, second)), "both writers must produce the same sheet"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--max-rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="simulated API latency per request in seconds")
+    asyncio.run(main(parser.parse_args()))
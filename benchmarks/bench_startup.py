@@ -0,0 +1,128 @@
+"""App startup: import time, interface build time and time-to-ready on port 7860
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 20000 --results 50000 --repeats 3
+
+Seeds a throwaway data directory with ``--runs`` recorded runs and
+``--results`` stored jobs, then in fresh interpreters times importing
+``multiagentjobalert``, constructing the UI and building the interface,
+and how long ``python multiagentjobalert.py`` takes until the page at
+http://127.0.0.1:7860/ answers. Medians of ``--repeats`` starts are
+printed next to the last entry of ``--baseline`` (by default the
+committed benchmarks/startup_baseline.jsonl) recorded with the same
+``--runs`` and ``--results``; ``--record`` also appends them to it as a
+JSON line, so startup can be tracked from commit to commit.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.fakes import seed_results, seed_runs
+from jobalert.analytics import RunRecorder
+from jobalert.store import ResultsStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.jsonl")
+
+# Runs in a fresh interpreter; prints the import and build times as JSON
+PROBE = """
+import json, time
+started = time.perf_counter()
+import multiagentjobalert
+imported = time.perf_counter()
+ui = multiagentjobalert.MultiAgentJobAlertUI()
+constructed = time.perf_counter()
+multiagentjobalert.create_multiagent_interface(ui)
+built = time.perf_counter()
+print(json.dumps({'import': imported - started, 'construct': constructed - imported, 'build': built - constructed}))
+"""
+
+
+def seed(data_dir, runs, results, seed):
+    seed_runs(RunRecorder(os.path.join(data_dir, "runs.sqlite3")), runs, seed)
+    seed_results(ResultsStore(os.path.join(data_dir, "results.sqlite3")), results, seed)
+
+
+def probe(env):
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_to_ready(env, url, timeout):
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "multiagentjobalert.py"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"app exited with code {process.returncode} before serving")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"{url} not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as data_dir:
+        seed(data_dir, args.runs, args.results, args.seed)
+        env = {**os.environ, 'JOBALERT_DATA_DIR': data_dir, 'GRADIO_ANALYTICS_ENABLED': "False"}
+        print(f"{args.runs:,} recorded runs, {args.results:,} stored jobs, median of {args.repeats} starts, "
+              f"ready = {args.url} answers\n")
+        timings = [probe(env) for _ in range(args.repeats)]
+        ready = [time_to_ready(env, args.url, args.timeout) for _ in range(args.repeats)]
+    medians = {key: statistics.median(timing[key] for timing in timings) for key in timings[0]}
+    medians['ready'] = statistics.median(ready)
+    baseline = last_baseline(args.baseline, args.runs, args.results)
+    if baseline is not None:
+        print(f"{'':28}{'now':>8} {'baseline @ ' + baseline['commit']:>20}")
+    labels = [("import", "import multiagentjobalert"), ("construct", "MultiAgentJobAlertUI()"),
+              ("build", "build interface"), ("ready", "time to ready")]
+    for key, label in labels:
+        line = f"{label:<28}{medians[key]:7.2f}s"
+        if baseline is not None:
+            line += f" {baseline[key]:19.2f}s ({medians[key] - baseline[key]:+.2f}s)"
+        print(line)
+    if args.record:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+        with open(args.baseline, "a") as record:
+            record.write(json.dumps({'commit': commit, 'runs': args.runs, 'results': args.results,
+                                     **{key: round(value, 3) for key, value in medians.items()}}) + "\n")
+
+
+def last_baseline(path, runs, results):
+    """The last entry of the baseline file recorded with the same data sizes, or None"""
+    try:
+        with open(path) as record:
+            entries = [json.loads(line) for line in record if line.strip()]
+    except FileNotFoundError:
+        return None
+    matching = [entry for entry in entries if (entry['runs'], entry['results']) == (runs, results)]
+    return matching[-1] if matching else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20000)
+    parser.add_argument("--results", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--url", default="http://127.0.0.1:7860/")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--baseline", default=BASELINE, help="JSON-lines file of earlier medians to compare with")
+    parser.add_argument("--record", action="store_true", help="append the medians to the baseline file")
+    parser.add_argument("--seed", type=int, default=5)
+    main(parser.parse_args())
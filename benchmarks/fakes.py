@@ -0,0 +1,547 @@
+"""Local stand-ins for the cloud services the job alert system talks to
+
+Every fake takes ``latency`` (seconds added to each response), ``jitter``
+(mean of an extra, exponentially distributed delay, for a realistic
+tail) and ``error_rate`` (share of requests answered with
+``error_status`` instead, or a transient 451 for SMTP); ``seed`` makes
+the injected delays and failures repeatable. ``fail_first`` fails that
+many requests before any other, for tests of retries.
+"""
+import hashlib
+import json
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_JOB_ID_RE = re.compile(r'^Job ID: (.+)$', re.MULTILINE)
+_TITLE_RE = re.compile(r'^Title: (.+)$', re.MULTILINE)
+# Skill profile named by jobalert.pipeline.profile_prompt
+_PROFILE_RE = re.compile(r'for a candidate skilled in (.+?)\. Return ONLY')
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # second write stalls on delayed ACKs for kept-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body) if body else None
+
+    def simulate(self):
+        """Count the request and wait out its delay; True when a failure was injected and sent"""
+        self.fake.record_request()
+        self.fake.delay()
+        if self.fake.should_fail():
+            self.send_json(self.fake.error_status, {"error": {"message": "injected failure"}})
+            return True
+        return False
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ServerMixin:
+    daemon_threads = True
+    # Listen backlog for bursts of new connections; read when the socket
+    # starts listening, so it has to be set on the class
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # A client that timed out or gave up hanging up mid-reply is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _HTTPServer(_ServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class _Faults:
+    """Latency and error injection shared by the HTTP and SMTP fakes"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0, fail_first=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first
+        self.errors_injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            extra = self._rng.expovariate(1 / self.jitter) if self.jitter else 0.0
+        if self.latency + extra:
+            time.sleep(self.latency + extra)
+
+    def should_fail(self):
+        if not (self.error_rate or self.fail_first):
+            return False
+        with self._lock:
+            failed = self.errors_injected < self.fail_first or self._rng.random() < self.error_rate
+            self.errors_injected += failed
+        return failed
+
+
+class FakeServer(_Faults):
+    """Threaded local HTTP server running in the background.
+
+    Subclasses provide ``handler_class``; see the module docstring for the
+    latency and error options.
+    """
+
+    handler_class = _FakeHandler
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0, fail_first=0):
+        super().__init__(latency, jitter, error_rate, error_status, seed, fail_first)
+        self.requests_served = 0
+        self.connections_opened = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def start(self):
+        fake = self
+
+        class Handler(self.handler_class):
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections_opened += 1
+
+        Handler.fake = fake
+        server = _HTTPServer(("127.0.0.1", 0), Handler)
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _WebhookHandler(_FakeHandler):
+    def do_POST(self):
+        self.read_json()
+        if self.simulate():
+            return
+        self.send_json(200, {"message": "Workflow was started"})
+
+
+class FakeWebhookServer(FakeServer):
+    """Stand-in for the n8n webhook: accepts any POST and answers 200"""
+
+    handler_class = _WebhookHandler
+
+    @property
+    def webhook_url(self):
+        return f"{self.url}/webhook/multiagent-trigger"
+
+
+def fake_analysis(title, skills=None):
+    """Deterministic stand-in for the model's verdict on one job, for the default or a given skill profile"""
+    digest = hashlib.sha1((title if skills is None else f"{title}|{skills}").encode()).digest()
+    score = 25 + digest[0] % 71
+    reasons = ["Python expertise", "Remote work", "API development", "Automation"]
+    return {
+        "relevance_score": score,
+        "match_reasons": reasons[:1 + digest[1] % len(reasons)],
+        "summary": f"Scored {score}% against the target skills",
+        "agent_id": "Agent_2",
+        "confidence": "high" if score >= 60 else "medium"
+    }
+
+
+class _LLMHandler(_FakeHandler):
+    def do_POST(self):
+        request = self.read_json()
+        if self.simulate():
+            return
+
+        prompt = request["messages"][-1]["content"]
+        job_ids = _JOB_ID_RE.findall(prompt)
+        titles = _TITLE_RE.findall(prompt)
+        profile = _PROFILE_RE.search(request["messages"][0]["content"])
+        skills = profile.group(1) if profile else None
+        if self.fake.reply is not None:
+            content = self.fake.reply
+        elif job_ids:
+            # Batched prompt: one analysis per "Job ID:" block
+            content = json.dumps([
+                {"job_id": job_id, **fake_analysis(title, skills)}
+                for job_id, title in zip(job_ids, titles)
+            ])
+        else:
+            content = json.dumps(fake_analysis(titles[0] if titles else prompt, skills))
+        self.fake.jobs_analyzed += max(1, len(job_ids))
+
+        self.send_json(200, {
+            "id": f"chatcmpl-{self.fake.requests_served}",
+            "object": "chat.completion",
+            "model": request.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"```json\n{content}\n```"},
+                "finish_reason": "stop"
+            }]
+        })
+
+
+class FakeLLMServer(FakeServer):
+    """Stand-in for the OpenAI chat completions endpoint.
+
+    Answers single-job and batched ("Job ID:" blocks) prompts with
+    deterministic scores derived from the job title and, for prompts about
+    a subscriber's skill profile, those skills; or with ``reply`` as
+    the completion text when one is given.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(self, reply=None, **faults):
+        super().__init__(**faults)
+        self.reply = reply
+        self.jobs_analyzed = 0
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+
+def make_postings(count, seed=0):
+    """Arbeitnow-shaped postings with a realistic mix of titles and locations"""
+    titles = ["Senior Python Developer", "Backend Engineer (Python)", "Data Engineer",
+              "Machine Learning Engineer", "DevOps Engineer", "Full Stack Developer",
+              "Frontend Developer (React)", "QA Automation Engineer"]
+    locations = ["Remote", "Berlin", "Munich", "Hamburg", "Remote", "Amsterdam"]
+    postings = []
+    for index in range(count):
+        number = seed + index
+        title = titles[number % len(titles)]
+        postings.append({
+            "slug": f"{title.lower().replace(' ', '-').replace('(', '').replace(')', '')}-{number}",
+            "company_name": f"Company {number % 97}",
+            "title": title,
+            "description": f"<p>{title} working on Python, asyncio and REST APIs. Posting {number}.</p>",
+            "remote": number % 3 == 0,
+            "url": f"https://www.arbeitnow.com/jobs/companies/company-{number % 97}/{number}",
+            "tags": ["python", "backend"] if "Python" in title else ["engineering"],
+            "job_types": ["full time"],
+            "location": locations[number % len(locations)],
+            "created_at": 1700000000 + number
+        })
+    return postings
+
+
+class _JobBoardHandler(_FakeHandler):
+    def do_GET(self):
+        if self.simulate():
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        page = int(query.get('page', ['1'])[0])
+        search = query.get('search', [''])[0].lower()
+        location = query.get('location', [''])[0].lower()
+
+        matches = [
+            posting for posting in self.fake.postings
+            if (not search or search in posting['title'].lower() or search in posting['description'].lower())
+            and (not location or location in posting['location'].lower()
+                 or (location == 'remote' and posting['remote']))
+        ]
+        per_page = self.fake.per_page
+        data = matches[(page - 1) * per_page:page * per_page]
+        has_next = page * per_page < len(matches)
+        base = f"{self.fake.url}/api/job-board-api"
+        body = {
+            "data": data,
+            "links": {
+                "first": f"{base}?page=1",
+                "last": None,
+                "prev": f"{base}?page={page - 1}" if page > 1 else None,
+                "next": f"{base}?page={page + 1}" if has_next else None
+            },
+            "meta": {"current_page": page, "per_page": per_page, "path": base}
+        }
+
+        etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.fake.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_json(200, body, headers={
+            'ETag': etag,
+            'Last-Modified': self.fake.last_modified
+        })
+
+
+class FakeJobBoardServer(FakeServer):
+    """Stand-in for the Arbeitnow job board API.
+
+    Supports ``search``/``location``/``page`` query parameters, next links
+    without a total (like the real API) and ETag revalidation.
+    """
+
+    handler_class = _JobBoardHandler
+
+    def __init__(self, postings=None, per_page=100, **faults):
+        super().__init__(**faults)
+        self.postings = postings if postings is not None else make_postings(250)
+        self.per_page = per_page
+        self.not_modified = 0
+        self.last_modified = formatdate(usegmt=True)
+
+    @property
+    def api_url(self):
+        return f"{self.url}/api/job-board-api"
+
+
+_A1_RE = re.compile(r'^(?:[^!]*!)?([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$')
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+class _SheetsHandler(_FakeHandler):
+    def _path(self):
+        # /v4/spreadsheets/<id>/values<rest>
+        path = unquote(urlsplit(self.path).path)
+        return path.split("/values", 1)[1]
+
+    def do_GET(self):
+        if self.simulate():
+            return
+        match = _A1_RE.match(self._path().lstrip('/'))
+        column = _column_index(match.group(1))
+        with self.fake._lock:
+            self.fake.reads += 1
+            values = [[row[column]] if column < len(row) else [] for row in self.fake.rows]
+        self.send_json(200, {"range": self._path().lstrip('/'), "values": values} if values else {})
+
+    def do_POST(self):
+        request = self.read_json()
+        if self.simulate():
+            return
+        path = self._path()
+        with self.fake._lock:
+            self.fake.writes += 1
+            if path == ":batchUpdate":
+                for data in request["data"]:
+                    number = int(_A1_RE.match(data["range"]).group(2))
+                    while len(self.fake.rows) < number:
+                        self.fake.rows.append([])
+                    self.fake.rows[number - 1] = list(data["values"][0])
+                self.send_json(200, {"totalUpdatedRows": len(request["data"])})
+                return
+            first = len(self.fake.rows) + 1
+            self.fake.rows.extend(list(row) for row in request["values"])
+            last = len(self.fake.rows)
+        self.send_json(200, {"updates": {"updatedRange": f"Sheet1!A{first}:J{last}", "updatedRows": last - first + 1}})
+
+
+class FakeSheetsServer(FakeServer):
+    """Stand-in for the Google Sheets API v4 values endpoints of one sheet.
+
+    Supports reading a column, ``values:batchUpdate`` of whole rows and
+    ``values:append``; ``rows`` holds the sheet, and ``reads``/``writes``
+    count the API calls.
+    """
+
+    handler_class = _SheetsHandler
+
+    def __init__(self, **faults):
+        super().__init__(**faults)
+        self.rows = []
+        self.reads = 0
+        self.writes = 0
+
+    @property
+    def api_url(self):
+        return f"{self.url}/v4/spreadsheets"
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        fake = self.server.fake
+        with fake._lock:
+            fake.connections_opened += 1
+        self.reply("220 fake-smtp ESMTP ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250-fake-smtp\r\n250 8BITMIME" if verb == "EHLO" else "250 fake-smtp")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    data.append(data_line)
+                fake.delay()
+                if fake.should_fail():
+                    self.reply("451 4.3.0 Injected temporary failure")
+                    continue
+                with fake._lock:
+                    fake.requests_served += 1
+                    fake.messages.append((sender, recipients, b"".join(data)))
+                self.reply("250 OK: queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _SMTPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+class FakeSMTPServer(_Faults):
+    """Stand-in SMTP relay (no TLS, no auth) that keeps every message it accepts.
+
+    ``requests_served`` counts messages, ``connections_opened`` SMTP
+    sessions; the delay and injected failures apply to each message.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, fail_first=0):
+        super().__init__(latency, jitter, error_rate, seed=seed, fail_first=fail_first)
+        self.requests_served = 0
+        self.connections_opened = 0
+        self.messages = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def recipients(self):
+        with self._lock:
+            return [recipient for _, recipients, _ in self.messages for recipient in recipients]
+
+    def start(self):
+        server = _SMTPServer(("127.0.0.1", 0), _SMTPHandler)
+        server.fake = self
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+STAGE_NAMES = ["Agent 1 - Job Scraper", "Agent 2 - AI Analyzer", "Agent 3 - Response Parser",
+               "Agent 4 - Quality Filter", "Agent 5 - Alert Manager"]
+
+
+def seed_runs(recorder, count, seed=0):
+    """Record ``count`` past runs, one a minute up to now, in a RunRecorder"""
+    rng = random.Random(seed)
+    started_at = time.time() - count * 60
+    for index in range(count):
+        durations = [rng.uniform(0.05, 2.0) for _ in STAGE_NAMES]
+        recorder.record_run(
+            f"run-{index}", rng.choice(["local", "n8n"]), started_at + index * 60, sum(durations), rng.random() > 0.05,
+            stages=[(stage, duration, True, 20) for stage, duration in zip(STAGE_NAMES, durations)],
+            jobs_scraped=40, jobs_analyzed=40, jobs_approved=8,
+            scores=[rng.randrange(100) for _ in range(8)]
+        )
+
+
+def seed_results(store, count, seed=0):
+    """Store ``count`` approved jobs, processed over the last ``count`` minutes, in a ResultsStore"""
+    rng = random.Random(seed)
+    now = time.time()
+    store.upsert_jobs([
+        {
+            'url': f"https://example.com/jobs/{index}",
+            'id': index,
+            'title': f"Python Developer #{index}",
+            'company': f"Company {index % 997}",
+            'location': rng.choice(["Remote", "Berlin", "Munich", "Hamburg"]),
+            'relevance_score': rng.randrange(35, 100),
+            'priority_level': rng.choice(["HIGH", "MEDIUM", "STANDARD"]),
+            'ai_summary': "Python, asyncio and REST APIs.",
+            'final_processing_time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now - (count - index) * 60))
+        }
+        for index in range(count)
+    ])
@@ -0,0 +1,281 @@
+"""Benchmark suite: the trigger, the pipeline stages and the results/analytics views against local fakes
+
+Run from the repository root:
+
+    python -m benchmarks.suite --requests 40 --concurrency 4 --sizes 1000 10000 100000
+
+Starts local stand-ins for the n8n webhook, the Arbeitnow API, the OpenAI
+endpoint, Sheets and SMTP, each with its own latency and error rate
+(``--llm-latency 0.2 --llm-errors 0.05`` and so on) plus a shared
+``--jitter``, and reports throughput and latency percentiles for:
+
+- trigger: ``trigger_multiagent_system`` on the n8n and local backends,
+  with the outcome of every launch (coalescing is off, so each launch
+  does the full work);
+- stages: every pipeline stage and outbound call made by those launches;
+- views: the results table, analytics and health views over stores
+  seeded with each of ``--sizes`` jobs and a fifth as many recorded runs.
+
+``--only`` picks sections; ``--record FILE`` appends all figures as a
+JSON line, so a regression shows up as a number between two commits.
+The fakes run in this process: on a machine with few cores, chatty
+calls (SMTP above all) also measure waiting for the GIL, so compare
+figures taken on the same machine.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import (FakeJobBoardServer, FakeLLMServer, FakeSheetsServer, FakeSMTPServer,
+                              FakeWebhookServer, make_postings, seed_results, seed_runs)
+
+SECTIONS = ["trigger", "stages", "views"]
+
+# Service -> (fake, default latency in seconds)
+SERVICES = {
+    'webhook': (FakeWebhookServer, 0.05),
+    'board': (FakeJobBoardServer, 0.02),
+    'llm': (FakeLLMServer, 0.1),
+    'sheets': (FakeSheetsServer, 0.03),
+    'smtp': (FakeSMTPServer, 0.01)
+}
+
+SEARCHES = ["Python", "Engineer", "Developer", "Data Engineer", "DevOps", "Backend"]
+
+
+class SpanCollector:
+    """Tracer exporter keeping every finished span, past the tracer's ring buffer"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, wall=None):
+    """Count, throughput and percentiles (in seconds) of a list of latencies"""
+    return {
+        'n': len(samples),
+        'throughput': len(samples) / (wall if wall is not None else sum(samples) or 1e-9),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples)
+    }
+
+
+def print_row(label, stats, extra=""):
+    print(f"{label:<30} n={stats['n']:<5} {stats['throughput']:9.1f}/s  "
+          f"p50={stats['p50'] * 1000:8.2f}ms  p95={stats['p95'] * 1000:8.2f}ms  "
+          f"p99={stats['p99'] * 1000:8.2f}ms  max={stats['max'] * 1000:8.2f}ms  {extra}".rstrip())
+
+
+def distinct_postings(count, seed):
+    """make_postings() with a paragraph of their own, so the deduplicator keeps them apart"""
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice('bdfgklmnprstvz')}{rng.choice('aeiou')}{rng.choice('lnrst')}{index}"
+                  for index in range(2000)]
+    postings = make_postings(count, seed=seed)
+    for posting in postings:
+        paragraph = " ".join(rng.choice(vocabulary) for _ in range(40))
+        posting['description'] = posting['description'].replace("</p>", f" {paragraph}</p>")
+    return postings
+
+
+def start_fakes(args):
+    fakes = {}
+    for name, (fake_class, _) in SERVICES.items():
+        options = {
+            'latency': getattr(args, f"{name}_latency"),
+            'jitter': args.jitter,
+            'error_rate': getattr(args, f"{name}_errors"),
+            'seed': args.seed
+        }
+        if name == 'board':
+            options.update(postings=distinct_postings(args.postings, args.seed), per_page=50)
+        fakes[name] = fake_class(**options).start()
+    return fakes
+
+
+def local_pipeline(ui, fakes, args):
+    """The default stage layout, pointed at the fakes, without the cross-run seen and dedup indexes"""
+    from jobalert.alerts import AlertDispatcher, SmtpMailer
+    from jobalert.fetcher import ArbeitnowFetcher
+    from jobalert.pipeline import (AlertStage, AnalyzeStage, DedupStage, DispatchAlertsStage, FilterStage,
+                                   ParseStage, Pipeline, SaveResultsStage, ScrapeStage, SheetSinkStage)
+    from jobalert.sheets import GoogleSheetsBackend, SheetSink
+
+    sink = SheetSink(GoogleSheetsBackend("bench", base_url=fakes['sheets'].api_url), max_delay=0.5)
+    sink.start()
+    dispatcher = AlertDispatcher(SmtpMailer(fakes['smtp'].host, fakes['smtp'].port, starttls=False),
+                                 results_store=ui.results_store)
+    pipeline = Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=fakes['board'].api_url, max_pages=2), max_jobs=args.jobs),
+        DedupStage(),
+        AnalyzeStage(base_url=fakes['llm'].base_url, api_key="bench", concurrency=8),
+        ParseStage(),
+        FilterStage(),
+        AlertStage(),
+        SaveResultsStage(ui.results_store),
+        SheetSinkStage(sink),
+        DispatchAlertsStage(dispatcher)
+    ], recorder=ui.run_recorder, tracer=ui.tracer)
+    return pipeline, sink
+
+
+def bench_trigger(ui, args):
+    results = {}
+    for backend in ("n8n", "local"):
+        ui.backend = backend
+
+        def launch(index):
+            started = time.perf_counter()
+            output = ui.trigger_multiagent_system(SEARCHES[index % len(SEARCHES)], "Remote", 40,
+                                                  f"user{index}@example.com")
+            return time.perf_counter() - started, output.split("\n", 1)[0].strip()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            launches = list(pool.map(launch, range(args.requests)))
+        wall = time.perf_counter() - started
+        stats = summarize([latency for latency, _ in launches], wall)
+        stats['outcomes'] = dict(Counter(status for _, status in launches))
+        results[f"trigger_multiagent_system ({backend})"] = stats
+        print_row(f"trigger ({backend})", stats,
+                  "  ".join(f"{status}={count}" for status, count in stats['outcomes'].items()))
+    return results
+
+
+def bench_stages(spans):
+    from jobalert.tracing import CALL, STAGE
+
+    results = {}
+    for kind, title in ((STAGE, "pipeline stages"), (CALL, "outbound calls")):
+        print(f"\n{title}:")
+        by_name = {}
+        for span in spans:
+            if span.kind == kind:
+                by_name.setdefault(span.name, []).append(span)
+        for name, named in by_name.items():
+            stats = summarize([span.duration for span in named])
+            stats['errors'] = sum(not span.ok for span in named)
+            results[f"{kind}: {name}"] = stats
+            print_row(name, stats, f"errors={stats['errors']}" if stats['errors'] else "")
+    return results
+
+
+def bench_views(ui, args, data_dir):
+    from jobalert.analytics import AnalyticsEngine, RunRecorder
+    from jobalert.store import ResultsStore
+
+    results = {}
+    for size in args.sizes:
+        store = ResultsStore(os.path.join(data_dir, f"results-{size}.sqlite3"))
+        seed_results(store, size, args.seed)
+        recorder = RunRecorder(os.path.join(data_dir, f"runs-{size}.sqlite3"))
+        seed_runs(recorder, size // 5, args.seed)
+        ui.results_store = store
+        ui.analytics = AnalyticsEngine(recorder)
+
+        started = time.perf_counter()
+        ui.get_system_analytics()
+        first_view = time.perf_counter() - started
+
+        views = {
+            "results, first page": lambda: ui.get_results_page("", "ALL", 0, "Date", True, 1, 50),
+            "results, text search": lambda: ui.get_results_page("Developer #12", "ALL", 0, "Date", True, 1, 50),
+            "results, HIGH by score": lambda: ui.get_results_page("", "HIGH", 60, "Relevance_Score", True, 1, 50),
+            "results, last page": lambda: ui.get_results_page("", "ALL", 0, "Date", True, 10 ** 9, 50),
+            "analytics": ui.get_system_analytics,
+            "health": ui.get_system_health
+        }
+        print(f"\n{size:,} stored jobs, {size // 5:,} recorded runs "
+              f"(analytics first view {first_view * 1000:.1f}ms):")
+        results[f"views @ {size}: analytics, first view"] = {'n': 1, 'seconds': first_view}
+        for name, view in views.items():
+            latencies = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                view()
+                latencies.append(time.perf_counter() - started)
+            stats = summarize(latencies)
+            results[f"views @ {size}: {name}"] = stats
+            print_row(name, stats)
+        store.close()
+    return results
+
+
+def main(args):
+    sections = args.only or SECTIONS
+    data_dir = tempfile.mkdtemp(prefix="jobalert-bench-")
+    # Keep the app's own state files out of the real data directory
+    os.environ["JOBALERT_DATA_DIR"] = data_dir
+    import multiagentjobalert
+
+    fakes = start_fakes(args)
+    collector = SpanCollector()
+    results = {}
+    try:
+        ui = multiagentjobalert.MultiAgentJobAlertUI()
+        ui.health.stop()
+        ui.flights.enabled = False
+        ui.n8n_webhook_url = fakes['webhook'].webhook_url
+        ui.tracer.exporters.append(collector)
+
+        if "trigger" in sections or "stages" in sections:
+            ui.pipeline, sink = local_pipeline(ui, fakes, args)
+            print(f"{args.requests} launches per backend, {args.concurrency} at a time, "
+                  f"up to {args.jobs} jobs each\n")
+            trigger_results = bench_trigger(ui, args)
+            # Flush the last sheet rows so their calls are counted too
+            sink.stop()
+            if "trigger" in sections:
+                results.update(trigger_results)
+            if "stages" in sections:
+                results.update(bench_stages(collector.spans))
+            print("\ninjected failures: " + ", ".join(
+                f"{name}={fake.errors_injected}" for name, fake in fakes.items()
+            ))
+        if "views" in sections:
+            results.update(bench_views(ui, args, data_dir))
+    finally:
+        for fake in fakes.values():
+            fake.stop()
+
+    if args.record:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+        with open(args.record, "a") as record:
+            record.write(json.dumps({'commit': commit, 'recorded_at': time.time(), 'args': vars(args),
+                                     'results': results}, default=str) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=SECTIONS)
+    parser.add_argument("--requests", type=int, default=40, help="launches per backend")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=20, help="jobs scraped per local run")
+    parser.add_argument("--postings", type=int, default=500, help="postings on the fake job board")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--iterations", type=int, default=50, help="calls per view and size")
+    parser.add_argument("--jitter", type=float, default=0.01,
+                        help="mean extra delay per request in seconds, exponentially distributed")
+    for service, (_, latency) in SERVICES.items():
+        parser.add_argument(f"--{service}-latency", type=float, default=latency)
+        parser.add_argument(f"--{service}-errors", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--record", help="append all figures to this JSON-lines file")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1 @@
+"""Building blocks behind the Multi-Agent Job Alert System web UI."""
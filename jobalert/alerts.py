@@ -0,0 +1,300 @@
+"""Alert dispatch: immediate mails for strong matches, periodic digests for the rest
+
+The "Send a message" node mails every approved job on its own, although
+Agent 4 already marks each one ``IMMEDIATE`` or ``BATCH``. The dispatcher
+honours that field: immediate jobs are mailed as soon as their run ends,
+batch jobs are queued per recipient in SQLite and go out as one digest
+per recipient every ``digest_interval`` seconds. Each send, however many
+messages it holds, uses one SMTP connection. Every alert that goes out is
+recorded per recipient with the job's content hash, so a job found again
+by later runs is only alerted again once its posting changes.
+"""
+import hashlib
+import json
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+
+from jobalert.scheduler import parse_schedule
+from jobalert.tracing import GMAIL, span
+
+IMMEDIATE = "IMMEDIATE"
+BATCH = "BATCH"
+
+# Job fields whose change makes an alerted job worth alerting again
+ALERT_FIELDS = ('title', 'company', 'location', 'description', 'url')
+
+
+def alert_hash(job):
+    content = json.dumps({field: job.get(field) for field in ALERT_FIELDS},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class SmtpMailer:
+    """Sends a batch of messages over one SMTP connection"""
+
+    def __init__(self, host, port=587, sender=None, username=None, password=None, starttls=None, timeout=30):
+        self.host = host
+        self.port = int(port)
+        self.sender = sender or username or "job-alerts@localhost"
+        self.username = username
+        self.password = password
+        # STARTTLS on the submission port unless told otherwise
+        self.starttls = self.port == 587 if starttls is None else starttls
+        self.timeout = timeout
+        self.connections = 0
+        self.messages_sent = 0
+
+    def send(self, messages, on_sent=None):
+        """Send (recipient, subject, body) messages; returns the number sent.
+
+        ``on_sent(index)`` is called after each message is accepted, so a
+        caller can tell which messages went out before an error.
+        """
+        if not messages:
+            return 0
+        with span(GMAIL, items=len(messages), host=self.host):
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                self.connections += 1
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                for index, (recipient, subject, body) in enumerate(messages):
+                    message = EmailMessage()
+                    message['From'] = self.sender
+                    message['To'] = recipient
+                    message['Subject'] = subject
+                    message.set_content(body)
+                    smtp.send_message(message)
+                    self.messages_sent += 1
+                    if on_sent is not None:
+                        on_sent(index)
+        return len(messages)
+
+
+def immediate_message(job):
+    """Subject and body of a single-job alert, as composed by Agent 5"""
+    subject = job.get('alert_subject') or f"Job Alert: {job['title']} at {job['company']}"
+    body = job.get('alert_body') or (
+        f"🎯 New High-Match Job Found!\n\nJob: {job['title']}\nCompany: {job['company']}\n"
+        f"Location: {job.get('location')}\nMatch Score: {job['relevance_score']}%\n\n"
+        f"Apply here: {job['url']}"
+    )
+    return subject, body
+
+
+def digest_message(jobs):
+    """Subject and body of one digest, best matches first"""
+    jobs = sorted(jobs, key=lambda job: job['relevance_score'], reverse=True)
+    lines = [f"📬 {len(jobs)} new or updated job matches since your last digest", ""]
+    for job in jobs:
+        lines.append(f"⭐ {job['relevance_score']}% - {job['title']} at {job['company']} ({job.get('location')})")
+        if job.get('ai_summary'):
+            lines.append(f"   {job['ai_summary']}")
+        lines.append(f"   🔗 {job['url']}")
+        lines.append("")
+    lines.append("--- Powered by the Multi-Agent Job Alert System")
+    subject = f"📬 Job Alert Digest: {len(jobs)} new match{'es' if len(jobs) != 1 else ''}"
+    return subject, "\n".join(lines)
+
+
+class AlertDispatcher:
+    """Routes approved jobs by ``alert_type`` and sends the digests on a daemon thread.
+
+    Jobs queued for a recipient's digest are kept once per URL, so a job
+    found again before the digest goes out is not listed twice, and jobs
+    already alerted to a recipient are skipped until their content changes.
+    With a ``results_store`` the mailed jobs are marked ALERT_SENT.
+    """
+
+    def __init__(self, mailer, path=":memory:", digest_interval=3600, results_store=None):
+        self.mailer = mailer
+        self.path = path
+        self.digest_interval = digest_interval
+        self.results_store = results_store
+        self.immediate_sent = 0
+        self.digests_sent = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pending_alerts (
+                recipient TEXT NOT NULL,
+                url TEXT NOT NULL,
+                job TEXT NOT NULL,
+                queued_at REAL NOT NULL,
+                PRIMARY KEY (recipient, url)
+            );
+            CREATE TABLE IF NOT EXISTS sent_alerts (
+                recipient TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                sent_at REAL NOT NULL,
+                PRIMARY KEY (recipient, url, content_hash)
+            );
+            CREATE INDEX IF NOT EXISTS sent_alerts_sent_at ON sent_alerts (sent_at);
+        """)
+        self._db.commit()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _mark_sent(self, jobs):
+        if self.results_store is not None and jobs:
+            self.results_store.set_status([job['url'] for job in jobs], 'ALERT_SENT')
+
+    def _was_sent(self, recipient, job):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM sent_alerts WHERE recipient = ? AND url = ? AND content_hash = ?",
+                (recipient, job['url'], alert_hash(job))
+            ).fetchone() is not None
+
+    def _queue(self, entries, now):
+        """Queue (recipient, job) entries for the digests"""
+        with self._lock:
+            self._db.executemany("""
+                INSERT INTO pending_alerts (recipient, url, job, queued_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(recipient, url) DO UPDATE SET job = excluded.job
+            """, [(recipient, job['url'], json.dumps(job, ensure_ascii=False, default=str), now)
+                  for recipient, job in entries])
+            self._db.commit()
+
+    def _record_sent(self, entries, pending=()):
+        """Remember (recipient, job) entries as alerted and drop the given (recipient, url, queued_at) rows"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sent_alerts (recipient, url, content_hash, sent_at) VALUES (?, ?, ?, ?)",
+                [(recipient, job['url'], alert_hash(job), now) for recipient, job in entries]
+            )
+            self._db.executemany(
+                "DELETE FROM pending_alerts WHERE recipient = ? AND url = ? AND queued_at = ?", pending
+            )
+            self._db.commit()
+        self._mark_sent([job for _, job in entries])
+
+    def dispatch(self, deliveries):
+        """Mail the immediate jobs now and queue the rest for the digests.
+
+        ``deliveries`` is a list of (recipient, jobs); all immediate mails
+        share one connection. Jobs already alerted to a recipient are
+        skipped. Returns (mails sent, jobs queued). Raises on SMTP errors,
+        after queueing the immediate jobs not mailed yet for the digest.
+        """
+        immediate, queued = [], []
+        picked = set()
+        for recipient, jobs in deliveries:
+            if not recipient:
+                continue
+            for job in jobs:
+                if (recipient, job['url']) in picked or self._was_sent(recipient, job):
+                    continue
+                picked.add((recipient, job['url']))
+                (immediate if job.get('alert_type') == IMMEDIATE else queued).append((recipient, job))
+        now = time.time()
+        if queued:
+            self._queue(queued, now)
+        delivered = []
+        try:
+            self.mailer.send([(recipient, *immediate_message(job)) for recipient, job in immediate],
+                             on_sent=lambda index: delivered.append(immediate[index]))
+        except Exception:
+            # Not lost: what did not go out waits for the next digest
+            self._queue(immediate[len(delivered):], now)
+            raise
+        finally:
+            self.immediate_sent += len(delivered)
+            self._record_sent(delivered)
+        return len(delivered), len(queued)
+
+    def pending(self):
+        """Jobs waiting for a digest"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pending_alerts").fetchone()[0]
+
+    def send_digests(self):
+        """Send one digest per recipient with queued jobs; returns the number of digests sent.
+
+        Each recipient's jobs leave the queue as soon as their digest is
+        accepted, so an error part way only keeps the unsent digests queued.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT recipient, url, job, queued_at FROM pending_alerts ORDER BY recipient, queued_at"
+            ).fetchall()
+        if not rows:
+            return 0
+        by_recipient = {}
+        for recipient, url, job, queued_at in rows:
+            by_recipient.setdefault(recipient, []).append((url, json.loads(job), queued_at))
+        recipients = list(by_recipient)
+
+        def digest_sent(index):
+            recipient = recipients[index]
+            entries = by_recipient[recipient]
+            # Only the jobs that were in this digest; newer ones wait for the next
+            self._record_sent([(recipient, job) for _, job, _ in entries],
+                              [(recipient, url, queued_at) for url, _, queued_at in entries])
+            self.digests_sent += 1
+
+        return self.mailer.send(
+            [(recipient, *digest_message([job for _, job, _ in by_recipient[recipient]])) for recipient in recipients],
+            on_sent=digest_sent
+        )
+
+    def prune(self, older_than):
+        """Forget alerts sent more than ``older_than`` seconds ago; returns the count"""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM sent_alerts WHERE sent_at < ?", (time.time() - older_than,))
+            self._db.commit()
+        return cursor.rowcount
+
+    def _loop(self):
+        while not self._stop.wait(self.digest_interval):
+            try:
+                self.send_digests()
+                self.last_error = None
+            except Exception as e:
+                # Jobs stay queued and go out with the next digest
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def start(self):
+        """Send digests every ``digest_interval`` seconds on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="alert-digests", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def dispatcher_from_env(path=":memory:", results_store=None):
+    """AlertDispatcher for the relay in JOBALERT_SMTP_HOST, or None when no relay is configured.
+
+    JOBALERT_SMTP_PORT, JOBALERT_SMTP_USER, JOBALERT_SMTP_PASSWORD and
+    JOBALERT_SMTP_FROM configure the relay; JOBALERT_DIGEST_EVERY the
+    digest schedule ("@hourly" by default, or e.g. "30m", "@daily").
+    """
+    host = os.environ.get('JOBALERT_SMTP_HOST')
+    if not host:
+        return None
+    mailer = SmtpMailer(
+        host,
+        port=os.environ.get('JOBALERT_SMTP_PORT', 587),
+        sender=os.environ.get('JOBALERT_SMTP_FROM'),
+        username=os.environ.get('JOBALERT_SMTP_USER'),
+        password=os.environ.get('JOBALERT_SMTP_PASSWORD')
+    )
+    interval = parse_schedule(os.environ.get('JOBALERT_DIGEST_EVERY', "@hourly"))
+    return AlertDispatcher(mailer, path=path, digest_interval=interval, results_store=results_store)
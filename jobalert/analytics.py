@@ -0,0 +1,268 @@
+"""Run recording and the computed analytics behind the System Analytics tab
+
+Every run (local pipeline or n8n webhook) is appended to SQLite with one
+row per stage. AnalyticsEngine keeps rollups (counts, fixed-bucket
+latency histograms, a score histogram and jobs per day) and on refresh
+only folds in the rows added since the previous refresh, so updating the
+dashboard costs O(new runs) rather than O(history).
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Log-spaced latency buckets from 1ms to 10min; percentiles are read off the
+# cumulative counts, accurate to one bucket (~6%)
+LATENCY_EDGES = np.concatenate([[0.0], np.geomspace(0.001, 600, 220), [np.inf]])
+
+SCORE_BINS = 11  # 0-9, 10-19, ..., 90-99, 100
+
+
+class RunRecorder:
+    """Append-only log of runs and their stages"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pipeline_runs (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                day TEXT NOT NULL,
+                duration REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                jobs_scraped INTEGER NOT NULL DEFAULT 0,
+                jobs_analyzed INTEGER NOT NULL DEFAULT 0,
+                jobs_approved INTEGER NOT NULL DEFAULT 0,
+                scores TEXT NOT NULL DEFAULT '[]',
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stage_runs (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                duration REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                jobs_out INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._db.commit()
+
+    def record_run(self, run_id, backend, started_at, duration, ok, stages=(),
+                   jobs_scraped=0, jobs_analyzed=0, jobs_approved=0, scores=(), error=None):
+        """Store one run; ``stages`` holds (stage name, duration, ok, jobs out) tuples"""
+        day = datetime.fromtimestamp(started_at).strftime('%Y-%m-%d')
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pipeline_runs (run_id, backend, started_at, day, duration, ok, jobs_scraped, "
+                "jobs_analyzed, jobs_approved, scores, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, backend, started_at, day, duration, int(ok), jobs_scraped, jobs_analyzed,
+                 jobs_approved, json.dumps([int(score) for score in scores]), error)
+            )
+            self._db.executemany(
+                "INSERT INTO stage_runs (run_id, stage, duration, ok, jobs_out) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, stage, stage_duration, int(stage_ok), jobs_out)
+                 for stage, stage_duration, stage_ok, jobs_out in stages]
+            )
+            self._db.commit()
+
+    def read_since(self, last_run_row, last_stage_row):
+        """New run and stage rows as DataFrames"""
+        import pandas as pd
+
+        with self._lock:
+            runs = pd.read_sql_query(
+                "SELECT * FROM pipeline_runs WHERE id > ? ORDER BY id", self._db, params=(last_run_row,)
+            )
+            stages = pd.read_sql_query(
+                "SELECT * FROM stage_runs WHERE id > ? ORDER BY id", self._db, params=(last_stage_row,)
+            )
+        return runs, stages
+
+
+def histogram_percentile(counts, pct):
+    """Upper bucket edge below which pct% of the samples fall"""
+    total = counts.sum()
+    if total == 0:
+        return None
+    index = int(np.searchsorted(np.cumsum(counts), pct / 100 * total))
+    return float(LATENCY_EDGES[min(index + 1, len(LATENCY_EDGES) - 2)])
+
+
+class AnalyticsEngine:
+    """Incrementally maintained rollups over the RunRecorder tables"""
+
+    def __init__(self, recorder):
+        # pandas is imported on first use, not when the app module is imported
+        import pandas as pd
+
+        self.recorder = recorder
+        self._lock = threading.Lock()
+        self.last_run_row = 0
+        self.last_stage_row = 0
+        self.runs = 0
+        self.runs_ok = 0
+        self.run_latency = np.zeros(len(LATENCY_EDGES) - 1, dtype=np.int64)
+        self.jobs_scraped = 0
+        self.jobs_analyzed = 0
+        self.jobs_approved = 0
+        self.score_counts = np.zeros(SCORE_BINS, dtype=np.int64)
+        self.score_sum = 0
+        self.jobs_per_day = pd.Series(dtype=np.int64)
+        self.runs_by_backend = pd.Series(dtype=np.int64)
+        # stage -> {'calls', 'ok', 'latency' histogram}, in first-seen order
+        self.stages = {}
+
+    def refresh(self):
+        """Fold in rows recorded since the previous refresh"""
+        with self._lock:
+            runs, stages = self.recorder.read_since(self.last_run_row, self.last_stage_row)
+            if not runs.empty:
+                self._add_runs(runs)
+                self.last_run_row = int(runs['id'].iloc[-1])
+            if not stages.empty:
+                self._add_stages(stages)
+                self.last_stage_row = int(stages['id'].iloc[-1])
+
+    def _add_runs(self, runs):
+        self.runs += len(runs)
+        self.runs_ok += int(runs['ok'].sum())
+        self.run_latency += np.histogram(runs['duration'].to_numpy(), bins=LATENCY_EDGES)[0]
+        self.jobs_scraped += int(runs['jobs_scraped'].sum())
+        self.jobs_analyzed += int(runs['jobs_analyzed'].sum())
+        self.jobs_approved += int(runs['jobs_approved'].sum())
+
+        scores = np.fromiter(
+            (score for encoded in runs['scores'] for score in json.loads(encoded)), dtype=np.int64
+        )
+        if scores.size:
+            self.score_counts += np.bincount(np.clip(scores, 0, 100) // 10, minlength=SCORE_BINS)
+            self.score_sum += int(scores.sum())
+
+        self.jobs_per_day = self.jobs_per_day.add(
+            runs.groupby('day')['jobs_analyzed'].sum(), fill_value=0
+        ).astype(np.int64)
+        self.runs_by_backend = self.runs_by_backend.add(
+            runs.groupby('backend').size(), fill_value=0
+        ).astype(np.int64)
+
+    def _add_stages(self, stages):
+        for stage, rows in stages.groupby('stage', sort=False):
+            rollup = self.stages.setdefault(stage, {
+                'calls': 0,
+                'ok': 0,
+                'latency': np.zeros(len(LATENCY_EDGES) - 1, dtype=np.int64)
+            })
+            rollup['calls'] += len(rows)
+            rollup['ok'] += int(rows['ok'].sum())
+            rollup['latency'] += np.histogram(rows['duration'].to_numpy(), bins=LATENCY_EDGES)[0]
+
+    def snapshot(self):
+        """Current metrics as plain values"""
+        with self._lock:
+            scored = int(self.score_counts.sum())
+            return {
+                'runs': self.runs,
+                'runs_ok': self.runs_ok,
+                'success_rate': self.runs_ok / self.runs if self.runs else None,
+                'run_p50': histogram_percentile(self.run_latency, 50),
+                'run_p95': histogram_percentile(self.run_latency, 95),
+                'jobs_scraped': self.jobs_scraped,
+                'jobs_analyzed': self.jobs_analyzed,
+                'jobs_approved': self.jobs_approved,
+                'average_score': self.score_sum / scored if scored else None,
+                'score_counts': self.score_counts.copy(),
+                'above_70': int(self.score_counts[7:].sum()) / scored if scored else None,
+                'above_90': int(self.score_counts[9:].sum()) / scored if scored else None,
+                'jobs_per_day': self.jobs_per_day.sort_index().copy(),
+                'runs_by_backend': self.runs_by_backend.copy(),
+                'stages': {
+                    stage: {
+                        'calls': rollup['calls'],
+                        'success_rate': rollup['ok'] / rollup['calls'] if rollup['calls'] else None,
+                        'p50': histogram_percentile(rollup['latency'], 50),
+                        'p95': histogram_percentile(rollup['latency'], 95),
+                        'p99': histogram_percentile(rollup['latency'], 99)
+                    }
+                    for stage, rollup in self.stages.items()
+                }
+            }
+
+
+def _pct(value):
+    return "n/a" if value is None else f"{value * 100:.1f}%"
+
+
+def _secs(value):
+    return "n/a" if value is None else f"{value:.2f}s"
+
+
+def render_analytics(snapshot, current_time=None):
+    """Format a snapshot as the analytics dashboard text"""
+    current_time = current_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    lines = [
+        "",
+        "📊 MULTI-AGENT SYSTEM ANALYTICS DASHBOARD",
+        "",
+        "🤖 AGENT PERFORMANCE METRICS:",
+        "┌─────────────────────────────┬──────────────────────────┐"
+    ]
+    if snapshot['stages']:
+        for stage, metrics in snapshot['stages'].items():
+            lines.append(f"│ {stage:<27} │ {_pct(metrics['success_rate']):>6} Success ({metrics['calls']:>5}) │")
+    else:
+        lines.append(f"│ {'No runs recorded yet':<27} │ {'':<24} │")
+    lines.append("└─────────────────────────────┴──────────────────────────┘")
+
+    backends = ", ".join(f"{backend}: {count:,}" for backend, count in snapshot['runs_by_backend'].items())
+    lines += [
+        "",
+        "⚡ PROCESSING STATISTICS:",
+        f"• Total Runs: {snapshot['runs']:,}" + (f" ({backends})" if backends else ""),
+        f"• Overall System Success Rate: {_pct(snapshot['success_rate'])}",
+        f"• Run Time: p50 {_secs(snapshot['run_p50'])} | p95 {_secs(snapshot['run_p95'])}",
+        f"• Jobs Scraped: {snapshot['jobs_scraped']:,}",
+        f"• Jobs Analyzed: {snapshot['jobs_analyzed']:,}",
+        f"• Jobs Approved: {snapshot['jobs_approved']:,}",
+        "",
+        "🎯 INTELLIGENCE METRICS:",
+        "• Average Relevance Score: " + ("n/a" if snapshot['average_score'] is None
+                                         else f"{snapshot['average_score']:.1f}%"),
+        f"• Jobs Above 70% Relevance: {_pct(snapshot['above_70'])}",
+        f"• Perfect Matches (90%+): {_pct(snapshot['above_90'])}",
+        "",
+        "📶 SCORE DISTRIBUTION:"
+    ]
+    counts = snapshot['score_counts']
+    peak = counts.max() if counts.size else 0
+    for index, count in enumerate(counts):
+        label = "100" if index == SCORE_BINS - 1 else f"{index * 10:>2}-{index * 10 + 9:<2}"
+        bar = "█" * int(round(30 * count / peak)) if peak else ""
+        lines.append(f"• {label:>6}% │ {bar} {count:,}")
+
+    lines += ["", "📈 DAILY PERFORMANCE (jobs analyzed):"]
+    jobs_per_day = snapshot['jobs_per_day']
+    if jobs_per_day.empty:
+        lines.append("• No runs recorded yet")
+    for day, count in jobs_per_day.tail(7).items():
+        lines.append(f"• {day}: {count:,}")
+
+    lines += ["", "⏱️ RESPONSE TIME ANALYSIS (p50 | p95 | p99):"]
+    if not snapshot['stages']:
+        lines.append("• No runs recorded yet")
+    for stage, metrics in snapshot['stages'].items():
+        lines.append(f"• {stage}: {_secs(metrics['p50'])} | {_secs(metrics['p95'])} | {_secs(metrics['p99'])}")
+
+    lines += [
+        "",
+        f"🔄 LAST SYSTEM UPDATE: {current_time}",
+        ""
+    ]
+    return "\n".join(lines)
+
@@ -0,0 +1,116 @@
+"""Content-addressed cache of AI relevance analyses
+
+Keys hash everything that can change the model's verdict (the job content
+sent in the prompt, the prompts themselves and the model id), so an
+unchanged posting re-uses its earlier analysis and any edit to the job,
+the target skills or the model yields a fresh call.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def analysis_key(job, prompt, model):
+    """Hash of the job content, the prompt template and the model id"""
+    material = json.dumps([
+        job.get('url') or job.get('id'),
+        job.get('title'),
+        job.get('company'),
+        job.get('location'),
+        job.get('description'),
+        prompt,
+        model
+    ], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache with TTL expiry, LRU eviction and hit/miss counters"""
+
+    def __init__(self, path=":memory:", ttl=7 * 24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache(last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        """Return the cached analysis for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                self._db.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE analysis_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, analysis):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, analysis, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(analysis, ensure_ascii=False), now, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        size = self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        overflow = size - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM analysis_cache WHERE key IN "
+                "(SELECT key FROM analysis_cache ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM analysis_cache")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,139 @@
+"""Single-flight coalescing of identical concurrent searches
+
+When several users launch the same search while a run for it is still in
+flight, only the first caller (the leader) starts the upstream work; the
+others join the leader's flight and receive the same results as they are
+produced, including an exception if the run fails. A flight ends with its
+run, so a search launched after it finishes starts a fresh run.
+"""
+import asyncio
+import threading
+
+from jobalert.fetcher import search_terms
+
+
+def search_key(keywords, location, min_relevance):
+    """Normalised search parameters: keyword order, case and spacing don't matter"""
+    terms = tuple(sorted({term.lower() for term in search_terms(keywords)}))
+    return terms, " ".join((location or "").lower().split()), int(min_relevance or 0)
+
+
+class _Flight:
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Shares one in-flight run per key among concurrent callers.
+
+    ``stream`` coalesces async generators, ``call`` coroutines and ``do``
+    blocking functions. Async flights are per event loop. ``leaders`` and
+    ``joined`` count the callers that started work and those that shared
+    it.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.leaders = 0
+        self.joined = 0
+        self._flights = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    async def _pump(self, flight_key, flight, items):
+        try:
+            async for item in items:
+                flight.items.append(item)
+                flight.notify()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            del self._flights[flight_key]
+            flight.notify()
+
+    async def stream(self, key, factory):
+        """Async generator over ``factory()``'s items, shared with concurrent callers of the same key"""
+        if not self.enabled:
+            async for item in factory():
+                yield item
+            return
+
+        flight_key = (key, asyncio.get_running_loop())
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            self.leaders += 1
+            flight = self._flights[flight_key] = _Flight()
+            # The run belongs to the flight, not to the leader: it finishes
+            # even if the caller that started it goes away
+            flight.task = asyncio.ensure_future(self._pump(flight_key, flight, factory()))
+        else:
+            self.joined += 1
+
+        index = 0
+        while True:
+            while index < len(flight.items):
+                yield flight.items[index]
+                index += 1
+            if flight.done:
+                if flight.error is not None:
+                    raise flight.error
+                return
+            await flight.changed.wait()
+
+    async def call(self, key, factory):
+        """Await ``factory()`` once for all concurrent callers of the same key"""
+        async def once():
+            yield await factory()
+
+        results = self.stream(key, once)
+        try:
+            return await results.__anext__()
+        finally:
+            await results.aclose()
+
+    def do(self, key, fn):
+        """Blocking variant of ``call`` for callers outside an event loop"""
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.leaders += 1
+                call = self._calls[key] = _Call()
+            else:
+                self.joined += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self):
+        return len(self._flights) + len(self._calls)
@@ -0,0 +1,222 @@
+"""Collapsing reposted and cross-listed postings before they reach the LLM
+
+A posting's id is its slug, so the same role reposted under a new slug,
+or listed by several agencies, used to be analysed and alerted again.
+Each job gets a signature: an exact key of its normalised title, company
+and location, and a MinHash of the word pairs of its cleaned description.
+A job is a duplicate when an earlier one has the same exact key, or a
+description with an estimated Jaccard similarity of at least
+``MIN_SIMILARITY`` and a similar title.
+
+Signatures persist in SQLite. The MinHash is also cut into ``BANDS``
+bands, each hashed to an indexed bucket (locality-sensitive hashing):
+near-identical descriptions share a bucket with high probability and
+unrelated ones almost never do, so a lookup is one indexed query plus a
+check of the few candidates it returns, not a scan of every posting seen.
+Every signature belongs to a ``scope`` (the search that processed it), and
+lookups only see their own scope's signatures.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from jobalert.matching import tokenize
+
+PERMUTATIONS = 128
+BANDS = 32
+ROWS = PERMUTATIONS // BANDS
+MIN_SIMILARITY = 0.6
+# Descriptions shorter than this (in words) carry too little text to compare
+MIN_WORDS = 8
+# Word overlap two titles need before similar descriptions count as the same role
+MIN_TITLE_OVERLAP = 0.6
+
+# Fixed seed: signatures must stay comparable across runs and restarts
+_rng = np.random.default_rng(20240601)
+_MERSENNE = np.uint64((1 << 61) - 1)
+_A = _rng.integers(1, (1 << 61) - 1, PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 61) - 1, PERMUTATIONS, dtype=np.uint64)
+
+# Gender tags of German postings: (m/w/d), (f/m/x), (all genders), m/w/d, ...
+_GENDER_RE = re.compile(r'\(\s*(?:[mwfdx](?:\s*[/|,*]\s*[mwfdx])+|all genders?|gn)\s*\)|\b[mwf]\s*/\s*[mwf]\s*/\s*[dx]\b')
+_TITLE_ABBREVIATIONS = {"sr": "senior", "jr": "junior", "dev": "developer", "eng": "engineer", "mgr": "manager"}
+_COMPANY_SUFFIXES = {"gmbh", "mbh", "ag", "se", "kg", "co", "kgaa", "ug", "inc", "ltd", "llc", "plc",
+                     "bv", "b.v", "nv", "sarl", "sas", "haftungsbeschränkt"}
+
+
+def normalize_title(title):
+    tokens = tokenize(_GENDER_RE.sub(" ", (title or "").lower()))
+    return " ".join(_TITLE_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def normalize_company(company):
+    return " ".join(token for token in tokenize(company) if token not in _COMPANY_SUFFIXES)
+
+
+def normalize_location(location):
+    return " ".join(tokenize(location))
+
+
+def exact_key(job):
+    key = "|".join((normalize_title(job.get('title')), normalize_company(job.get('company')),
+                    normalize_location(job.get('location'))))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def minhash(text):
+    """MinHash of a text's word pairs as a uint64 array, or None for texts under MIN_WORDS words"""
+    words = tokenize(text)
+    if len(words) < MIN_WORDS:
+        return None
+    shingles = {f"{first} {second}" for first, second in zip(words, words[1:])}
+    hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles], dtype=np.uint64)
+    # One row per permutation (a * x + b) mod p; wrap-around in uint64 is part of the hash family
+    with np.errstate(over='ignore'):
+        permuted = (hashes[None, :] * _A[:, None] + _B[:, None]) % _MERSENNE
+    return permuted.min(axis=1)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two MinHashes"""
+    return float(np.count_nonzero(first == second)) / PERMUTATIONS
+
+
+def buckets(signature_hash):
+    """One LSH bucket per band, as signed 64-bit integers for SQLite"""
+    return [
+        int.from_bytes(hashlib.blake2b(bytes([band]) + signature_hash[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                       digest_size=8).digest(), 'big', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def title_overlap(first, second):
+    first, second = set(first.split()), set(second.split())
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class Signature:
+    def __init__(self, url, key, minhash, title):
+        self.url = url
+        self.key = key
+        self.minhash = minhash
+        self.title = title
+
+
+def signature(job):
+    return Signature(job['url'], exact_key(job), minhash(job.get('description')), normalize_title(job.get('title')))
+
+
+class DedupIndex:
+    """Signatures of processed postings per scope, looked up by exact key and LSH bucket"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lookups = 0
+        self.candidates_checked = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(job_signatures)")]
+        if columns and 'scope' not in columns:
+            # Signatures from before scoping can't be told apart by search; start over
+            self._db.executescript("DROP TABLE job_signatures; DROP TABLE IF EXISTS signature_buckets;")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS job_signatures (
+                scope TEXT NOT NULL,
+                url TEXT NOT NULL,
+                exact_key TEXT NOT NULL,
+                title TEXT NOT NULL,
+                minhash BLOB,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (scope, url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_signatures_key ON job_signatures(scope, exact_key);
+            CREATE INDEX IF NOT EXISTS idx_job_signatures_seen_at ON job_signatures(seen_at);
+            CREATE TABLE IF NOT EXISTS signature_buckets (
+                scope TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_signature_buckets_bucket ON signature_buckets(scope, bucket);
+            CREATE INDEX IF NOT EXISTS idx_signature_buckets_url ON signature_buckets(scope, url);
+        """)
+        self._db.commit()
+
+    def find(self, sig, scope=""):
+        """URL of an earlier posting of ``scope`` that ``sig`` duplicates, or None.
+
+        A posting never duplicates itself: rows with the same URL are
+        ignored (re-processing changed postings is the seen index's call).
+        """
+        with self._lock:
+            self.lookups += 1
+            row = self._db.execute(
+                "SELECT url FROM job_signatures WHERE scope = ? AND exact_key = ? AND url != ? LIMIT 1",
+                (scope, sig.key, sig.url)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            if sig.minhash is None:
+                return None
+            candidates = self._db.execute(f"""
+                SELECT url, title, minhash FROM job_signatures WHERE scope = ? AND url IN (
+                    SELECT url FROM signature_buckets WHERE scope = ? AND bucket IN ({', '.join('?' * BANDS)})
+                ) AND url != ?
+            """, (scope, scope, *buckets(sig.minhash), sig.url)).fetchall()
+        self.candidates_checked += len(candidates)
+        for url, title, stored in candidates:
+            if title_overlap(title, sig.title) >= MIN_TITLE_OVERLAP \
+                    and similarity(np.frombuffer(stored, dtype=np.uint64), sig.minhash) >= MIN_SIMILARITY:
+                return url
+        return None
+
+    def add(self, signatures, scope="", seen_at=None):
+        seen_at = seen_at or time.time()
+        signatures = list(signatures)
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM signature_buckets WHERE scope = ? AND url = ?", [(scope, sig.url) for sig in signatures]
+            )
+            self._db.executemany("""
+                INSERT INTO job_signatures (scope, url, exact_key, title, minhash, seen_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope, url) DO UPDATE SET exact_key = excluded.exact_key, title = excluded.title,
+                    minhash = excluded.minhash, seen_at = excluded.seen_at
+            """, [
+                (scope, sig.url, sig.key, sig.title, None if sig.minhash is None else sig.minhash.tobytes(), seen_at)
+                for sig in signatures
+            ])
+            self._db.executemany(
+                "INSERT INTO signature_buckets (scope, bucket, url) VALUES (?, ?, ?)",
+                [(scope, bucket, sig.url) for sig in signatures if sig.minhash is not None
+                 for bucket in buckets(sig.minhash)]
+            )
+            self._db.commit()
+
+    def prune(self, older_than):
+        """Forget signatures not seen for ``older_than`` seconds; returns the count"""
+        cutoff = time.time() - older_than
+        with self._lock:
+            self._db.execute("""
+                DELETE FROM signature_buckets WHERE (scope, url) IN (
+                    SELECT scope, url FROM job_signatures WHERE seen_at < ?
+                )
+            """, (cutoff,))
+            cursor = self._db.execute("DELETE FROM job_signatures WHERE seen_at < ?", (cutoff,))
+            self._db.commit()
+        return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM job_signatures").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,186 @@
+"""Arbeitnow job board fetcher: parallel pagination with conditional requests
+
+The job board paginates with ``?page=N`` and a ``links.next`` URL but does
+not report a total, so pages are claimed from a shared counter by a
+bounded pool of workers until one of them finds the last page. Each page
+is parsed and its postings handed to the consumer as soon as it arrives.
+Pages answered with 304 Not Modified are replayed from the validator
+store, so unchanged pages cost a round trip but no transfer.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+from urllib.parse import urlencode
+
+from jobalert.http import arequest
+from jobalert.tracing import JOB_BOARD, span
+
+ARBEITNOW_API = "https://www.arbeitnow.com/api/job-board-api"
+
+
+class ValidatorStore:
+    """url -> (ETag, Last-Modified, postings) of the last 200 response, in SQLite"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS page_validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body FROM page_validators WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'body': json.loads(row[2])}
+
+    def put(self, url, etag, last_modified, body):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO page_validators (url, etag, last_modified, body) VALUES (?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(body, ensure_ascii=False))
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+async def gather_or_cancel(coroutines):
+    """Like asyncio.gather, but the first failure cancels the other tasks and waits for them to stop"""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def search_terms(keywords):
+    """Split the UI's comma-separated keywords into one search per term"""
+    terms = [term.strip() for term in (keywords or "").split(',')]
+    return [term for term in terms if term] or [""]
+
+
+class ArbeitnowFetcher:
+    """Streams postings for a keywords/location search across all result pages"""
+
+    def __init__(self, base_url=ARBEITNOW_API, workers=4, max_pages=20, validators=None, timeout=30):
+        self.base_url = base_url
+        self.workers = workers
+        self.max_pages = max_pages
+        self.validators = validators
+        self.timeout = timeout
+        # Per-process counters, useful for benchmarks and the health view
+        self.pages_fetched = 0
+        self.pages_not_modified = 0
+
+    def page_url(self, term, location, page):
+        params = {'page': page}
+        if term:
+            params['search'] = term
+        if location:
+            params['location'] = location
+        return f"{self.base_url}?{urlencode(params)}"
+
+    async def fetch_page(self, url):
+        """Return the decoded page body, revalidating against the stored copy"""
+        cached = self.validators.get(url) if self.validators is not None else None
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        with span(JOB_BOARD, url=url) as trace_span:
+            response = await arequest("GET", url, headers=headers, timeout=self.timeout)
+            trace_span.attributes['status_code'] = response.status_code
+            if response.status_code == 304 and cached:
+                self.pages_not_modified += 1
+                trace_span.items = len(cached['body'].get('data') or [])
+                return cached['body']
+            response.raise_for_status()
+            body = response.json()
+            trace_span.items = len(body.get('data') or [])
+        self.pages_fetched += 1
+
+        if self.validators is not None:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.validators.put(url, etag, last_modified, body)
+        return body
+
+    async def postings(self, keywords="", location=""):
+        """Async generator of raw postings, yielded page by page as pages arrive.
+
+        Postings listed under several search terms are yielded once.
+        """
+        queue = asyncio.Queue()
+        done = object()
+        terms = search_terms(keywords)
+
+        async def walk(term):
+            next_page = 1
+            last_page = self.max_pages
+
+            async def worker():
+                nonlocal next_page, last_page
+                while next_page <= last_page:
+                    page = next_page
+                    next_page += 1
+                    body = await self.fetch_page(self.page_url(term, location, page))
+                    data = body.get('data') or []
+                    meta = body.get('meta') or {}
+                    if meta.get('last_page'):
+                        last_page = min(last_page, meta['last_page'])
+                    if not data or not (body.get('links') or {}).get('next'):
+                        last_page = min(last_page, page)
+                    if page <= last_page:
+                        await queue.put(data)
+
+            await gather_or_cancel(worker() for _ in range(self.workers))
+
+        async def produce():
+            try:
+                await gather_or_cancel(walk(term) for term in terms)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        seen = set()
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for posting in item:
+                    key = posting.get('slug') or posting.get('url')
+                    if key in seen:
+                        continue
+                    if key:
+                        seen.add(key)
+                    yield posting
+        finally:
+            # No page requests may outlive the consumer
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,162 @@
+"""Shared HTTP clients used for every outbound call (n8n webhook, job board, LLM)
+
+All outbound traffic goes through one pooled keep-alive ``requests.Session``
+(blocking callers) or one ``httpx.AsyncClient`` per event loop (async
+callers), so repeat calls to the same host reuse TCP+TLS connections
+instead of paying a new handshake per click. An async client can only be
+closed on its own loop, so whoever owns a loop closes its client before
+closing the loop (``run_async`` does it for one-off runs).
+"""
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'MultiAgent-UI/1.0'
+}
+
+
+class HttpPoolConfig:
+    """Connection pool sizing shared by the sync session and the async clients"""
+
+    def __init__(self, max_connections=200, max_keepalive_connections=50,
+                 per_host_limit=20, host_pools=10, keepalive_expiry=30.0):
+        # Upper bound on open connections across all hosts (async client)
+        self.max_connections = max_connections
+        # Idle connections kept open for reuse (async client)
+        self.max_keepalive_connections = max_keepalive_connections
+        # Concurrent connections to any single host (sync and async)
+        self.per_host_limit = per_host_limit
+        # Number of distinct hosts the sync session keeps a pool for
+        self.host_pools = host_pools
+        # Seconds an idle async connection is kept before being closed
+        self.keepalive_expiry = keepalive_expiry
+
+
+_config = HttpPoolConfig()
+_session = None
+_session_lock = threading.Lock()
+
+# One async pool per event loop: httpx connections and asyncio semaphores
+# cannot cross loops
+_async_pools = {}
+
+
+class _AsyncPool:
+    def __init__(self, config):
+        self.client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            follow_redirects=True
+        )
+        self.per_host_limit = config.per_host_limit
+        self.host_slots = {}
+
+    def slots_for(self, url):
+        host = urlsplit(str(url)).netloc
+        slots = self.host_slots.get(host)
+        if slots is None:
+            slots = self.host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slots
+
+
+def configure_http(config):
+    """Replace the pool configuration; existing pools are rebuilt on next use"""
+    global _config, _session
+    with _session_lock:
+        _config = config
+        if _session is not None:
+            _session.close()
+            _session = None
+    for loop, pool in list(_async_pools.items()):
+        _close_pool(loop, pool)
+    _async_pools.clear()
+
+
+def get_http_config():
+    return _config
+
+
+def get_session():
+    """Return the process-wide pooled keep-alive session"""
+    global _session
+    if _session is None:
+        # requests is only loaded once a blocking caller needs it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                # pool_block caps concurrent connections per host instead of
+                # opening (and then discarding) overflow connections
+                adapter = HTTPAdapter(
+                    pool_connections=_config.host_pools,
+                    pool_maxsize=_config.per_host_limit,
+                    pool_block=True
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _close_pool(loop, pool):
+    """Close an evicted pool's client on the loop it belongs to"""
+    if loop.is_closed():
+        # Too late for aclose(); its sockets are released with the pool
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(pool.client.aclose(), loop)
+    except RuntimeError:
+        # The loop closed in between
+        pass
+
+
+def _get_async_pool():
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None or pool.client.is_closed:
+        # Forget pools whose loop has already gone away
+        for stale in [l for l in _async_pools if l.is_closed()]:
+            _close_pool(stale, _async_pools.pop(stale))
+        pool = _async_pools[loop] = _AsyncPool(_config)
+    return pool
+
+
+def get_async_client():
+    """Return the shared async HTTP client for the running event loop"""
+    return _get_async_pool().client
+
+
+async def arequest(method, url, **kwargs):
+    """Send a request on the shared async client, respecting the per-host limit"""
+    pool = _get_async_pool()
+    async with pool.slots_for(url):
+        return await pool.client.request(method, url, **kwargs)
+
+
+async def aclose_async_client():
+    """Close the async client bound to the running event loop"""
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.client.aclose()
+
+
+def run_async(coroutine):
+    """asyncio.run that closes the loop's async client before the loop goes away"""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await aclose_async_client()
+
+    return asyncio.run(main())
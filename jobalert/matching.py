@@ -0,0 +1,158 @@
+"""Fan-out matching of jobs against many subscriber skill profiles
+
+Instead of scoring every job against one hard-coded skill list (or every
+job against every subscriber), profiles are indexed by skill: the index
+maps each normalised skill phrase to the profiles that list it. A job's
+words and short phrases are looked up in the index, so only profiles
+sharing at least one skill with the job are ever scored, and the work
+grows with the relevant (job, profile) pairs rather than jobs ×
+subscribers.
+"""
+import re
+from collections import defaultdict
+
+# Keeps tokens like c++, c#, node.js and .net intact
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]*[a-z0-9+#]")
+
+# Score contribution of a skill found in the title vs only in the description
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.75
+
+# Longest skill phrase, in words, that can match
+MAX_PHRASE = 3
+
+_ANY_LOCATION = {"", "any", "anywhere", "remote", "worldwide"}
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def phrases(text, max_words=MAX_PHRASE):
+    """Every run of 1..max_words consecutive tokens, space-joined"""
+    tokens = tokenize(text)
+    return {
+        " ".join(tokens[start:start + size])
+        for size in range(1, max_words + 1)
+        for start in range(len(tokens) - size + 1)
+    }
+
+
+def normalize_skill(skill):
+    return " ".join(tokenize(skill)[:MAX_PHRASE])
+
+
+def parse_skills(text):
+    """Comma-separated skills -> unique normalised skill phrases, in order"""
+    skills = []
+    for skill in (text or "").split(','):
+        skill = normalize_skill(skill)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+class SubscriberProfile:
+    def __init__(self, profile_id, skills, min_score=0, location=None, email=None):
+        self.profile_id = profile_id
+        self.skills = parse_skills(skills) if isinstance(skills, str) else [
+            skill for skill in dict.fromkeys(normalize_skill(skill) for skill in skills) if skill
+        ]
+        self.min_score = min_score
+        self.location = (location or "").strip().lower()
+        self.email = email
+
+    def accepts_location(self, job_location):
+        if self.location in _ANY_LOCATION:
+            return True
+        return self.location in (job_location or "").lower()
+
+
+class Match:
+    """One (job, profile) pair that scored at or above the profile's minimum"""
+
+    def __init__(self, job, score, skills):
+        self.job = job
+        self.score = score
+        self.skills = skills
+
+    def __repr__(self):
+        return f"Match({self.job.get('id')!r}, score={self.score})"
+
+
+class ProfileIndex:
+    """Inverted index of skill phrase -> profile ids"""
+
+    def __init__(self, profiles=()):
+        self.profiles = {}
+        self._postings = defaultdict(list)
+        # Work counters: pairs actually scored vs the jobs × profiles a full scan would score
+        self.pairs_scored = 0
+        self.pairs_possible = 0
+        for profile in profiles:
+            self.add(profile)
+
+    def add(self, profile):
+        if profile.profile_id in self.profiles:
+            self.remove(profile.profile_id)
+        self.profiles[profile.profile_id] = profile
+        for skill in profile.skills:
+            self._postings[skill].append(profile.profile_id)
+
+    def remove(self, profile_id):
+        profile = self.profiles.pop(profile_id, None)
+        if profile is None:
+            return
+        for skill in profile.skills:
+            postings = self._postings[skill]
+            postings.remove(profile_id)
+            if not postings:
+                del self._postings[skill]
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def candidates(self, job):
+        """profile id -> {matched skill: weight} for the profiles sharing a skill with the job"""
+        title_phrases = phrases(job.get('title'))
+        job_phrases = title_phrases | phrases(job.get('description'))
+        # Walk whichever side is smaller
+        if len(job_phrases) > len(self._postings):
+            shared = [skill for skill in self._postings if skill in job_phrases]
+        else:
+            shared = [phrase for phrase in job_phrases if phrase in self._postings]
+        hits = defaultdict(dict)
+        for skill in shared:
+            weight = TITLE_WEIGHT if skill in title_phrases else BODY_WEIGHT
+            for profile_id in self._postings[skill]:
+                hits[profile_id][skill] = weight
+        return hits
+
+    def score(self, profile, matched):
+        """0-100: share of the profile's skills the job mentions, title mentions counting most"""
+        return min(100, round(100 * sum(matched.values()) / len(profile.skills)))
+
+    def match_job(self, job):
+        """Matches of one job, best first"""
+        self.pairs_possible += len(self.profiles)
+        matches = []
+        for profile_id, matched in self.candidates(job).items():
+            profile = self.profiles[profile_id]
+            self.pairs_scored += 1
+            if not profile.accepts_location(job.get('location')):
+                continue
+            score = self.score(profile, matched)
+            if score >= profile.min_score:
+                matches.append((profile_id, Match(job, score, sorted(matched, key=matched.get, reverse=True))))
+        matches.sort(key=lambda pair: pair[1].score, reverse=True)
+        return matches
+
+    def match(self, jobs):
+        """profile id -> its matches over all jobs, best first"""
+        by_profile = defaultdict(list)
+        for job in jobs:
+            for profile_id, match in self.match_job(job):
+                by_profile[profile_id].append(match)
+        for matches in by_profile.values():
+            matches.sort(key=lambda match: match.score, reverse=True)
+        return dict(by_profile)
@@ -0,0 +1,140 @@
+"""Prometheus metrics for the web app, served at /metrics next to the UI
+
+Requires ``prometheus_client``. Stage and outbound call durations (n8n
+webhook latency included) come from the tracer's spans as histograms;
+trigger outcomes, in-flight runs, queue depth, cache, duplicate and job board
+revalidation counters are read from the running UI at scrape time.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from jobalert.pipeline import DedupStage
+from jobalert.tracing import PrometheusExporter
+
+
+class JobAlertCollector:
+    """Collects the UI's counters on every scrape"""
+
+    def __init__(self, ui):
+        self.ui = ui
+
+    def describe(self):
+        # Nothing to check ahead of time; metrics are produced per scrape
+        return []
+
+    def collect(self):
+        triggers = CounterMetricFamily(
+            'jobalert_trigger_requests', 'Launch requests by backend and outcome', labels=['backend', 'outcome']
+        )
+        for (backend, outcome), count in sorted(self.ui.trigger_outcomes.items()):
+            triggers.add_metric([backend, outcome], count)
+        yield triggers
+
+        yield GaugeMetricFamily('jobalert_runs_in_flight', 'Runs currently executing', value=self.ui.active_runs)
+        yield GaugeMetricFamily('jobalert_queue_depth', 'Launch requests waiting for a worker',
+                                value=self.ui.run_queue.depth())
+
+        coalesced = CounterMetricFamily(
+            'jobalert_coalesced_requests', 'Runs started (leader) vs shared with an identical run (joined)',
+            labels=['role']
+        )
+        coalesced.add_metric(['leader'], self.ui.flights.leaders)
+        coalesced.add_metric(['joined'], self.ui.flights.joined)
+        yield coalesced
+
+        stages = self.ui.pipeline.stages
+        caches = [stage.cache for stage in stages if getattr(stage, 'cache', None) is not None]
+        if caches:
+            lookups = CounterMetricFamily(
+                'jobalert_analysis_cache_lookups', 'AI analysis cache lookups', labels=['result']
+            )
+            hit_rate = GaugeMetricFamily('jobalert_analysis_cache_hit_ratio', 'AI analysis cache hit ratio')
+            entries = GaugeMetricFamily('jobalert_analysis_cache_entries', 'Entries in the AI analysis cache')
+            stats = [cache.stats() for cache in caches]
+            hits = sum(stat['hits'] for stat in stats)
+            misses = sum(stat['misses'] for stat in stats)
+            lookups.add_metric(['hit'], hits)
+            lookups.add_metric(['miss'], misses)
+            hit_rate.add_metric([], hits / (hits + misses) if hits + misses else 0.0)
+            entries.add_metric([], sum(stat['size'] for stat in stats))
+            yield lookups
+            yield hit_rate
+            yield entries
+
+        prescorers = [stage.prescorer for stage in stages if getattr(stage, 'prescorer', None) is not None]
+        if prescorers:
+            prescored = CounterMetricFamily(
+                'jobalert_prescored_jobs', 'Jobs rated by the local pre-scorer', labels=['result']
+            )
+            saved = sum(prescorer.llm_calls_saved for prescorer in prescorers)
+            prescored.add_metric(['sent_to_llm'], sum(prescorer.jobs_scored for prescorer in prescorers) - saved)
+            prescored.add_metric(['skipped'], saved)
+            yield prescored
+
+        deduplicators = [stage for stage in stages if isinstance(stage, DedupStage)]
+        if deduplicators:
+            duplicates = CounterMetricFamily(
+                'jobalert_duplicate_jobs', 'Postings dropped as duplicates, within a run or of an earlier run',
+                labels=['scope']
+            )
+            duplicates.add_metric(['run'], sum(stage.collapsed for stage in deduplicators))
+            duplicates.add_metric(['earlier'], sum(stage.repeats for stage in deduplicators))
+            yield duplicates
+
+        fetchers = [stage.fetcher for stage in stages if getattr(stage, 'fetcher', None) is not None]
+        if fetchers:
+            pages = CounterMetricFamily(
+                'jobalert_job_board_pages', 'Job board pages by response', labels=['response']
+            )
+            pages.add_metric(['fetched'], sum(fetcher.pages_fetched for fetcher in fetchers))
+            pages.add_metric(['not_modified'], sum(fetcher.pages_not_modified for fetcher in fetchers))
+            yield pages
+
+        sink = getattr(self.ui, 'sheet_sink', None)
+        if sink is not None:
+            sheet_rows = CounterMetricFamily('jobalert_sheet_rows_written', 'Rows upserted into the results sheet')
+            sheet_rows.add_metric([], sink.rows_written)
+            yield sheet_rows
+            yield GaugeMetricFamily('jobalert_sheet_rows_pending', 'Rows waiting for the next sheet batch',
+                                    value=sink.pending())
+
+        alerts = getattr(self.ui, 'alerts', None)
+        if alerts is not None:
+            mails = CounterMetricFamily('jobalert_alert_mails_sent', 'Alert mails sent by kind', labels=['kind'])
+            mails.add_metric(['immediate'], alerts.immediate_sent)
+            mails.add_metric(['digest'], alerts.digests_sent)
+            yield mails
+            yield GaugeMetricFamily('jobalert_alerts_awaiting_digest', 'Batch alerts queued for the next digest',
+                                    value=alerts.pending())
+
+        yield GaugeMetricFamily('jobalert_results_stored', 'Jobs in the results store', value=len(self.ui.results_store))
+
+
+def build_registry(ui):
+    """Registry with the UI's collector and a span exporter attached to its tracer"""
+    registry = CollectorRegistry()
+    registry.register(JobAlertCollector(ui))
+    ui.tracer.exporters.append(PrometheusExporter(registry))
+    return registry
+
+
+def mount_metrics(api, registry, path="/metrics"):
+    """Add the scrape endpoint to a FastAPI app"""
+    from fastapi import Response
+
+    @api.get(path, include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    return api
+
+
+def serve(blocks, ui, **launch_kwargs):
+    """Launch the Gradio app and add /metrics to its server, on the same port.
+
+    Gradio's own launch keeps ``share`` and ``inbrowser`` working; the
+    route is added to the FastAPI app it returns.
+    """
+    api, _, _ = blocks.launch(prevent_thread_lock=True, **launch_kwargs)
+    mount_metrics(api, build_registry(ui))
+    blocks.block_thread()
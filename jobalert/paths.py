@@ -0,0 +1,13 @@
+"""Location of the local state files (caches, indexes, results store)"""
+import os
+
+DATA_DIR = os.environ.get(
+    "JOBALERT_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+
+
+def data_path(filename):
+    """Path of a state file inside DATA_DIR, creating the directory if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
@@ -0,0 +1,825 @@
+"""In-process execution engine for the 5-agent chain
+
+Runs the same stages as the n8n workflow in ``src/My workflow 5.json``
+(HTTP Request + "Agent1 scraper" → "AI analyser" → "Agent3" → "If" +
+"agent 4"/"alert manager" → "Code") as plain Python, so a run costs
+milliseconds plus the external I/O instead of a cloud webhook hop and a
+JS interpreter per node. Field names and values follow the Code nodes.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from jobalert.cache import AnalysisCache, analysis_key
+from jobalert.coalesce import search_key
+from jobalert.dedup import DedupIndex, signature
+from jobalert.fetcher import ArbeitnowFetcher, ValidatorStore
+from jobalert.http import arequest
+from jobalert.paths import data_path
+from jobalert.prescore import prescorer_from_env
+from jobalert.ratelimit import TokenBucket
+from jobalert.seen import SeenJobsIndex, posting_hash, posting_slug
+from jobalert.tracing import LLM, RUN, STAGE, get_tracer, span
+
+AGENT1 = "Agent 1 - Job Scraper"
+AGENT2 = "Agent 2 - AI Analyzer"
+AGENT3 = "Agent 3 - Response Parser"
+AGENT4 = "Agent 4 - Quality Filter"
+AGENT5 = "Agent 5 - Alert Manager"
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4.1-nano"
+
+TARGET_SKILLS = "Python, Asyncio, API Development, N8N Automation, Telegram Bots, Web Development"
+
+# Whom the prompts score jobs for, unless a run brings its own skill profile
+DEFAULT_CANDIDATE = "a Python developer with asyncio, API, and automation skills"
+
+SYSTEM_PROMPT = (
+    "You are Agent 2 - AI Analyzer in a multi-agent job processing system. "
+    f"Analyze this job for {DEFAULT_CANDIDATE}. "
+    "Return ONLY valid JSON: {\"relevance_score\": 85, \"match_reasons\": [\"Python expertise\", "
+    "\"Remote work\"], \"summary\": \"Great match for your skills\", \"agent_id\": \"Agent_2\", "
+    "\"confidence\": \"high\"}"
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are Agent 2 - AI Analyzer in a multi-agent job processing system. "
+    f"Analyze each of the following jobs for {DEFAULT_CANDIDATE}. "
+    "Return ONLY a valid JSON array with one object per job, echoing its Job ID: "
+    "[{\"job_id\": \"<Job ID>\", \"relevance_score\": 85, \"match_reasons\": [\"Python expertise\", "
+    "\"Remote work\"], \"summary\": \"Great match for your skills\", \"agent_id\": \"Agent_2\", "
+    "\"confidence\": \"high\"}]"
+)
+
+FALLBACK_ANALYSIS = {
+    "relevance_score": 65,
+    "match_reasons": ["Analysis failed - needs manual review"],
+    "summary": "AI analysis encountered an error",
+    "agent_id": "Agent_3_Fallback",
+    "confidence": "low"
+}
+
+_TAG_RE = re.compile(r'<[^>]*>')
+_FENCE_RE = re.compile(r'```json|```')
+
+
+def now_iso():
+    """UTC timestamp in the same shape as JavaScript's Date.toISOString()"""
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def clean_description(html):
+    if not html:
+        return 'No description available'
+    return _TAG_RE.sub('', html)[:400]
+
+
+class PipelineError(Exception):
+    """Raised when a stage cannot complete; carries the failing stage"""
+
+    def __init__(self, stage, error):
+        super().__init__(f"{stage.label} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class RunContext:
+    """Per-run parameters and bookkeeping shared by all stages"""
+
+    def __init__(self, keywords="", location="", min_relevance=40, email="", run_id=None, skills=None):
+        self.keywords = keywords
+        self.location = location
+        self.min_relevance = min_relevance
+        self.email = email
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        # Skill profile Agent 2 scores against; None for TARGET_SKILLS
+        self.skills = skills
+        self.batch_id = f"batch_{int(time.time() * 1000)}"
+        self.started_at = now_iso()
+        # Short per-stage remarks (cache hits, skipped jobs) for the run log
+        self.notes = {}
+        # Seen-index changes the scraper applies once the run succeeds
+        self.seen_updates = []
+        self.seen_unchanged = []
+        # Signatures of the run's distinct postings, added to the dedup index once the run succeeds
+        self.signatures = []
+        # Decoded AI analyses by job id, joined back onto the jobs by Agent 3
+        self.analyses = {}
+        # Relevance scores of every analysed job, before filtering
+        self.scores = []
+        # (mailed now, queued for the digest) once the alert dispatcher has run
+        self.alerts = None
+
+
+class StageResult:
+    def __init__(self, stage, jobs, elapsed):
+        self.stage = stage
+        self.jobs = jobs
+        self.elapsed = elapsed
+
+
+class Stage:
+    """One agent in the chain: takes the upstream job list, returns its own"""
+
+    name = ""
+    label = ""
+    # Stages whose output depends on who launched the run (email, min relevance)
+    per_caller = False
+
+    async def run(self, jobs, ctx):
+        raise NotImplementedError
+
+    def commit(self, ctx):
+        """Called once every stage of the run has succeeded"""
+
+
+class ScrapeStage(Stage):
+    """Agent 1: fetch postings from the Arbeitnow job board and normalise them.
+
+    Searches with the run's keywords and location across every result page
+    (see ArbeitnowFetcher) instead of the workflow's fixed URL and first 8
+    postings. ``max_jobs`` optionally caps how many postings one run hands
+    on.
+
+    With a ``seen_index`` every posting is classified as new, changed or
+    unchanged since earlier runs. All of them are passed on: unchanged
+    ones get their analysis back from the analysis cache instead of a new
+    LLM call, and under a cap new and changed postings go first. The
+    postings handed on are recorded as seen once the whole run succeeds.
+    """
+
+    name = AGENT1
+    label = "🕷️ Agent 1 - Scraper"
+
+    def __init__(self, fetcher=None, max_jobs=None, seen_index=None):
+        self.fetcher = fetcher or ArbeitnowFetcher()
+        self.max_jobs = max_jobs
+        self.seen_index = seen_index
+
+    def to_job(self, posting, index, ctx, scraped_at):
+        return {
+            # Core job data
+            'id': posting.get('slug') or f"job_{int(time.time() * 1000)}_{index}",
+            'title': posting['title'],
+            'company': posting['company_name'],
+            'location': posting.get('location') or 'Remote',
+            'description': clean_description(posting.get('description')),
+            'url': posting.get('url') or f"https://arbeitnow.com/jobs/{posting.get('slug')}",
+            'source': 'Arbeitnow',
+
+            # Multi-agent tracking
+            'processed_by': [self.name],
+            'agent_chain': "Agent1",
+            'batch_id': ctx.batch_id,
+            'job_index': index,
+            'scraped_at': scraped_at,
+            'current_agent': self.name
+        }
+
+    def classify(self, posting):
+        """(seen-index state, slug, content hash) of a posting"""
+        slug = posting_slug(posting)
+        content_hash = posting_hash(posting)
+        if slug and self.seen_index is not None:
+            return self.seen_index.classify(slug, content_hash), slug, content_hash
+        return SeenJobsIndex.NEW, slug, content_hash
+
+    async def run(self, jobs, ctx):
+        scraped_at = now_iso()
+        postings = []
+        async for posting in self.fetcher.postings(ctx.keywords, ctx.location):
+            if not (posting.get('title') and posting.get('company_name')):
+                continue
+            postings.append((self.classify(posting), posting))
+        if self.max_jobs is not None:
+            # Stable sort: new and changed postings first, board order otherwise;
+            # postings beyond the cap stay unseen and are picked up next run
+            postings.sort(key=lambda entry: entry[0][0] == SeenJobsIndex.UNCHANGED)
+            postings = postings[:self.max_jobs]
+        counts = {SeenJobsIndex.NEW: 0, SeenJobsIndex.CHANGED: 0, SeenJobsIndex.UNCHANGED: 0}
+        jobs = []
+        for (state, slug, content_hash), posting in postings:
+            counts[state] += 1
+            if slug and state == SeenJobsIndex.UNCHANGED:
+                ctx.seen_unchanged.append(slug)
+            elif slug:
+                ctx.seen_updates.append((slug, content_hash))
+            jobs.append(self.to_job(posting, len(jobs), ctx, scraped_at))
+        if self.seen_index is not None:
+            ctx.notes[self.name] = (f"{counts[SeenJobsIndex.NEW]} new, {counts[SeenJobsIndex.CHANGED]} changed, "
+                                    f"{counts[SeenJobsIndex.UNCHANGED]} unchanged")
+        return jobs
+
+    def commit(self, ctx):
+        if self.seen_index is not None:
+            self.seen_index.mark(ctx.seen_updates)
+            self.seen_index.touch(ctx.seen_unchanged)
+
+
+class DedupStage(Stage):
+    """Collapse reposts and cross-listings of the same role before analysis.
+
+    Jobs matching an earlier job of the run, or one recorded in the
+    optional persistent ``index`` (a DedupIndex), are dropped; the URLs of
+    in-run duplicates are kept on the surviving job as ``duplicate_urls``.
+    The run's distinct jobs are recorded in the index once it succeeds.
+    The index is scoped to the search (see coalesce.search_key): a repost
+    is dropped only for the search that already processed the original,
+    and users of one search share its runs anyway.
+    """
+
+    name = "Deduplicator"
+    label = "🧬 Deduplicator"
+
+    def __init__(self, index=None):
+        self.index = index
+        self.collapsed = 0
+        self.repeats = 0
+
+    def scope(self, ctx):
+        return json.dumps(search_key(ctx.keywords, ctx.location, ctx.min_relevance))
+
+    async def run(self, jobs, ctx):
+        scope = self.scope(ctx)
+        run_index = DedupIndex()
+        kept = {}
+        repeats = 0
+        for job in jobs:
+            sig = signature(job)
+            original = run_index.find(sig)
+            if original is not None:
+                kept[original].setdefault('duplicate_urls', []).append(job['url'])
+                continue
+            if self.index is not None and self.index.find(sig, scope) is not None:
+                repeats += 1
+                continue
+            run_index.add([sig])
+            ctx.signatures.append(sig)
+            kept[job['url']] = dict(job)
+        run_index.close()
+        collapsed = len(jobs) - len(kept) - repeats
+        self.collapsed += collapsed
+        self.repeats += repeats
+        ctx.notes[self.name] = f"{collapsed} duplicates in this run, {repeats} seen in earlier runs"
+        return list(kept.values())
+
+    def commit(self, ctx):
+        if self.index is not None:
+            self.index.add(ctx.signatures, self.scope(ctx))
+
+
+class AnalyzeStage(Stage):
+    """Agent 2: ask the LLM to score each job against the target skills.
+
+    Requests run concurrently (at most ``concurrency`` in flight), paced by
+    an optional token bucket of ``requests_per_second``. With
+    ``batch_size`` > 1 several jobs share one prompt and the JSON array in
+    the reply is fanned back out to the jobs by their id. Jobs found in the
+    optional ``cache`` (an AnalysisCache) skip the LLM entirely, and so do
+    jobs the optional ``prescorer`` (a PreScorer) rates as plainly
+    irrelevant; those get its low-score stand-in analysis.
+
+    Completions are decoded as soon as they arrive and only the analysis is
+    kept, in ``ctx.analyses`` under the job's id; jobs whose response was
+    unusable (not JSON, not an object, or without a 0-100 relevance score)
+    get no entry and no cache entry, and Agent 3 applies its fallback. Requests
+    answered with 429 or a 5xx, or cut off by a connection error, are
+    retried up to ``retries`` times after the server's Retry-After or an
+    exponential backoff from ``retry_backoff`` seconds.
+
+    A run with ``ctx.skills`` (a subscriber's skill profile) is scored
+    against those skills instead of TARGET_SKILLS, with prompts and cache
+    entries of its own; the pre-scorer only gates the default profile.
+    """
+
+    name = AGENT2
+    label = "🧠 Agent 2 - AI Analyzer"
+
+    def __init__(self, model=DEFAULT_MODEL, base_url=None, api_key=None, timeout=60,
+                 concurrency=4, requests_per_second=None, burst=None, batch_size=1, cache=None,
+                 prescorer=None, retries=2, retry_backoff=1.0):
+        self.model = model
+        self.base_url = base_url or os.environ.get('OPENAI_BASE_URL', OPENAI_BASE_URL)
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.batch_size = max(1, batch_size)
+        self.cache = cache
+        self.prescorer = prescorer
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retried = 0
+
+    def system_prompt(self, ctx, batch=False):
+        prompt = BATCH_SYSTEM_PROMPT if batch else SYSTEM_PROMPT
+        return profile_prompt(prompt, ctx.skills) if ctx.skills else prompt
+
+    def cache_key(self, job, ctx):
+        # Single and batched prompts ask the same question, so they share entries
+        return analysis_key(job, self.system_prompt(ctx) + (ctx.skills or TARGET_SKILLS), self.model)
+
+    def record(self, job, analysis, ctx):
+        analysis = checked_analysis(analysis)
+        if analysis is None:
+            # Not cached either: the next run asks again
+            return
+        ctx.analyses[job['id']] = analysis
+        if self.cache is not None:
+            self.cache.put(self.cache_key(job, ctx), analysis)
+
+    def job_block(self, job):
+        return (
+            f"Title: {job['title']}\n"
+            f"Company: {job['company']}\n"
+            f"Location: {job['location']}\n"
+            f"Description: {job['description']}"
+        )
+
+    def user_prompt(self, job, ctx):
+        return (
+            f"🤖 Multi-Agent Processing Chain: {job['agent_chain']}\n"
+            f"Processed by: {','.join(job['processed_by'])}\n"
+            f"Batch: {job['batch_id']}\n\n"
+            f"Job Analysis Request:\n"
+            f"{self.job_block(job)}\n\n"
+            f"Target Skills: {ctx.skills or TARGET_SKILLS}"
+        )
+
+    def batch_prompt(self, jobs, ctx):
+        blocks = "\n\n".join(f"Job ID: {job['id']}\n{self.job_block(job)}" for job in jobs)
+        return (
+            f"🤖 Multi-Agent Processing Chain: {jobs[0]['agent_chain']}\n"
+            f"Batch: {jobs[0]['batch_id']}\n\n"
+            f"Job Analysis Requests ({len(jobs)} jobs):\n\n"
+            f"{blocks}\n\n"
+            f"Target Skills: {ctx.skills or TARGET_SKILLS}"
+        )
+
+    def retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        try:
+            return min(60.0, float(retry_after))
+        except (TypeError, ValueError):
+            return self.retry_backoff * 2 ** attempt
+
+    async def complete(self, messages, jobs=1):
+        """Send one chat completion request and return the decoded response"""
+        for attempt in range(self.retries + 1):
+            # Every attempt counts against the rate limit
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            response = None
+            with span(LLM, items=jobs, model=self.model, attempt=attempt) as trace_span:
+                try:
+                    response = await arequest(
+                        "POST",
+                        f"{self.base_url.rstrip('/')}/chat/completions",
+                        json={"model": self.model, "messages": messages},
+                        headers={'Authorization': f"Bearer {self.api_key}"},
+                        timeout=self.timeout
+                    )
+                except httpx.TransportError as e:
+                    if attempt == self.retries:
+                        raise
+                    trace_span.error = f"{type(e).__name__}: {e}"
+                else:
+                    if not (response.status_code == 429 or response.status_code >= 500) or attempt == self.retries:
+                        response.raise_for_status()
+                        return response.json()
+                    trace_span.error = f"HTTP {response.status_code}"
+            self.retried += 1
+            await asyncio.sleep(self.retry_delay(attempt, response))
+
+    async def analyze(self, job, ctx):
+        try:
+            response = await self.complete([
+                {"role": "system", "content": self.system_prompt(ctx)},
+                {"role": "user", "content": self.user_prompt(job, ctx)}
+            ])
+            analysis = _completion_json(response)
+        except Exception:
+            # Agent 3 falls back to a manual-review score for unusable responses
+            return
+        self.record(job, analysis, ctx)
+
+    async def analyze_batch(self, jobs, ctx):
+        try:
+            response = await self.complete([
+                {"role": "system", "content": self.system_prompt(ctx, batch=True)},
+                {"role": "user", "content": self.batch_prompt(jobs, ctx)}
+            ], jobs=len(jobs))
+            analyses = parse_batch_response(response)
+        except Exception:
+            return
+        for job in jobs:
+            # Jobs the model skipped get Agent 3's fallback analysis
+            self.record(job, analyses.get(str(job['id'])), ctx)
+
+    async def run(self, jobs, ctx):
+        pending = jobs
+        if self.cache is not None:
+            pending = []
+            for job in jobs:
+                # Entries written before replies were checked may be malformed
+                analysis = checked_analysis(self.cache.get(self.cache_key(job, ctx)))
+                if analysis is None:
+                    pending.append(job)
+                else:
+                    ctx.analyses[job['id']] = analysis
+            ctx.notes[self.name] = f"cache {len(jobs) - len(pending)} hit / {len(pending)} miss"
+        if self.prescorer is not None and pending and not ctx.skills:
+            pending, skipped = self.prescorer.split(pending)
+            for job, similarity in skipped:
+                ctx.analyses[job['id']] = self.prescorer.analysis(similarity)
+            note = f"{len(skipped)} skipped by pre-score"
+            ctx.notes[self.name] = f"{ctx.notes[self.name]}, {note}" if self.name in ctx.notes else note
+        if not pending:
+            return jobs
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY is not set")
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(call, arg):
+            async with slots:
+                await call(arg, ctx)
+
+        if self.batch_size > 1:
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            await asyncio.gather(*(bounded(self.analyze_batch, batch) for batch in batches))
+        else:
+            await asyncio.gather(*(bounded(self.analyze, job) for job in pending))
+        return jobs
+
+
+def profile_prompt(prompt, skills):
+    """A system prompt that scores jobs for ``skills`` instead of the default candidate"""
+    return prompt.replace(DEFAULT_CANDIDATE, f"a candidate skilled in {skills}")
+
+
+def checked_analysis(analysis):
+    """The analysis with an int relevance_score in 0-100, or None when it is not usable"""
+    if not isinstance(analysis, dict):
+        return None
+    score = analysis.get('relevance_score')
+    if isinstance(score, bool):
+        return None
+    try:
+        score = int(float(score))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if not 0 <= score <= 100:
+        return None
+    reasons = analysis.get('match_reasons')
+    if isinstance(reasons, str):
+        reasons = [reasons]
+    elif not isinstance(reasons, list):
+        reasons = None
+    return {**analysis, 'relevance_score': score, 'match_reasons': reasons}
+
+
+def _completion_json(ai_response):
+    content = ai_response['choices'][0]['message']['content']
+    return json.loads(_FENCE_RE.sub('', content).strip())
+
+
+def parse_batch_response(ai_response):
+    """Map job id -> analysis from a batched completion"""
+    results = _completion_json(ai_response)
+    if isinstance(results, dict):
+        # Some models wrap the array in an object
+        results = next((value for value in results.values() if isinstance(value, list)), [])
+    return {
+        str(result['job_id']): result
+        for result in results
+        if isinstance(result, dict) and 'job_id' in result
+    }
+
+
+class ParseStage(Stage):
+    """Agent 3: join each job with its AI analysis and enrich it.
+
+    The join is a dictionary lookup on the job id carried from Agent 1, so
+    a job whose analysis is missing gets the fallback instead of shifting
+    every later job onto the wrong response.
+    """
+
+    name = AGENT3
+    label = "📊 Agent 3 - Parser"
+
+    async def run(self, jobs, ctx):
+        analyzed_at = now_iso()
+        enriched = []
+        for job in jobs:
+            analysis = ctx.analyses.pop(job['id'], None) or FALLBACK_ANALYSIS
+            ctx.scores.append(analysis.get('relevance_score') or 50)
+            enriched.append({
+                **job,
+
+                # AI Analysis Results
+                'relevance_score': analysis.get('relevance_score') or 50,
+                'match_reasons': analysis.get('match_reasons') or ['No analysis available'],
+                'ai_summary': analysis.get('summary') or 'No AI summary',
+                'ai_confidence': analysis.get('confidence') or 'unknown',
+
+                # Agent Chain Tracking
+                'processed_by': [*job['processed_by'], AGENT2, self.name],
+                'agent_chain': 'Agent1 → Agent2 → Agent3',
+                'analyzed_at': analyzed_at,
+                'current_agent': self.name,
+                'processing_stage': "AI_ANALYZED"
+            })
+        return enriched
+
+
+class FilterStage(Stage):
+    """Agent 4: drop weak matches, then grade and prioritise the rest.
+
+    Combines the "If" node with the realistic-score classification of the
+    "alert manager" node (which overrides the fields "agent 4" sets); the
+    relevance cut-off comes from the run's ``min_relevance`` instead of the
+    hard-coded 40.
+    """
+
+    name = AGENT4
+    label = "🎯 Agent 4 - Filter"
+    per_caller = True
+
+    async def run(self, jobs, ctx):
+        filtered_at = now_iso()
+        quality_jobs = []
+        for job in jobs:
+            score = job['relevance_score']
+            if score < ctx.min_relevance:
+                continue
+            quality_jobs.append({
+                **job,
+
+                # Realistic Priority Classification
+                'priority_level': 'HIGH' if score >= 60 else 'MEDIUM' if score >= 45 else 'STANDARD',
+                'alert_type': 'IMMEDIATE' if score >= 50 else 'BATCH',
+                'quality_grade': 'A' if score >= 55 else 'B+' if score >= 40 else 'B',
+                'recommendation': ('RECOMMENDED' if score >= 50 else
+                                   'WORTH_REVIEWING' if score >= 35 else 'CONSIDER'),
+                'match_strength': 'STRONG' if len(job['match_reasons']) >= 3 else 'MODERATE',
+
+                # Agent Chain Tracking
+                'processed_by': [*job['processed_by'], self.name],
+                'agent_chain': job['agent_chain'] + ' → Agent4',
+                'filtered_at': filtered_at,
+                'current_agent': self.name,
+                'processing_stage': "QUALITY_APPROVED"
+            })
+        return quality_jobs
+
+
+def score_message(score):
+    if score >= 50:
+        return "🔥 Strong Match!"
+    if score >= 40:
+        return "✨ Good Potential!"
+    return "💡 Worth Exploring!"
+
+
+def alert_body(job, message):
+    reasons = "\n".join(f"• {reason}" for reason in job['match_reasons'])
+    recommendation = ('This role shows good alignment with your skills!'
+                      if job['relevance_score'] >= 45 else
+                      'Consider reviewing - might have growth potential!')
+    return f"""🚀 MULTI-AGENT JOB ALERT SYSTEM
+
+{message} - {job['relevance_score']}% Match
+
+🔗 Agent Processing: {job['agent_chain']}
+🎯 Assessment: {job['quality_grade']} Grade | {job['priority_level']} Priority
+📊 Status: {job['recommendation']}
+
+💼 OPPORTUNITY DETAILS:
+📋 Position: {job['title']}
+🏢 Company: {job['company']}
+📍 Location: {job['location']}
+⭐ Match Score: {job['relevance_score']}% relevance
+
+🎯 MATCH ANALYSIS:
+{reasons}
+
+🤖 AI INSIGHTS:
+{job['ai_summary']}
+
+🔗 EXPLORE OPPORTUNITY: {job['url']}
+
+💡 RECOMMENDATION: {recommendation}
+
+───────────────────────────────
+✅ Processed by 5 specialized agents
+🤖 Multi-Agent System: Fully operational!"""
+
+
+class AlertStage(Stage):
+    """Agent 5: compose the alert subject and body for every approved job"""
+
+    name = AGENT5
+    label = "📧 Agent 5 - Alert Manager"
+    per_caller = True
+
+    async def run(self, jobs, ctx):
+        finished_at = now_iso()
+        final_jobs = []
+        for job in jobs:
+            message = score_message(job['relevance_score'])
+            final_jobs.append({
+                **job,
+
+                # Alert Content
+                'alert_subject': f"🤖 {message} {job['title']} at {job['company']} ({job['relevance_score']}%)",
+                'alert_body': alert_body(job, message),
+
+                # Final tracking
+                'processed_by': [*job['processed_by'], self.name],
+                'agent_chain': job['agent_chain'] + ' → Agent5',
+                'final_processing_time': finished_at,
+
+                # Email priority based on score
+                'email_priority': 'high' if job['relevance_score'] >= 50 else 'normal'
+            })
+        return final_jobs
+
+
+class SaveResultsStage(Stage):
+    """Upsert the approved jobs into the results store, keyed by URL like the sheet node"""
+
+    name = "Results Store"
+    label = "🗄️ Results Store"
+    per_caller = True
+
+    def __init__(self, store):
+        self.store = store
+
+    async def run(self, jobs, ctx):
+        self.store.upsert_jobs(jobs, ctx)
+        return jobs
+
+
+class SheetSinkStage(Stage):
+    """Hand the approved jobs to a SheetSink, which upserts them into the sheet in batches"""
+
+    name = "Google Sheets"
+    label = "📑 Google Sheets"
+    per_caller = True
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    async def run(self, jobs, ctx):
+        self.sink.add(jobs)
+        ctx.notes[self.name] = f"{self.sink.pending()} rows waiting for the next batch"
+        return jobs
+
+
+class DispatchAlertsStage(Stage):
+    """Mail the run's IMMEDIATE alerts now and queue its BATCH alerts for the digest (see alerts.AlertDispatcher)"""
+
+    name = "Alert Dispatch"
+    label = "📬 Alert Dispatch"
+    per_caller = True
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    async def run(self, jobs, ctx):
+        # smtplib blocks; keep it off the event loop
+        sent, queued = await asyncio.to_thread(self.dispatcher.dispatch, [(ctx.email, jobs)])
+        ctx.alerts = (sent, queued)
+        ctx.notes[self.name] = f"{sent} sent now, {queued} queued for the digest"
+        return jobs
+
+
+class Pipeline:
+    """Runs stages in order, handing each stage's output to the next.
+
+    Each run is traced under its run_id: one span for the run, one per
+    stage, and the stages' outbound calls nested below them. With a
+    ``recorder`` (analytics.RunRecorder) every run is also recorded with
+    its per-stage timings, whether it succeeds or fails.
+    """
+
+    def __init__(self, stages, recorder=None, tracer=None, backend="local"):
+        self.stages = list(stages)
+        self.recorder = recorder
+        self.tracer = tracer or get_tracer()
+        # Backend label of the recorded runs
+        self.backend = backend
+
+    @property
+    def shared_stages(self):
+        """Number of leading stages whose output is the same whoever launched the run"""
+        return next((index for index, stage in enumerate(self.stages) if stage.per_caller), len(self.stages))
+
+    def per_caller(self):
+        """The stages after the shared ones, as a pipeline of their own.
+
+        A caller that shares another caller's run (see SingleFlight) takes
+        the jobs of its last shared stage and runs these for itself. Only
+        the shared run is recorded.
+        """
+        return Pipeline(self.stages[self.shared_stages:], tracer=self.tracer, backend=self.backend)
+
+    async def run_iter(self, ctx, jobs=None):
+        """Async generator yielding a StageResult as each stage completes.
+
+        ``jobs`` is the input of the first stage (empty for a scraper).
+        """
+        started_at = time.time()
+        started = time.perf_counter()
+        # The run span is never made current: it stays open across yields,
+        # which would leak it into the consumer's context
+        run_span = self.tracer.start("pipeline run", RUN, trace_id=ctx.run_id, keywords=ctx.keywords)
+        records = []
+        jobs = list(jobs or [])
+        error = None
+        try:
+            for stage in self.stages:
+                try:
+                    with self.tracer.span(stage.name, STAGE, parent=run_span, items_in=len(jobs)) as stage_span:
+                        jobs = await stage.run(jobs, ctx)
+                        stage_span.items = len(jobs)
+                except Exception as e:
+                    records.append((stage.name, stage_span.duration, False, 0))
+                    error = PipelineError(stage, e)
+                    raise error from e
+                records.append((stage.name, stage_span.duration, True, len(jobs)))
+                yield StageResult(stage, jobs, stage_span.duration)
+            for stage in self.stages:
+                stage.commit(ctx)
+        finally:
+            ok = error is None and len(records) == len(self.stages)
+            run_span.items = len(jobs) if ok else 0
+            if error is not None:
+                run_span.error = str(error)
+            elif not ok:
+                run_span.error = "run abandoned before the last stage"
+            self.tracer.finish(run_span)
+            if self.recorder is not None:
+                self.recorder.record_run(
+                    ctx.run_id, self.backend, started_at, time.perf_counter() - started, ok,
+                    stages=records,
+                    jobs_scraped=records[0][3] if records else 0,
+                    jobs_analyzed=len(ctx.scores),
+                    jobs_approved=len(jobs) if ok else 0,
+                    scores=ctx.scores,
+                    error=str(error) if error else None
+                )
+
+    async def run(self, ctx, jobs=None):
+        jobs = list(jobs or [])
+        async for result in self.run_iter(ctx, jobs):
+            jobs = result.jobs
+        return jobs
+
+
+def build_default_pipeline(results_store=None, recorder=None, tracer=None, sheet_sink=None, dispatcher=None):
+    """The stage layout of the n8n workflow, plus whichever of the results store, sheet and mail sinks are given"""
+    stages = [
+        ScrapeStage(
+            fetcher=ArbeitnowFetcher(validators=ValidatorStore(data_path("page_validators.sqlite3"))),
+            seen_index=SeenJobsIndex(data_path("seen_jobs.sqlite3"))
+        ),
+        DedupStage(DedupIndex(data_path("job_signatures.sqlite3"))),
+        AnalyzeStage(cache=AnalysisCache(data_path("analysis_cache.sqlite3")),
+                     prescorer=prescorer_from_env(TARGET_SKILLS)),
+        ParseStage(),
+        FilterStage(),
+        AlertStage()
+    ]
+    if results_store is not None:
+        stages.append(SaveResultsStage(results_store))
+    if sheet_sink is not None:
+        stages.append(SheetSinkStage(sheet_sink))
+    if dispatcher is not None:
+        stages.append(DispatchAlertsStage(dispatcher))
+    return Pipeline(stages, recorder=recorder, tracer=tracer)
+
+
+def build_scheduled_pipeline(recorder=None, tracer=None):
+    """The stages of a scheduled query, split by scheduler.LocalSearchRunner.
+
+    Scraping and dedup run once per query, analysis and parsing once per
+    distinct subscriber skill profile, filtering and alerts per subscriber.
+    No seen index and no persistent dedup index: every subscriber of a
+    query is matched against the query's current postings (duplicates
+    within them still collapse), and the analysis cache keeps repeats cheap.
+    """
+    return Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(validators=ValidatorStore(data_path("page_validators.sqlite3")))),
+        DedupStage(),
+        AnalyzeStage(cache=AnalysisCache(data_path("analysis_cache.sqlite3")),
+                     prescorer=prescorer_from_env(TARGET_SKILLS)),
+        ParseStage()
+    ], recorder=recorder, tracer=tracer, backend="scheduled")
@@ -0,0 +1,114 @@
+"""Local pre-scoring that keeps obvious non-matches away from the LLM
+
+Every scraped job used to be sent to the AI analyser, and the "If" node
+only dropped weak matches after the call was paid for. The pre-scorer
+compares all jobs of a run with the target skill profile in one batch:
+job and profile texts are hashed into fixed-size TF-IDF vectors with
+NumPy and ranked by cosine similarity. Jobs below the threshold get a
+local low-score analysis instead of an LLM call, so Agent 4 filters them
+out as before.
+"""
+import os
+import zlib
+
+import numpy as np
+
+from jobalert.matching import tokenize
+
+# Hash space for words and word pairs; only the buckets a batch uses are materialised
+DIMENSIONS = 2 ** 20
+# Cosine similarity below which a job is not worth an LLM call; the highest
+# value that keeps every relevant job of benchmarks/fixtures/labeled_jobs.json
+DEFAULT_THRESHOLD = 0.015
+
+
+def stem(token):
+    """Crude plural folding so "APIs" meets "API" and "bots" meets "bot" """
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def features(text):
+    """Stemmed words and adjacent word pairs of a text"""
+    words = [stem(token) for token in tokenize(text)]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def _bucket(feature, dimensions):
+    return zlib.crc32(feature.encode()) % dimensions
+
+
+def job_text(job):
+    # The title says more about the role than the description, so it counts twice
+    return f"{job.get('title', '')} {job.get('title', '')} {job.get('description', '')}"
+
+
+class PreScorer:
+    """Batch cosine similarity of jobs against a skill profile over hashed TF-IDF vectors.
+
+    ``threshold`` is the minimum similarity (0-1) for a job to reach the
+    LLM. ``jobs_scored`` and ``llm_calls_saved`` count the jobs seen and
+    those kept from the LLM.
+    """
+
+    def __init__(self, profile, threshold=DEFAULT_THRESHOLD, dimensions=DIMENSIONS):
+        self.profile = profile
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.jobs_scored = 0
+        self.llm_calls_saved = 0
+
+    def vectors(self, texts):
+        """Term counts of each text, one row per text and one column per hash bucket in use"""
+        rows, buckets = [], []
+        for row, text in enumerate(texts):
+            text_buckets = [_bucket(feature, self.dimensions) for feature in features(text)]
+            rows.extend([row] * len(text_buckets))
+            buckets.extend(text_buckets)
+        used, columns = np.unique(np.array(buckets, dtype=np.int64), return_inverse=True)
+        matrix = np.zeros((len(texts), len(used)), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), columns), 1.0)
+        return matrix
+
+    def scores(self, jobs):
+        """Cosine similarity of every job with the profile, as a NumPy array"""
+        if not jobs:
+            return np.zeros(0, dtype=np.float32)
+        # Row 0 is the profile; document frequencies come from this batch
+        counts = self.vectors([self.profile] + [job_text(job) for job in jobs])
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(counts)) / (1 + document_frequency)) + 1
+        weights = np.log1p(counts) * idf
+        norms = np.linalg.norm(weights, axis=1)
+        norms[norms == 0] = 1
+        weights /= norms[:, None]
+        return weights[1:] @ weights[0]
+
+    def split(self, jobs):
+        """(jobs worth an LLM call, [(skipped job, similarity)])"""
+        similarities = self.scores(jobs)
+        keep = similarities >= self.threshold
+        self.jobs_scored += len(jobs)
+        self.llm_calls_saved += int(len(jobs) - keep.sum())
+        passed = [job for job, kept in zip(jobs, keep) if kept]
+        skipped = [(job, float(similarity)) for job, similarity, kept in zip(jobs, similarities, keep) if not kept]
+        return passed, skipped
+
+    def analysis(self, similarity):
+        """Stand-in analysis for a job kept from the LLM; scores stay below the threshold"""
+        return {
+            "relevance_score": max(1, int(similarity * 100)),
+            "match_reasons": ["Little overlap with the target skills"],
+            "summary": f"Skipped AI analysis: local pre-score {similarity:.2f} below {self.threshold:.2f}",
+            "agent_id": "Agent_2_Prescore",
+            "confidence": "low"
+        }
+
+
+def prescorer_from_env(profile):
+    """PreScorer with the threshold from JOBALERT_PRESCORE_THRESHOLD, or None when set to "off" """
+    threshold = os.environ.get('JOBALERT_PRESCORE_THRESHOLD', '').strip().lower()
+    if threshold in ("off", "none", "false"):
+        return None
+    return PreScorer(profile, float(threshold) if threshold else DEFAULT_THRESHOLD)
@@ -0,0 +1,43 @@
+"""Async token-bucket rate limiter for outbound API calls"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``capacity``.
+
+    Each acquisition reserves its tokens at once, running the bucket into
+    debt if it is empty, and sleeps until the debt is refilled, so waiters
+    are served in arrival order. The token math sits behind a thread lock
+    and the sleep outside it, so one bucket can pace callers on several
+    event loops and threads.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """Take ``tokens`` now and return the seconds to wait before using them"""
+        if tokens > self.capacity:
+            raise ValueError("cannot acquire more tokens than the bucket holds")
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
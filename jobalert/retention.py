@@ -0,0 +1,67 @@
+"""Expiry of the state files that would otherwise grow forever
+
+The seen-jobs index, the dedup signature index and the finished entries
+of the run queue only ever gain rows. A ``Retention`` prunes everything
+older than the retention period on start-up and then periodically, so a
+role reposted after the period is treated as new again and the SQLite
+files stay proportional to what is still listed.
+"""
+import os
+import threading
+
+DEFAULT_RETENTION_DAYS = 30
+
+
+class Retention:
+    """Calls ``prune(older_than)`` every ``interval`` seconds on a daemon thread.
+
+    ``prune`` gets the retention period in seconds and returns a dict of
+    state name -> rows removed; the totals are kept in ``pruned``.
+    """
+
+    def __init__(self, prune, retention, interval=6 * 3600):
+        self.prune = prune
+        self.retention = retention
+        self.interval = interval
+        self.pruned = {}
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        removed = self.prune(self.retention)
+        for name, count in removed.items():
+            self.pruned[name] = self.pruned.get(name, 0) + count
+        return removed
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                # Nothing is lost; the rows go with the next pass
+                self.last_error = f"{type(e).__name__}: {e}"
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        """Prune now, then every ``interval`` seconds"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="retention", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the thread, waiting for a pass in progress to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def retention_from_env(prune):
+    """Retention of JOBALERT_RETENTION_DAYS days (30 by default), or None when set to 0"""
+    days = float(os.environ.get('JOBALERT_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+    if days <= 0:
+        return None
+    return Retention(prune, days * 86400)
@@ -0,0 +1,252 @@
+"""Durable queue of launch requests and the worker pool that drains it
+
+Launch clicks are admitted into a SQLite-backed queue and answered with a
+request id straight away; a fixed pool of workers runs them. Admission
+is bounded twice: the queue rejects new requests once ``max_depth`` are
+waiting (backpressure instead of piling work onto n8n), and each user may
+have at most ``per_user_pending`` requests waiting. Workers never run more
+than ``per_user_running`` requests of one user at a time, so a burst
+from one user cannot starve the others.
+
+Requests that were running when the process stopped are queued again on
+start-up.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED = (DONE, FAILED)
+
+
+class QueueFull(Exception):
+    """Raised when a request cannot be admitted; ``reason`` says which limit was hit"""
+
+    def __init__(self, reason, depth):
+        super().__init__(reason)
+        self.reason = reason
+        self.depth = depth
+
+
+class RunQueue:
+    """SQLite table of launch requests, claimed oldest first"""
+
+    def __init__(self, path=":memory:", max_depth=100, per_user_pending=5, per_user_running=1):
+        self.path = path
+        self.max_depth = max_depth
+        self.per_user_pending = per_user_pending
+        self.per_user_running = per_user_running
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS run_requests (
+                seq INTEGER PRIMARY KEY,
+                request_id TEXT NOT NULL UNIQUE,
+                user TEXT NOT NULL,
+                params TEXT NOT NULL,
+                state TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                status TEXT,
+                log TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_run_requests_state ON run_requests(state, seq);
+            CREATE INDEX IF NOT EXISTS idx_run_requests_user ON run_requests(user, state);
+        """)
+        # Requests cut off by a restart run again from the start
+        self._db.execute(
+            "UPDATE run_requests SET state = ?, started_at = NULL, log = '' WHERE state = ?", (QUEUED, RUNNING)
+        )
+        self._db.commit()
+
+    def _count(self, state, user=None):
+        if user is None:
+            return self._db.execute("SELECT COUNT(*) FROM run_requests WHERE state = ?", (state,)).fetchone()[0]
+        return self._db.execute(
+            "SELECT COUNT(*) FROM run_requests WHERE state = ? AND user = ?", (state, user)
+        ).fetchone()[0]
+
+    def enqueue(self, params, user=""):
+        """Admit a request and return (request_id, position in queue); raises QueueFull"""
+        request_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            depth = self._count(QUEUED)
+            if depth >= self.max_depth:
+                raise QueueFull(f"queue is full ({depth} requests waiting)", depth)
+            if self._count(QUEUED, user) >= self.per_user_pending:
+                raise QueueFull(f"{self.per_user_pending} requests already waiting for {user or 'this user'}", depth)
+            self._db.execute(
+                "INSERT INTO run_requests (request_id, user, params, state, created_at) VALUES (?, ?, ?, ?, ?)",
+                (request_id, user, json.dumps(params), QUEUED, time.time())
+            )
+            self._db.commit()
+        return request_id, depth + 1
+
+    def claim(self):
+        """Mark the oldest runnable request as running and return it, or None.
+
+        Requests of users already at ``per_user_running`` are skipped.
+        """
+        with self._lock:
+            row = self._db.execute("""
+                SELECT request_id, user, params FROM run_requests q
+                WHERE state = ? AND (
+                    SELECT COUNT(*) FROM run_requests r WHERE r.user = q.user AND r.state = ?
+                ) < ?
+                ORDER BY seq LIMIT 1
+            """, (QUEUED, RUNNING, self.per_user_running)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE run_requests SET state = ?, started_at = ? WHERE request_id = ?",
+                (RUNNING, time.time(), row[0])
+            )
+            self._db.commit()
+        return {'request_id': row[0], 'user': row[1], 'params': json.loads(row[2])}
+
+    def update_log(self, request_id, log):
+        with self._lock:
+            self._db.execute("UPDATE run_requests SET log = ? WHERE request_id = ?", (log, request_id))
+            self._db.commit()
+
+    def finish(self, request_id, state, status, log):
+        with self._lock:
+            self._db.execute(
+                "UPDATE run_requests SET state = ?, status = ?, log = ?, finished_at = ? WHERE request_id = ?",
+                (state, status, log, time.time(), request_id)
+            )
+            self._db.commit()
+
+    def get(self, request_id):
+        """The request as a dict (with its queue position while waiting), or None"""
+        with self._lock:
+            row = self._db.execute("""
+                SELECT seq, request_id, user, state, created_at, started_at, finished_at, status, log
+                FROM run_requests WHERE request_id = ?
+            """, (request_id,)).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row[3] == QUEUED:
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM run_requests WHERE state = ? AND seq <= ?", (QUEUED, row[0])
+                ).fetchone()[0]
+        keys = ('request_id', 'user', 'state', 'created_at', 'started_at', 'finished_at', 'status', 'log')
+        return {**dict(zip(keys, row[1:])), 'position': position}
+
+    def depth(self):
+        with self._lock:
+            return self._count(QUEUED)
+
+    def running(self):
+        with self._lock:
+            return self._count(RUNNING)
+
+    def prune(self, older_than):
+        """Delete finished requests that finished before the given timestamp"""
+        with self._lock:
+            cursor = self._db.execute(
+                f"DELETE FROM run_requests WHERE state IN ({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+                (*FINISHED, older_than)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class WorkerPool:
+    """Runs queued requests on ``workers`` coroutines in a background event loop.
+
+    ``handler(request)`` gets the claimed request (request_id, user,
+    params) and is an async generator yielding (log text, status) pairs;
+    the log is saved as it grows so followers can stream it, and the last
+    status becomes the request's status. Requests whose handler raises,
+    or that end without a status, are marked failed.
+    """
+
+    def __init__(self, queue, handler, workers=4, poll_interval=0.5, log_interval=0.2):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.log_interval = log_interval
+        self._loop = None
+        self._wakeup = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    async def _run(self, request):
+        request_id = request['request_id']
+        log, status = "", None
+        saved_at = 0.0
+        try:
+            async for log, status in self.handler(request):
+                now = time.monotonic()
+                # Batch log writes; followers poll at a similar rate anyway
+                if now - saved_at >= self.log_interval:
+                    self.queue.update_log(request_id, log)
+                    saved_at = now
+        except Exception as e:
+            log += f"\n❌ SYSTEM ERROR: {e}\n"
+            status = None
+        self.queue.finish(request_id, DONE if status else FAILED, status, log)
+
+    async def _worker(self):
+        while True:
+            request = self.queue.claim()
+            if request is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(request)
+            # A finished request may unblock another request of the same user
+            self._wakeup.set()
+
+    def _main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._ready.set()
+        self._loop.run_until_complete(asyncio.gather(*(self._worker() for _ in range(self.workers))))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._main, name="run-workers", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+
+    def notify(self):
+        """Wake idle workers after an enqueue; safe to call from any thread"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+
+async def follow(queue, request_id, interval=0.25):
+    """Async generator yielding the request dict whenever its state or log changes, until it finishes"""
+    last = None
+    while True:
+        request = queue.get(request_id)
+        if request is None:
+            return
+        current = (request['state'], request['position'], len(request['log']))
+        if current != last:
+            last = current
+            yield request
+        if request['state'] in FINISHED:
+            return
+        await asyncio.sleep(interval)
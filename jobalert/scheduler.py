@@ -0,0 +1,368 @@
+"""Saved searches run on a schedule, one shared scrape per distinct query
+
+Each saved search (keywords, location, min relevance, email, skills)
+repeats on an interval ("15m", "6h", "1d", "@hourly", "@daily"). Searches for the same
+query and interval share a phase derived from the query, so their
+subscribers come due together and are served by one scrape and analysis;
+different queries get different phases, which spreads the runs evenly
+over the interval instead of firing them all at the top of the hour.
+
+The store keeps the due time of every search in an indexed column, so a
+tick costs O(due searches) no matter how many subscriptions exist.
+"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from jobalert.coalesce import search_key
+from jobalert.http import aclose_async_client
+from jobalert.matching import ProfileIndex, SubscriberProfile
+from jobalert.pipeline import AlertStage, AnalyzeStage, FilterStage, Pipeline, PipelineError, RunContext
+from jobalert.tracing import STAGE
+
+SCHEDULES = ["15m", "30m", "@hourly", "6h", "12h", "@daily"]
+
+_ALIASES = {'@hourly': "1h", '@daily': "1d", '@weekly': "7d"}
+_INTERVAL_RE = re.compile(r'^(\d+)\s*([mhd])$')
+_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_schedule(schedule):
+    """Interval in seconds of a schedule like "15m", "6h", "1d" or "@daily"; raises ValueError"""
+    spec = _ALIASES.get(schedule.strip().lower(), schedule.strip().lower())
+    match = _INTERVAL_RE.match(spec)
+    if not match:
+        raise ValueError(f"unsupported schedule: {schedule!r} (use e.g. 15m, 6h, 1d, @hourly, @daily)")
+    interval = int(match.group(1)) * _UNITS[match.group(2)]
+    if interval < 60:
+        raise ValueError("schedules must be at least one minute apart")
+    return interval
+
+
+def query_key(keywords, location):
+    """Normalised query shared by every subscriber of a search"""
+    terms, location, _ = search_key(keywords, location, 0)
+    return "|".join(terms) + "@" + location
+
+
+def first_run(query, interval, now):
+    """First due time: the next slot of the query's stable phase within the interval"""
+    phase = int(hashlib.sha1(query.encode()).hexdigest()[:12], 16) % interval
+    due = now - now % interval + phase
+    return due if due > now else due + interval
+
+
+class SavedSearchStore:
+    """SQLite table of saved searches, indexed on their next due time"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS saved_searches (
+                id INTEGER PRIMARY KEY,
+                keywords TEXT NOT NULL,
+                location TEXT NOT NULL,
+                min_relevance INTEGER NOT NULL,
+                email TEXT NOT NULL,
+                schedule TEXT NOT NULL,
+                interval INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                next_run_at REAL NOT NULL,
+                last_run_at REAL,
+                last_status TEXT,
+                created_at REAL NOT NULL,
+                skills TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_saved_searches_due ON saved_searches(enabled, next_run_at);
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(saved_searches)")}
+        if 'skills' not in columns:
+            # Stores created before skill profiles existed
+            self._db.execute("ALTER TABLE saved_searches ADD COLUMN skills TEXT NOT NULL DEFAULT ''")
+        self._db.commit()
+
+    def _row(self, keywords, location, min_relevance, email, schedule, skills, now):
+        interval = parse_schedule(schedule)
+        query = query_key(keywords, location)
+        return (keywords, location or "", int(min_relevance), email, schedule, interval, query,
+                first_run(query, interval, now), now, skills or "")
+
+    _INSERT = """
+        INSERT INTO saved_searches (keywords, location, min_relevance, email, schedule, interval,
+                                    query, next_run_at, created_at, skills)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def add(self, keywords, location, min_relevance, email, schedule="@daily", skills="", now=None):
+        """Save a search and return its id; raises ValueError for a bad schedule.
+
+        ``skills`` is the subscriber's comma-separated skill profile; the
+        keywords are used when it is empty.
+        """
+        row = self._row(keywords, location, min_relevance, email, schedule, skills, now or time.time())
+        with self._lock:
+            cursor = self._db.execute(self._INSERT, row)
+            self._db.commit()
+        return cursor.lastrowid
+
+    def add_many(self, searches, now=None):
+        """Bulk insert of (keywords, location, min_relevance, email, schedule[, skills]) tuples"""
+        now = now or time.time()
+        rows = [self._row(*search, *("",) * (6 - len(search)), now) for search in searches]
+        with self._lock:
+            self._db.executemany(self._INSERT, rows)
+            self._db.commit()
+        return len(rows)
+
+    def remove(self, search_id):
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM saved_searches WHERE id = ?", (search_id,))
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def list(self, limit=100, offset=0):
+        with self._lock:
+            cursor = self._db.execute("""
+                SELECT id, keywords, location, min_relevance, email, skills, schedule, next_run_at, last_run_at,
+                       last_status
+                FROM saved_searches ORDER BY id LIMIT ? OFFSET ?
+            """, (limit, offset))
+            keys = [column[0] for column in cursor.description]
+            return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+    def claim_due(self, now=None, limit=10000):
+        """Return the searches due at ``now`` and move each to its next slot.
+
+        Slots missed while the process was down are skipped rather than
+        replayed.
+        """
+        now = now or time.time()
+        with self._lock:
+            cursor = self._db.execute("""
+                SELECT id, keywords, location, min_relevance, email, skills, interval, query, next_run_at
+                FROM saved_searches WHERE enabled = 1 AND next_run_at <= ?
+                ORDER BY next_run_at LIMIT ?
+            """, (now, limit))
+            keys = [column[0] for column in cursor.description]
+            due = [dict(zip(keys, row)) for row in cursor.fetchall()]
+            self._db.executemany(
+                "UPDATE saved_searches SET next_run_at = ? WHERE id = ?",
+                [(search['next_run_at'] + ((now - search['next_run_at']) // search['interval'] + 1) * search['interval'],
+                  search['id'])
+                 for search in due]
+            )
+            self._db.commit()
+        return due
+
+    def record(self, statuses, ran_at=None):
+        """Store the outcome of a run: ``statuses`` maps search id -> status text"""
+        ran_at = ran_at or time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE saved_searches SET last_run_at = ?, last_status = ? WHERE id = ?",
+                [(ran_at, status, search_id) for search_id, status in statuses.items()]
+            )
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM saved_searches").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class LocalSearchRunner:
+    """Runs one query for all its due subscribers with the local pipeline.
+
+    The stages before Agent 2 (scrape, dedup) run once per query. A
+    ``ProfileIndex`` over the subscribers' skill profiles then picks, for
+    each job, the subscribers sharing at least one skill with it, and only
+    those pairs are scored: Agent 2 onwards (analyse, parse) runs once per
+    distinct skill profile on the jobs picked for it, with the profile's
+    skills in the prompt, and ``per_subscriber`` (filter at the
+    subscriber's min relevance, compose alerts) on each subscriber's
+    share. Subscribers without candidates skip both. Relevance is the AI
+    score for the subscriber's own skills; the skill overlap is kept as
+    ``profile_score`` and in the match reasons.
+
+    Everything after the shared stages is traced as one span for all the
+    query's subscribers rather than a run each, so a popular query does
+    not flood the tracer. Approved jobs are saved to ``results_store`` and
+    handed to ``sheet_sink`` once per query, and every subscriber's alerts
+    go through one ``dispatcher`` call.
+    """
+
+    def __init__(self, pipeline, per_subscriber=None, results_store=None, sheet_sink=None, dispatcher=None):
+        split = next((index for index, stage in enumerate(pipeline.stages) if isinstance(stage, AnalyzeStage)),
+                     len(pipeline.stages))
+        self.shared = Pipeline(pipeline.stages[:split], recorder=pipeline.recorder, tracer=pipeline.tracer,
+                               backend=pipeline.backend)
+        self.per_profile = pipeline.stages[split:]
+        self.per_subscriber = per_subscriber or Pipeline([FilterStage(), AlertStage()], tracer=pipeline.tracer)
+        self.results_store = results_store
+        self.sheet_sink = sheet_sink
+        self.dispatcher = dispatcher
+        self.pairs_scored = 0
+        self.pairs_possible = 0
+
+    def profiles(self, searches):
+        return ProfileIndex(
+            # min_score 0: the index only picks candidates, the AI score decides
+            SubscriberProfile(search['id'], search.get('skills') or search['keywords'],
+                              location=search['location'], email=search['email'])
+            for search in searches
+        )
+
+    async def run_stages(self, stages, ctx, jobs):
+        """Run ``stages`` on ``jobs`` without a traced run of their own"""
+        for stage in stages:
+            try:
+                jobs = await stage.run(jobs, ctx)
+            except Exception as e:
+                raise PipelineError(stage, e) from e
+        for stage in stages:
+            stage.commit(ctx)
+        return jobs
+
+    async def analyse(self, ctx, skills, jobs):
+        """job id -> the job analysed for one skill profile"""
+        profile = RunContext(ctx.keywords, ctx.location, 0, "", run_id=ctx.run_id, skills=skills)
+        return {job['id']: job for job in await self.run_stages(self.per_profile, profile, jobs)}
+
+    async def __call__(self, searches):
+        first = searches[0]
+        ctx = RunContext(first['keywords'], first['location'], 0, "")
+        jobs = await self.shared.run(ctx)
+        index = self.profiles(searches)
+        matched = index.match(jobs)
+        self.pairs_scored += index.pairs_scored
+        self.pairs_possible += index.pairs_possible
+
+        statuses = {}
+        approved = {}
+        deliveries = []
+        with self.shared.tracer.span("subscribers", STAGE, trace_id=ctx.run_id, items_in=len(jobs),
+                                     subscribers=len(searches)) as fan_out_span:
+            # Subscribers with the same skills share one analysis of their candidates
+            skills_of = {search['id']: ", ".join(index.profiles[search['id']].skills) for search in searches}
+            candidates = {}
+            for search in searches:
+                for match in matched.get(search['id'], []):
+                    candidates.setdefault(skills_of[search['id']], {})[match.job['id']] = match.job
+            profiles = list(candidates)
+            results = await asyncio.gather(
+                *(self.analyse(ctx, skills, list(candidates[skills].values())) for skills in profiles),
+                return_exceptions=True
+            )
+            analysed = dict(zip(profiles, results))
+
+            for search in searches:
+                picked = matched.get(search['id'], [])
+                if not picked:
+                    statuses[search['id']] = f"✅ 0 of {len(jobs)} jobs matched"
+                    continue
+                analyses = analysed[skills_of[search['id']]]
+                if isinstance(analyses, Exception):
+                    statuses[search['id']] = f"❌ {analyses}"
+                    continue
+                subscriber_jobs = [
+                    {**analyses[match.job['id']],
+                     'profile_score': match.score,
+                     'match_reasons': [*analyses[match.job['id']]['match_reasons'],
+                                       *(f"{skill} (your profile)" for skill in match.skills)]}
+                    for match in picked if match.job['id'] in analyses
+                ]
+                subscriber = RunContext(search['keywords'], search['location'], search['min_relevance'],
+                                        search['email'], run_id=f"{ctx.run_id}-{search['id']}",
+                                        skills=skills_of[search['id']])
+                try:
+                    matches = await self.run_stages(self.per_subscriber.stages, subscriber, subscriber_jobs)
+                except PipelineError as e:
+                    statuses[search['id']] = f"❌ {e}"
+                    continue
+                for job in matches:
+                    approved.setdefault(job['url'], job)
+                deliveries.append((search, matches))
+                statuses[search['id']] = f"✅ {len(matches)} of {len(jobs)} jobs matched"
+            fan_out_span.items = len(approved)
+        if self.results_store is not None and approved:
+            self.results_store.upsert_jobs(list(approved.values()), ctx)
+        if self.sheet_sink is not None and approved:
+            self.sheet_sink.add(list(approved.values()))
+        if self.dispatcher is not None and deliveries:
+            try:
+                await asyncio.to_thread(self.dispatcher.dispatch,
+                                        [(search['email'], matches) for search, matches in deliveries])
+            except Exception as e:
+                for search, _ in deliveries:
+                    statuses[search['id']] += f", ❌ alert mail failed: {e}"
+        return statuses
+
+
+class Scheduler:
+    """Claims due searches every ``tick`` seconds and runs them grouped by query.
+
+    ``runner(searches)`` is an async callable given every due search of one
+    query; it returns a dict of search id -> status text. At most
+    ``concurrency`` queries run at once.
+    """
+
+    def __init__(self, store, runner, tick=30, concurrency=4):
+        self.store = store
+        self.runner = runner
+        self.tick = tick
+        self.concurrency = concurrency
+        self.runs = 0
+        self.searches_served = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    async def _run_group(self, slots, searches):
+        async with slots:
+            try:
+                statuses = await self.runner(searches)
+            except Exception as e:
+                statuses = {search['id']: f"❌ {type(e).__name__}: {e}" for search in searches}
+        self.store.record(statuses)
+        self.runs += 1
+        self.searches_served += len(searches)
+        return statuses
+
+    async def run_due(self, now=None):
+        """Run everything due at ``now``; returns (queries run, searches served)"""
+        due = self.store.claim_due(now)
+        groups = {}
+        for search in due:
+            groups.setdefault(search['query'], []).append(search)
+        slots = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._run_group(slots, searches) for searches in groups.values()))
+        return len(groups), len(due)
+
+    def _loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stop.is_set():
+                loop.run_until_complete(self.run_due())
+                self._stop.wait(self.tick)
+        finally:
+            loop.run_until_complete(aclose_async_client())
+            loop.close()
+
+    def start(self):
+        """Start ticking on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,97 @@
+"""Persistent index of job postings that have already been through the chain"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Posting fields whose change warrants a fresh analysis
+CONTENT_FIELDS = ('title', 'company_name', 'location', 'description', 'url', 'remote', 'tags', 'job_types')
+
+
+def posting_hash(posting):
+    content = json.dumps({field: posting.get(field) for field in CONTENT_FIELDS},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def posting_slug(posting):
+    return posting.get('slug') or posting.get('url')
+
+
+class SeenJobsIndex:
+    """slug -> (content hash, first seen, last seen), backed by SQLite.
+
+    ``classify`` only reads the index; the caller calls ``mark`` once the
+    postings have been processed, so postings of a failed run still count
+    as new in the next one. The index never hides postings from a run: it
+    only tells which ones an earlier run has already analysed.
+    """
+
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                slug TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_seen_jobs_last_seen ON seen_jobs(last_seen)")
+        self._db.commit()
+
+    def classify(self, slug, content_hash):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash FROM seen_jobs WHERE slug = ?", (slug,)
+            ).fetchone()
+        if row is None:
+            return self.NEW
+        return self.UNCHANGED if row[0] == content_hash else self.CHANGED
+
+    def mark(self, entries, seen_at=None):
+        """Record (slug, content_hash) pairs as processed"""
+        seen_at = seen_at or time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO seen_jobs (slug, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(slug) DO UPDATE SET content_hash = excluded.content_hash, "
+                "last_seen = excluded.last_seen",
+                [(slug, content_hash, seen_at, seen_at) for slug, content_hash in entries]
+            )
+            self._db.commit()
+
+    def touch(self, slugs, seen_at=None):
+        """Refresh last-seen for postings that are still listed but unchanged"""
+        seen_at = seen_at or time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE seen_jobs SET last_seen = ? WHERE slug = ?",
+                [(seen_at, slug) for slug in slugs]
+            )
+            self._db.commit()
+
+    def prune(self, older_than):
+        """Forget postings not seen for ``older_than`` seconds; returns the count"""
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM seen_jobs WHERE last_seen < ?", (time.time() - older_than,)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,236 @@
+"""Batched upserts of approved jobs into the results spreadsheet
+
+The "Append or update row in sheet" node runs ``appendOrUpdate`` matched on
+URL once per job: a lookup plus a write per row, which is the first call
+to hit the Sheets API quota at volume. ``SheetSink`` buffers rows instead
+and writes them in bulk once ``max_rows`` are waiting or the oldest has
+waited ``max_delay`` seconds. It reads the URL column once and keeps a
+local URL -> row number map, so a flush is at most one batch update for
+known URLs and one append for new ones, whatever the number of rows.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import quote
+
+from jobalert.http import aclose_async_client, arequest
+from jobalert.tracing import SHEETS, span
+
+SHEETS_API = "https://sheets.googleapis.com/v4/spreadsheets"
+
+# Columns the workflow's Code node emits and the sheet node auto-maps, in sheet order
+SHEET_COLUMNS = ['title', 'company', 'location', 'description', 'url', 'source',
+                 'relevance_score', 'match_reasons', 'ai_summary', 'analyzed_at']
+
+_RANGE_ROW_RE = re.compile(r'![A-Z]+(\d+)')
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def job_row(job):
+    """Sheet cells of one job, in SHEET_COLUMNS order"""
+    row = []
+    for column in SHEET_COLUMNS:
+        value = job.get(column)
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value, ensure_ascii=False)
+        row.append("" if value is None else value)
+    return row
+
+
+class GoogleSheetsBackend:
+    """The three Sheets API v4 calls the sink needs, on the shared async client.
+
+    ``token`` is an OAuth access token or a callable returning one;
+    ``base_url`` points at a stand-in server in tests and benchmarks.
+    """
+
+    def __init__(self, spreadsheet_id, sheet="Sheet1", token=None, base_url=SHEETS_API, timeout=30):
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet = sheet
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.last_column = _column_letter(len(SHEET_COLUMNS) - 1)
+        self.url_column = _column_letter(SHEET_COLUMNS.index('url'))
+        self.calls = 0
+
+    def _headers(self):
+        token = self.token() if callable(self.token) else self.token
+        return {'Authorization': f"Bearer {token}"} if token else {}
+
+    async def _call(self, method, path, **kwargs):
+        self.calls += 1
+        response = await arequest(
+            method, f"{self.base_url}/{self.spreadsheet_id}/values{path}",
+            headers=self._headers(), timeout=self.timeout, **kwargs
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def read_urls(self):
+        """Values of the URL column, first row (the header) included"""
+        result = await self._call("GET", "/" + quote(f"{self.sheet}!{self.url_column}:{self.url_column}"))
+        return [row[0] if row else "" for row in result.get('values', [])]
+
+    async def update_rows(self, rows):
+        """Overwrite whole rows: ``rows`` maps 1-based row number -> cells"""
+        await self._call("POST", ":batchUpdate", json={
+            'valueInputOption': "RAW",
+            'data': [
+                {'range': f"{self.sheet}!A{number}:{self.last_column}{number}", 'values': [cells]}
+                for number, cells in rows.items()
+            ]
+        })
+
+    async def append_rows(self, rows):
+        """Append rows after the last one; returns the row number of the first"""
+        result = await self._call(
+            "POST", "/" + quote(f"{self.sheet}!A1:{self.last_column}1") + ":append",
+            params={'valueInputOption': "RAW", 'insertDataOption': "INSERT_ROWS"},
+            json={'values': rows}
+        )
+        return int(_RANGE_ROW_RE.search(result['updates']['updatedRange']).group(1))
+
+
+class SheetSink:
+    """Buffers job rows by URL and upserts them in batches on a daemon thread.
+
+    ``add`` never blocks on the API. Later rows for a URL replace earlier
+    ones still in the buffer. A failed flush keeps its rows buffered and
+    is retried after ``max_delay``; ``last_error`` holds the failure.
+    """
+
+    def __init__(self, backend, max_rows=200, max_delay=5.0):
+        self.backend = backend
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.rows_written = 0
+        self.flushes = 0
+        self.last_error = None
+        self._rows_by_url = None
+        self._buffer = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, jobs):
+        """Queue the jobs for the next flush"""
+        with self._lock:
+            for job in jobs:
+                self._buffer[job['url']] = job_row(job)
+            if self._buffer and self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.max_rows
+        if full:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    async def _load_rows(self):
+        urls = await self.backend.read_urls()
+        if not urls:
+            # Empty sheet: write the header row first
+            await self.backend.append_rows([SHEET_COLUMNS])
+            urls = ['url']
+        self._rows_by_url = {url: number for number, url in enumerate(urls, start=1) if url}
+
+    async def flush(self):
+        """Write everything buffered now; returns the number of rows written"""
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, {}, None
+        if not rows:
+            return 0
+        try:
+            with span(SHEETS, items=len(rows)) as sheet_span:
+                if self._rows_by_url is None:
+                    await self._load_rows()
+                updates = {self._rows_by_url[url]: cells for url, cells in rows.items() if url in self._rows_by_url}
+                appends = [(url, cells) for url, cells in rows.items() if url not in self._rows_by_url]
+                sheet_span.attributes.update(updated=len(updates), appended=len(appends))
+                if updates:
+                    await self.backend.update_rows(updates)
+                if appends:
+                    first = await self.backend.append_rows([cells for _, cells in appends])
+                    for offset, (url, _) in enumerate(appends):
+                        self._rows_by_url[url] = first + offset
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            with self._lock:
+                # Keep rows buffered after the failure unless newer ones arrived meanwhile
+                self._buffer = {**rows, **self._buffer}
+                self._oldest = time.monotonic()
+            return 0
+        self.last_error = None
+        self.rows_written += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    def _due_in(self):
+        with self._lock:
+            if not self._buffer:
+                return None
+            if len(self._buffer) >= self.max_rows:
+                return 0
+            return max(0.0, self._oldest + self.max_delay - time.monotonic())
+
+    def _loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stop.is_set():
+                due_in = self._due_in()
+                if due_in == 0:
+                    loop.run_until_complete(self.flush())
+                    if self.last_error is not None:
+                        # Back off instead of hammering a failing API with a full buffer
+                        self._stop.wait(self.max_delay)
+                    continue
+                self._wakeup.wait(due_in)
+                self._wakeup.clear()
+            # Don't lose what is still buffered on shutdown
+            loop.run_until_complete(self.flush())
+        finally:
+            loop.run_until_complete(aclose_async_client())
+            loop.close()
+
+    def start(self):
+        """Start flushing on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="sheet-sink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Flush what is left and stop the thread"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def sheet_sink_from_env():
+    """SheetSink for JOBALERT_SHEET_ID (with GOOGLE_SHEETS_TOKEN), or None when no sheet is configured"""
+    spreadsheet_id = os.environ.get('JOBALERT_SHEET_ID')
+    if not spreadsheet_id:
+        return None
+    backend = GoogleSheetsBackend(
+        spreadsheet_id,
+        sheet=os.environ.get('JOBALERT_SHEET_NAME', "Sheet1"),
+        token=lambda: os.environ.get('GOOGLE_SHEETS_TOKEN'),
+        base_url=os.environ.get('JOBALERT_SHEETS_URL', SHEETS_API)
+    )
+    return SheetSink(backend)
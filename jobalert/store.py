@@ -0,0 +1,197 @@
+"""Embedded results store for processed jobs
+
+Local counterpart of the "Append or update row in sheet" node: every job
+the chain approves is upserted by URL into SQLite, and the Results tab
+queries it with filtering, sorting and pagination pushed into SQL so the
+work stays proportional to one page, not to the size of the history.
+"""
+import json
+import sqlite3
+import threading
+
+# Result columns shown in the UI, in display order
+COLUMNS = ['Job_ID', 'Title', 'Company', 'Location', 'Relevance_Score', 'Profile_Score', 'Priority',
+           'Agent_Chain', 'AI_Summary', 'Status', 'Date', 'URL']
+
+# Sortable UI column -> SQL column (also guards ORDER BY against injection)
+SORT_COLUMNS = {
+    'Date': 'processed_at',
+    'Relevance_Score': 'relevance_score',
+    'Priority': 'priority_rank',
+    'Title': 'title',
+    'Company': 'company',
+    'Location': 'location'
+}
+
+PRIORITY_RANK = {'STANDARD': 0, 'MEDIUM': 1, 'HIGH': 2, 'URGENT': 3}
+
+STATUS_LABELS = {
+    'ALERT_READY': '✅ Alert Ready',
+    'ALERT_SENT': '✅ Alert Sent',
+    'FILTERED': '✅ Filtered'
+}
+
+
+class ResultsStore:
+    """SQLite table of processed jobs, upserted by URL"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS job_results (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                job_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                location TEXT,
+                relevance_score INTEGER NOT NULL,
+                profile_score INTEGER,
+                priority TEXT,
+                priority_rank INTEGER NOT NULL DEFAULT 0,
+                quality_grade TEXT,
+                alert_type TEXT,
+                agent_chain TEXT,
+                match_reasons TEXT,
+                ai_summary TEXT,
+                source TEXT,
+                status TEXT NOT NULL,
+                email TEXT,
+                run_id TEXT,
+                processed_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_results_score ON job_results(relevance_score);
+            CREATE INDEX IF NOT EXISTS idx_job_results_processed_at ON job_results(processed_at);
+            CREATE INDEX IF NOT EXISTS idx_job_results_priority ON job_results(priority_rank, relevance_score);
+            CREATE INDEX IF NOT EXISTS idx_job_results_priority_date ON job_results(priority_rank, processed_at);
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(job_results)")}
+        if 'profile_score' not in columns:
+            # Stores created before scheduled runs kept the skill overlap
+            self._db.execute("ALTER TABLE job_results ADD COLUMN profile_score INTEGER")
+        self._db.commit()
+
+    def upsert_jobs(self, jobs, ctx=None, status='ALERT_READY'):
+        """Insert or update jobs by URL; returns the number of rows written"""
+        rows = [
+            (
+                job['url'],
+                str(job['id']),
+                job['title'],
+                job['company'],
+                job.get('location'),
+                int(job['relevance_score']),
+                job.get('profile_score'),
+                job.get('priority_level'),
+                PRIORITY_RANK.get(job.get('priority_level'), 0),
+                job.get('quality_grade'),
+                job.get('alert_type'),
+                job.get('agent_chain'),
+                json.dumps(job.get('match_reasons') or [], ensure_ascii=False),
+                job.get('ai_summary'),
+                job.get('source'),
+                status,
+                getattr(ctx, 'email', None),
+                getattr(ctx, 'run_id', None),
+                job.get('final_processing_time') or job.get('filtered_at') or job.get('scraped_at')
+            )
+            for job in jobs
+        ]
+        with self._lock:
+            self._db.executemany("""
+                INSERT INTO job_results (
+                    url, job_id, title, company, location, relevance_score, profile_score, priority,
+                    priority_rank, quality_grade, alert_type, agent_chain, match_reasons, ai_summary,
+                    source, status, email, run_id, processed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    job_id = excluded.job_id, title = excluded.title, company = excluded.company,
+                    location = excluded.location, relevance_score = excluded.relevance_score,
+                    profile_score = excluded.profile_score, priority = excluded.priority, priority_rank = excluded.priority_rank,
+                    quality_grade = excluded.quality_grade, alert_type = excluded.alert_type,
+                    agent_chain = excluded.agent_chain, match_reasons = excluded.match_reasons,
+                    ai_summary = excluded.ai_summary, source = excluded.source, status = excluded.status,
+                    email = excluded.email, run_id = excluded.run_id, processed_at = excluded.processed_at
+            """, rows)
+            self._db.commit()
+        return len(rows)
+
+    def set_status(self, urls, status):
+        with self._lock:
+            self._db.executemany(
+                "UPDATE job_results SET status = ? WHERE url = ?",
+                [(status, url) for url in urls]
+            )
+            self._db.commit()
+
+    def _where(self, min_score=None, max_score=None, priority=None, search=None, location=None, since=None):
+        clauses, params = [], []
+        if min_score is not None:
+            clauses.append("relevance_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("relevance_score <= ?")
+            params.append(max_score)
+        if priority:
+            # Filter on the rank so the (priority_rank, relevance_score) index applies
+            clauses.append("priority_rank = ?")
+            params.append(PRIORITY_RANK.get(priority, -1))
+        if search:
+            clauses.append("(title LIKE ? OR company LIKE ?)")
+            params.extend([f"%{search}%"] * 2)
+        if location:
+            clauses.append("location LIKE ?")
+            params.append(f"%{location}%")
+        if since:
+            clauses.append("processed_at >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _select(self, where, params, sort_by, descending, limit, offset):
+        order = SORT_COLUMNS.get(sort_by, 'processed_at')
+        direction = "DESC" if descending else "ASC"
+        cursor = self._db.execute(f"""
+            SELECT job_id, title, company, location, relevance_score, profile_score, priority,
+                   agent_chain, ai_summary, status, processed_at, url
+            FROM job_results{where}
+            ORDER BY {order} {direction}, id {direction}
+            LIMIT ? OFFSET ?
+        """, params + [limit, offset])
+        return [
+            dict(zip(COLUMNS, (*row[:9], STATUS_LABELS.get(row[9], row[9]), *row[10:])))
+            for row in cursor.fetchall()
+        ]
+
+    def query(self, sort_by='Date', descending=True, limit=50, offset=0, **filters):
+        """Return (rows, total matching rows) for one slice of results.
+
+        rows are dicts keyed by the UI's COLUMNS; ``filters`` accepts
+        min_score, max_score, priority, search, location and since.
+        """
+        where, params = self._where(**filters)
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM job_results{where}", params).fetchone()[0]
+            rows = self._select(where, params, sort_by, descending, limit, offset)
+        return rows, total
+
+    def page(self, page=1, page_size=50, sort_by='Date', descending=True, **filters):
+        """Return (rows, total, page, pages) with page clamped to the available range"""
+        where, params = self._where(**filters)
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM job_results{where}", params).fetchone()[0]
+            pages = max(1, -(-total // page_size))
+            page = min(max(1, page), pages)
+            rows = self._select(where, params, sort_by, descending, page_size, (page - 1) * page_size)
+        return rows, total, page, pages
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM job_results").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
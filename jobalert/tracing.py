@@ -0,0 +1,258 @@
+"""Spans for pipeline stages and outbound calls
+
+Every agent stage and every call to an outside service (n8n webhook, job
+board, LLM, and later the sheet and mail sinks) runs inside a span that
+records its duration, item count and error. Finished spans go to an
+in-process ring buffer, so the last few thousand are always available to
+show where a run spent its time, and are optionally handed to exporters
+(Prometheus histograms, OpenTelemetry spans) when those packages are
+installed.
+
+Spans opened while another span is active in the same task become its
+children and share its trace id; a pipeline run uses its run_id as the
+trace id.
+"""
+import contextvars
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Span kinds
+RUN = "run"
+STAGE = "stage"
+CALL = "call"
+
+# Names of the outbound call spans, one per external service
+WEBHOOK = "n8n webhook"
+JOB_BOARD = "job board"
+LLM = "LLM"
+SHEETS = "Sheets"
+GMAIL = "Gmail"
+
+_current = contextvars.ContextVar('jobalert_current_span', default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """One timed unit of work"""
+
+    def __init__(self, name, kind, trace_id, parent_id=None, items=None, attributes=None):
+        self.span_id = next(_span_ids)
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.items = items
+        self.attributes = dict(attributes or {})
+        self.error = None
+        self.started_at = time.time()
+        self.duration = None
+        self._started = time.perf_counter()
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {
+            'span_id': self.span_id,
+            'trace_id': self.trace_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'items': self.items,
+            'error': self.error,
+            'attributes': self.attributes
+        }
+
+    def __repr__(self):
+        return f"Span({self.name!r}, kind={self.kind!r}, duration={self.duration!r})"
+
+
+class Tracer:
+    """Creates spans and keeps the most recent ``capacity`` finished ones"""
+
+    def __init__(self, capacity=5000, exporters=()):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=capacity)
+        self.exporters = list(exporters)
+
+    def start(self, name, kind=CALL, trace_id=None, parent=None, items=None, **attributes):
+        """Open a span without making it current; close it with finish()"""
+        parent = parent if parent is not None else _current.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:12]
+        parent_id = parent.span_id if parent is not None and parent.trace_id == trace_id else None
+        return Span(name, kind, trace_id, parent_id, items, attributes)
+
+    def finish(self, span, error=None):
+        if error is not None and span.error is None:
+            span.error = f"{type(error).__name__}: {error}"
+        span.finish()
+        with self._lock:
+            self._spans.append(span)
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                # A broken exporter must never fail the traced call
+                pass
+
+    @contextmanager
+    def span(self, name, kind=CALL, trace_id=None, parent=None, items=None, **attributes):
+        """Context manager timing the enclosed block as the current span.
+
+        Exceptions are recorded on the span and re-raised; callers that
+        handle failures themselves can set ``span.error`` directly.
+        """
+        span = self.start(name, kind, trace_id=trace_id, parent=parent, items=items, **attributes)
+        token = _current.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            self.finish(span, error)
+
+    def spans(self, trace_id=None, kind=None, limit=None):
+        """Finished spans, oldest first, optionally for one trace or kind"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        if kind is not None:
+            spans = [span for span in spans if span.kind == kind]
+        return spans[-limit:] if limit else spans
+
+    def breakdown(self, trace_id):
+        """Per (kind, name) totals for one trace, in order of first start.
+
+        Returns dicts with name, kind, calls, total seconds, max seconds,
+        items and errors.
+        """
+        rows = {}
+        for span in sorted(self.spans(trace_id), key=lambda span: span.started_at):
+            row = rows.setdefault((span.kind, span.name), {
+                'name': span.name,
+                'kind': span.kind,
+                'calls': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'items': 0,
+                'errors': 0
+            })
+            row['calls'] += 1
+            row['total'] += span.duration
+            row['max'] = max(row['max'], span.duration)
+            row['items'] += span.items or 0
+            row['errors'] += 0 if span.ok else 1
+        return list(rows.values())
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+class PrometheusExporter:
+    """Feeds finished spans into prometheus_client histograms and counters"""
+
+    def __init__(self, registry=None):
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        registry = registry if registry is not None else REGISTRY
+        self.duration = Histogram(
+            'jobalert_span_duration_seconds', 'Duration of traced stages and outbound calls',
+            ['kind', 'name', 'outcome'], registry=registry,
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+        )
+        self.items = Counter(
+            'jobalert_span_items_total', 'Items handled by traced stages and calls',
+            ['kind', 'name'], registry=registry
+        )
+
+    def export(self, span):
+        outcome = "ok" if span.ok else "error"
+        self.duration.labels(span.kind, span.name, outcome).observe(span.duration)
+        if span.items:
+            self.items.labels(span.kind, span.name).inc(span.items)
+
+
+class OpenTelemetryExporter:
+    """Re-emits finished spans through the OpenTelemetry API.
+
+    Spans are exported after the fact with their recorded start and end
+    times; the local trace and parent ids are attached as attributes.
+    """
+
+    def __init__(self, tracer_provider=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = trace.get_tracer("jobalert", tracer_provider=tracer_provider)
+
+    def export(self, span):
+        start_ns = int(span.started_at * 1e9)
+        attributes = {
+            'jobalert.kind': span.kind,
+            'jobalert.trace_id': span.trace_id,
+            'jobalert.parent_id': span.parent_id or 0
+        }
+        if span.items is not None:
+            attributes['jobalert.items'] = span.items
+        attributes.update({
+            f"jobalert.{key}": value for key, value in span.attributes.items()
+            if isinstance(value, (str, bool, int, float))
+        })
+        otel_span = self.tracer.start_span(span.name, start_time=start_ns, attributes=attributes)
+        if not span.ok:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=start_ns + int(span.duration * 1e9))
+
+
+EXPORTERS = {
+    'prometheus': PrometheusExporter,
+    'otel': OpenTelemetryExporter
+}
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    """Return the process-wide tracer"""
+    return _tracer
+
+
+def span(name, kind=CALL, **kwargs):
+    """Shortcut for get_tracer().span(...)"""
+    return _tracer.span(name, kind, **kwargs)
+
+
+def enable_exporters(names=None):
+    """Attach exporters by name ("prometheus", "otel") to the process-wide tracer.
+
+    Defaults to the comma-separated JOBALERT_TRACE_EXPORT variable. Raises
+    ImportError when the package behind a requested exporter is missing.
+    """
+    if names is None:
+        names = os.environ.get('JOBALERT_TRACE_EXPORT', '')
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    for name in names:
+        if name not in EXPORTERS:
+            raise ValueError(f"unknown trace exporter: {name}")
+        if not any(isinstance(exporter, EXPORTERS[name]) for exporter in _tracer.exporters):
+            _tracer.exporters.append(EXPORTERS[name]())
+    return _tracer.exporters
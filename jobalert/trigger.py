@@ -0,0 +1,95 @@
+"""Webhook trigger engine for the N8N multi-agent workflow"""
+import time
+
+import httpx
+
+from jobalert.http import arequest, get_session
+from jobalert.tracing import WEBHOOK, span
+
+
+class WebhookResult:
+    """Outcome of a single webhook call, independent of the HTTP library used"""
+
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    UNEXPECTED = "unexpected"
+    TIMEOUT = "timeout"
+    CONNECTION_ERROR = "connection_error"
+    ERROR = "error"
+
+    def __init__(self, kind, status_code=None, error=None, elapsed=0.0):
+        self.kind = kind
+        self.status_code = status_code
+        self.error = error
+        self.elapsed = elapsed
+
+    @classmethod
+    def from_status(cls, status_code, elapsed=0.0):
+        if status_code == 200:
+            kind = cls.OK
+        elif status_code == 404:
+            kind = cls.NOT_FOUND
+        else:
+            kind = cls.UNEXPECTED
+        return cls(kind, status_code=status_code, elapsed=elapsed)
+
+    def __repr__(self):
+        return f"WebhookResult(kind={self.kind!r}, status_code={self.status_code!r})"
+
+
+def _traced(trace_span, result):
+    trace_span.attributes['outcome'] = result.kind
+    if result.status_code is not None:
+        trace_span.attributes['status_code'] = result.status_code
+    if result.kind != WebhookResult.OK:
+        trace_span.error = str(result.error) if result.error else result.kind
+    return result
+
+
+def post_webhook(url, payload, timeout=30):
+    """Blocking webhook call, kept for callers outside an event loop"""
+    with span(WEBHOOK, items=1) as trace_span:
+        return _traced(trace_span, _post_webhook(url, payload, timeout))
+
+
+def _post_webhook(url, payload, timeout):
+    import requests
+
+    started = time.perf_counter()
+    try:
+        response = get_session().post(url, json=payload, timeout=timeout)
+    except requests.exceptions.Timeout as e:
+        return WebhookResult(WebhookResult.TIMEOUT, error=e, elapsed=time.perf_counter() - started)
+    except requests.exceptions.ConnectionError as e:
+        return WebhookResult(WebhookResult.CONNECTION_ERROR, error=e, elapsed=time.perf_counter() - started)
+    except Exception as e:
+        return WebhookResult(WebhookResult.ERROR, error=e, elapsed=time.perf_counter() - started)
+    return WebhookResult.from_status(response.status_code, elapsed=time.perf_counter() - started)
+
+
+class AsyncTriggerEngine:
+    """Fires webhook calls on the shared async client without holding a worker thread"""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+
+    async def post(self, url, payload, timeout=None):
+        with span(WEBHOOK, items=1) as trace_span:
+            return _traced(trace_span, await self._post(url, payload, timeout))
+
+    async def _post(self, url, payload, timeout):
+        started = time.perf_counter()
+        try:
+            response = await arequest(
+                "POST",
+                url,
+                json=payload,
+                timeout=self.timeout if timeout is None else timeout
+            )
+        except httpx.TimeoutException as e:
+            return WebhookResult(WebhookResult.TIMEOUT, error=e, elapsed=time.perf_counter() - started)
+        except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            return WebhookResult(WebhookResult.CONNECTION_ERROR, error=e, elapsed=time.perf_counter() - started)
+        except Exception as e:
+            return WebhookResult(WebhookResult.ERROR, error=e, elapsed=time.perf_counter() - started)
+        return WebhookResult.from_status(response.status_code, elapsed=time.perf_counter() - started)
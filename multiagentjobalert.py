@@ -1,124 +1,259 @@
-import gradio as gr
-import requests
-import pandas as pd
+import os
+import threading
 import time
+import uuid
+from collections import Counter
 from datetime import datetime
 import json
 
+from jobalert.alerts import dispatcher_from_env
+from jobalert.analytics import AnalyticsEngine, RunRecorder, render_analytics
+from jobalert.coalesce import SingleFlight, search_key
+from jobalert.fetcher import ARBEITNOW_API
+from jobalert.health import HealthMonitor, HttpProbe, StoreProbe, TcpProbe, origin, render_health
+from jobalert.http import run_async
+from jobalert.paths import data_path
+from jobalert.pipeline import (OPENAI_BASE_URL, DedupStage, PipelineError, RunContext, ScrapeStage,
+                               build_default_pipeline, build_scheduled_pipeline)
+from jobalert.retention import retention_from_env
+from jobalert.runqueue import QUEUED, QueueFull, RunQueue, WorkerPool, follow
+from jobalert.scheduler import SCHEDULES, LocalSearchRunner, SavedSearchStore, Scheduler
+from jobalert.sheets import sheet_sink_from_env
+from jobalert.store import COLUMNS, SORT_COLUMNS, ResultsStore
+from jobalert.tracing import CALL, RUN, STAGE, WEBHOOK, enable_exporters, get_tracer
+from jobalert.trigger import AsyncTriggerEngine, WebhookResult, post_webhook
+
+AGENTS = [
+    ("🕷️ Agent 1 - Scraper", "Collecting job data from APIs..."),
+    ("🧠 Agent 2 - AI Analyzer", "Analyzing jobs with OpenAI GPT-3.5..."),
+    ("📊 Agent 3 - Parser", "Enriching and validating job data..."),
+    ("🎯 Agent 4 - Filter", "Applying quality control filters..."),
+    ("📧 Agent 5 - Alert Manager", "Preparing personalized notifications...")
+]
+
+# Execution backends selectable from the Settings tab
+BACKENDS = [
+    ("N8N Cloud Webhook", "n8n"),
+    ("Local Python Pipeline", "local")
+]
+
+ARCHITECTURE = {
+    "n8n": "Web UI → N8N Webhook → Multi-Agent Processing → Email Alerts",
+    "local": "Web UI → Local Pipeline Engine → Multi-Agent Processing → Email Alerts"
+}
+
+class ExecutionLog:
+    """Append-only log text for streaming outputs.
+
+    Lines are collected in a list and joined once per update; growing one
+    string with += copies the whole log on every append. The text only ever
+    grows at the end, so Gradio can ship each streamed update to the browser
+    as an append diff.
+    """
+    def __init__(self):
+        self.lines = []
+    
+    @property
+    def text(self):
+        return "".join(f"{line}\n" for line in self.lines)
+    
+    def append(self, *lines):
+        return self.extend(lines)
+    
+    def extend(self, lines):
+        self.lines.extend(lines)
+        return self.text
+
+def _table(rows, columns):
+    """Rows as a DataFrame for a gr.Dataframe; pandas is imported on first use"""
+    import pandas as pd
+
+    return pd.DataFrame(rows, columns=columns)
+
 class MultiAgentJobAlertUI:
     def __init__(self):
         # N8N webhook URL - UPDATE THIS WITH YOUR ACTUAL URL
         self.n8n_webhook_url = "https://yadavranjan.app.n8n.cloud/webhook/multiagent-trigger"
+        self.webhook_timeout = 30
+        self.trigger_engine = AsyncTriggerEngine(timeout=self.webhook_timeout)
+        # "n8n" posts to the webhook, "local" runs the agent chain in-process
+        self.backend = "n8n"
+        self.results_store = ResultsStore(data_path("results.sqlite3"))
+        # Spans go to an in-process ring buffer; JOBALERT_TRACE_EXPORT=prometheus,otel also exports them
+        self.tracer = get_tracer()
+        enable_exporters()
+        self.run_recorder = RunRecorder(data_path("runs.sqlite3"))
+        self.analytics = AnalyticsEngine(self.run_recorder)
+        self.active_runs = 0
+        # (backend, outcome) -> finished launch requests, for /metrics
+        self.trigger_outcomes = Counter()
+        self._active_lock = threading.Lock()
+        # Approved jobs also go to the Google Sheet when JOBALERT_SHEET_ID is set, in batches
+        self.sheet_sink = sheet_sink_from_env()
+        if self.sheet_sink is not None:
+            self.sheet_sink.start()
+        # With JOBALERT_SMTP_HOST set, IMMEDIATE alerts are mailed at once and BATCH ones in digests
+        self.alerts = dispatcher_from_env(data_path("pending_alerts.sqlite3"), results_store=self.results_store)
+        if self.alerts is not None:
+            self.alerts.start()
+        self.pipeline = build_default_pipeline(
+            results_store=self.results_store, recorder=self.run_recorder, tracer=self.tracer,
+            sheet_sink=self.sheet_sink, dispatcher=self.alerts
+        )
+        # Identical searches in flight at the same time share one run
+        self.flights = SingleFlight()
+        # Launch requests are queued and run by a fixed pool of workers
+        self.run_queue = RunQueue(data_path("run_queue.sqlite3"))
+        self.workers = WorkerPool(self.run_queue, self._execute_request, workers=4)
+        self.workers.start()
+        # Saved searches run on their schedules, one shared run per distinct query
+        self.saved_searches = SavedSearchStore(data_path("saved_searches.sqlite3"))
+        self.search_runner = LocalSearchRunner(
+            build_scheduled_pipeline(recorder=self.run_recorder, tracer=self.tracer),
+            results_store=self.results_store, sheet_sink=self.sheet_sink, dispatcher=self.alerts
+        )
+        self.scheduler = Scheduler(self.saved_searches, self._run_scheduled)
+        self.scheduler.start()
+        # Seen-index entries, dedup signatures and finished requests expire after JOBALERT_RETENTION_DAYS
+        self.retention = retention_from_env(self.prune_state)
+        if self.retention is not None:
+            self.retention.start()
+        self.health = HealthMonitor(self._health_probes(), load=self._load_figures)
+        self.health.start()
         
-    def trigger_multiagent_system(self, keywords, location, min_relevance, email):
-        """Trigger the N8N multi-agent workflow with proper error handling"""
-        
-        progress_log = []
-        
-        try:
-            # Step 1: Initialize system
-            progress_log.append("🚀 Initializing Multi-Agent Job Alert System...")
-            progress_log.append(f"🔍 Search Keywords: {keywords}")
-            progress_log.append(f"📍 Location: {location}")
-            progress_log.append(f"🎯 Min Relevance: {min_relevance}%")
-            progress_log.append(f"📧 Alert Email: {email}")
-            progress_log.append("")
-            
-            # Step 2: Prepare payload
-            payload = {
-                "keywords": keywords,
-                "location": location,
-                "min_relevance": min_relevance,
-                "user_email": email,
-                "triggered_at": datetime.now().isoformat(),
-                "source": "web_ui",
-                "trigger_type": "manual"
-            }
-            
-            # Step 3: Simulate agent progression
-            agents = [
-                ("🕷️ Agent 1 - Scraper", "Collecting job data from APIs..."),
-                ("🧠 Agent 2 - AI Analyzer", "Analyzing jobs with OpenAI GPT-3.5..."),
-                ("📊 Agent 3 - Parser", "Enriching and validating job data..."),
-                ("🎯 Agent 4 - Filter", "Applying quality control filters..."),
-                ("📧 Agent 5 - Alert Manager", "Preparing personalized notifications...")
-            ]
-            
-            progress_log.append("🤖 MULTI-AGENT PROCESSING CHAIN:")
-            progress_log.append("=" * 50)
-            
-            for agent_name, agent_action in agents:
-                progress_log.append(f"{agent_name}: {agent_action}")
-                time.sleep(0.3)  # Visual delay for demo
-            
-            progress_log.append("")
+    def _health_probes(self):
+        """Dependencies polled by the health monitor; URLs are read at probe time"""
+        llm_base = os.environ.get('OPENAI_BASE_URL', OPENAI_BASE_URL).rstrip('/')
+        api_key = os.environ.get('OPENAI_API_KEY')
+        return [
+            HttpProbe("N8N Cloud Platform", lambda: origin(self.n8n_webhook_url) + "/healthz"),
+            HttpProbe("Arbeitnow Job Board", ARBEITNOW_API, method="HEAD"),
+            HttpProbe("OpenAI API Service", f"{llm_base}/models",
+                      headers={'Authorization': f"Bearer {api_key}"} if api_key else None),
+            StoreProbe("Results Store", self.results_store),
+            TcpProbe("Mail Relay (SMTP)", os.environ.get('JOBALERT_SMTP_HOST'),
+                     os.environ.get('JOBALERT_SMTP_PORT', 587))
+        ]
+    
+    def prune_state(self, older_than):
+        """Forget state older than ``older_than`` seconds; returns rows removed per state file"""
+        removed = {'run_queue': self.run_queue.prune(time.time() - older_than)}
+        for stage in self.pipeline.stages:
+            if isinstance(stage, ScrapeStage) and stage.seen_index is not None:
+                removed['seen_jobs'] = stage.seen_index.prune(older_than)
+            elif isinstance(stage, DedupStage) and stage.index is not None:
+                removed['job_signatures'] = stage.index.prune(older_than)
+        if self.alerts is not None:
+            removed['sent_alerts'] = self.alerts.prune(older_than)
+        return removed
+    
+    def _load_figures(self):
+        return {
+            "Active Runs": self.active_runs,
+            "Queued Requests": self.run_queue.depth(),
+            "Workers": self.workers.workers,
+            "Saved Searches": len(self.saved_searches),
+            "Scheduled Runs": self.scheduler.runs,
+            "Sheet Rows Pending": self.sheet_sink.pending() if self.sheet_sink is not None else 0,
+            "Alerts Awaiting Digest": self.alerts.pending() if self.alerts is not None else 0
+        }
+    
+    def _run_started(self):
+        with self._active_lock:
+            self.active_runs += 1
+    
+    def _run_finished(self, status):
+        """Count a finished launch; status is the run's status line, None if it raised"""
+        outcome = (status or "❌ SYSTEM ERROR").split(" ", 1)[-1].lower().replace(" ", "_")
+        with self._active_lock:
+            self.active_runs -= 1
+            self.trigger_outcomes[(self.backend, outcome)] += 1
+    
+    def _build_payload(self, keywords, location, min_relevance, email, request_id=None, trigger_type="manual"):
+        payload = {
+            "keywords": keywords,
+            "location": location,
+            "min_relevance": min_relevance,
+            "user_email": email,
+            "triggered_at": datetime.now().isoformat(),
+            "source": "web_ui",
+            "trigger_type": trigger_type
+        }
+        if request_id:
+            payload["request_id"] = request_id
+        return payload
+    
+    def _intro_log(self, keywords, location, min_relevance, email):
+        progress_log = [
+            "🚀 Initializing Multi-Agent Job Alert System...",
+            f"🔍 Search Keywords: {keywords}",
+            f"📍 Location: {location}",
+            f"🎯 Min Relevance: {min_relevance}%",
+            f"📧 Alert Email: {email}",
+            "",
+            "🤖 MULTI-AGENT PROCESSING CHAIN:",
+            "=" * 50
+        ]
+        for agent_name, agent_action in AGENTS:
+            progress_log.append(f"{agent_name}: {agent_action}")
+        progress_log.append("")
+        if self.backend == "local":
+            progress_log.append("⚙️ Running Multi-Agent Chain in-process...")
+        else:
             progress_log.append("🔗 Triggering N8N Multi-Agent Workflow...")
-            
-            # Step 4: Make request to N8N
-            try:
-                headers = {
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'MultiAgent-UI/1.0'
-                }
-                
-                response = requests.post(
-                    self.n8n_webhook_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=30
-                )
-                
-                # Handle different response types
-                if response.status_code == 200:
-                    progress_log.append("✅ N8N Workflow Triggered Successfully!")
-                    progress_log.append("")
-                    progress_log.append("🎉 MULTI-AGENT SYSTEM STATUS:")
-                    progress_log.append("=" * 50)
-                    progress_log.append("• Agent 1 (Scraper): ✅ Data Collection Complete")
-                    progress_log.append("• Agent 2 (AI Analyzer): ✅ OpenAI Analysis Complete")
-                    progress_log.append("• Agent 3 (Parser): ✅ Data Enrichment Complete")
-                    progress_log.append("• Agent 4 (Filter): ✅ Quality Control Complete")
-                    progress_log.append("• Agent 5 (Alert Manager): ✅ Notifications Sent")
-                    progress_log.append("")
-                    progress_log.append(f"📊 Processing completed for '{keywords}' jobs")
-                    progress_log.append(f"📧 Personalized alerts sent to {email}")
-                    progress_log.append("🗄️ Results saved to Google Sheets database")
-                    progress_log.append("")
-                    progress_log.append("🚀 Multi-Agent Architecture: FULLY OPERATIONAL!")
-                    
-                    status = "✅ SUCCESS"
-                    
-                elif response.status_code == 404:
-                    progress_log.append("❌ Webhook not found (404)")
-                    progress_log.append("💡 Please check your N8N webhook URL in Settings")
-                    status = "❌ WEBHOOK ERROR"
-                    
-                else:
-                    progress_log.append(f"⚠️ Unexpected response (Status: {response.status_code})")
-                    progress_log.append("💡 Workflow may still be processing...")
-                    status = "⚠️ PARTIAL SUCCESS"
-                
-            except requests.exceptions.Timeout:
-                progress_log.append("⏰ Request timed out")
-                progress_log.append("💡 N8N workflow may still be processing in background")
-                progress_log.append("📧 Check your email for job alerts")
-                status = "⏰ TIMEOUT"
-                
-            except requests.exceptions.ConnectionError:
-                progress_log.append("❌ Connection failed")
-                progress_log.append("💡 Please check:")
-                progress_log.append("   - Your internet connection")
-                progress_log.append("   - N8N webhook URL in Settings")
-                progress_log.append("   - N8N workflow is Active")
-                status = "❌ CONNECTION ERROR"
-                
-            except Exception as e:
-                progress_log.append(f"❌ Unexpected error: {str(e)}")
-                progress_log.append("💡 Please check your N8N configuration")
-                status = "❌ SYSTEM ERROR"
-            
-            # Format final output
-            final_output = f"""{status}
+        return progress_log
+    
+    def _outcome_log(self, result, keywords, email):
+        """Translate a webhook result into (status, log lines)"""
+        if result.kind == WebhookResult.OK:
+            return "✅ SUCCESS", [
+                "✅ N8N Workflow Triggered Successfully!",
+                "",
+                "🎉 MULTI-AGENT SYSTEM STATUS:",
+                "=" * 50,
+                "• Agent 1 (Scraper): ✅ Data Collection Complete",
+                "• Agent 2 (AI Analyzer): ✅ OpenAI Analysis Complete",
+                "• Agent 3 (Parser): ✅ Data Enrichment Complete",
+                "• Agent 4 (Filter): ✅ Quality Control Complete",
+                "• Agent 5 (Alert Manager): ✅ Notifications Sent",
+                "",
+                f"📊 Processing completed for '{keywords}' jobs",
+                f"📧 Personalized alerts sent to {email}",
+                "🗄️ Results saved to Google Sheets database",
+                "",
+                "🚀 Multi-Agent Architecture: FULLY OPERATIONAL!"
+            ]
+        if result.kind == WebhookResult.NOT_FOUND:
+            return "❌ WEBHOOK ERROR", [
+                "❌ Webhook not found (404)",
+                "💡 Please check your N8N webhook URL in Settings"
+            ]
+        if result.kind == WebhookResult.UNEXPECTED:
+            return "⚠️ PARTIAL SUCCESS", [
+                f"⚠️ Unexpected response (Status: {result.status_code})",
+                "💡 Workflow may still be processing..."
+            ]
+        if result.kind == WebhookResult.TIMEOUT:
+            return "⏰ TIMEOUT", [
+                "⏰ Request timed out",
+                "💡 N8N workflow may still be processing in background",
+                "📧 Check your email for job alerts"
+            ]
+        if result.kind == WebhookResult.CONNECTION_ERROR:
+            return "❌ CONNECTION ERROR", [
+                "❌ Connection failed",
+                "💡 Please check:",
+                "   - Your internet connection",
+                "   - N8N webhook URL in Settings",
+                "   - N8N workflow is Active"
+            ]
+        return "❌ SYSTEM ERROR", [
+            f"❌ Unexpected error: {str(result.error)}",
+            "💡 Please check your N8N configuration"
+        ]
+    
+    def _format_output(self, status, progress_log):
+        return f"""{status}
 
 MULTI-AGENT EXECUTION LOG:
 {'=' * 60}
@@ -126,18 +261,16 @@ MULTI-AGENT EXECUTION LOG:
 {'=' * 60}
 
 🏗️ SYSTEM ARCHITECTURE:
-Web UI → N8N Webhook → Multi-Agent Processing → Email Alerts
+{ARCHITECTURE[self.backend]}
 
 ⚡ Performance: 5 agents working in perfect coordination
 🎯 Purpose: Intelligent job matching with AI-powered analysis
 🔧 Technology: N8N + OpenAI + Google Sheets + Gmail"""
-            
-            return final_output
-            
-        except Exception as e:
-            return f"""❌ SYSTEM ERROR
+    
+    def _error_output(self, error):
+        return f"""❌ SYSTEM ERROR
 
-Error Details: {str(e)}
+Error Details: {str(error)}
 
 🔧 Troubleshooting Steps:
 1. Check N8N webhook URL in Settings tab
@@ -147,166 +280,352 @@ Error Details: {str(e)}
 
 💡 Your multi-agent system architecture is solid - this is just a configuration issue!"""
     
-    def get_job_results(self):
-        """Get sample job processing results"""
-        sample_data = {
-            'Job_ID': ['JOB001', 'JOB002', 'JOB003', 'JOB004', 'JOB005', 'JOB006'],
-            'Title': [
-                'Senior Python Developer',
-                'Machine Learning Engineer',
-                'Backend API Developer', 
-                'DevOps Engineer',
-                'Full Stack Developer',
-                'Data Scientist'
-            ],
-            'Company': [
-                'TechCorp',
-                'AI Innovations',
-                'RemoteFirst Inc',
-                'CloudTech Solutions', 
-                'WebDev Studio',
-                'DataLabs'
-            ],
-            'Location': ['Remote', 'Bangalore', 'Remote', 'Mumbai', 'Remote', 'Hyderabad'],
-            'Relevance_Score': [85, 72, 68, 45, 59, 78],
-            'Priority': ['HIGH', 'MEDIUM', 'MEDIUM', 'STANDARD', 'MEDIUM', 'HIGH'],
-            'Agent_Chain': ['Agent1→Agent2→Agent3→Agent4→Agent5'] * 6,
-            'AI_Summary': [
-                'Excellent Python + AsyncIO match',
-                'Strong ML background required',
-                'Perfect API development role',
-                'DevOps skills partially match',
-                'Good full-stack opportunity',
-                'Data science with Python focus'
-            ],
-            'Status': ['✅ Alert Sent', '✅ Alert Sent', '✅ Alert Sent', '✅ Filtered', '✅ Alert Sent', '✅ Alert Sent']
-        }
-        
-        return pd.DataFrame(sample_data)
+    def _record_webhook_run(self, result):
+        """Record an n8n trigger for the analytics dashboard"""
+        ok = result.kind == WebhookResult.OK
+        self.run_recorder.record_run(
+            uuid.uuid4().hex[:12], "n8n", time.time() - result.elapsed, result.elapsed, ok,
+            stages=[("N8N Webhook", result.elapsed, ok, 0)],
+            error=None if ok else (str(result.error) if result.error else result.kind)
+        )
     
-    def get_system_analytics(self):
-        """Get comprehensive system analytics"""
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    def _local_outcome_log(self, jobs, ctx):
+        """Summarise the jobs that made it through the local pipeline"""
+        progress_log = [
+            "",
+            "🎉 MULTI-AGENT SYSTEM STATUS:",
+            "=" * 50,
+            f"📊 {len(jobs)} jobs approved by the agent chain"
+        ]
+        for job in sorted(jobs, key=lambda job: job['relevance_score'], reverse=True)[:5]:
+            progress_log.append(
+                f"• {job['title']} at {job['company']} - {job['relevance_score']}% "
+                f"({job['priority_level']} priority, grade {job['quality_grade']})"
+            )
+        if ctx.alerts is None:
+            progress_log.append(f"📧 {len(jobs)} personalized alerts prepared for {ctx.email} "
+                                f"(mail is off: set JOBALERT_SMTP_HOST to send them)")
+        else:
+            sent, queued = ctx.alerts
+            progress_log.append(f"📧 {sent} alerts mailed to {ctx.email}, {queued} queued for the digest")
+        return "✅ SUCCESS", progress_log
+    
+    def _trace_log(self, run_id):
+        """Where a traced run spent its time, stage by stage"""
+        progress_log = ["", "⏱️ TIME BREAKDOWN:"]
+        for row in self.tracer.breakdown(run_id):
+            if row['kind'] == RUN:
+                continue
+            line = f"{row['total']:.2f}s"
+            if row['kind'] == CALL:
+                line = f"  ↳ {row['name']}: {row['calls']} calls, {line} total, {row['max']:.2f}s max"
+            else:
+                line = f"• {row['name']}: {line}"
+            if row['errors']:
+                line += f", {row['errors']} failed"
+            progress_log.append(line)
+        return progress_log
+    
+    async def _run_events(self, keywords, location, min_relevance, email, request_id=None):
+        """Async generator of (log lines, status) chunks as the run progresses.
         
-        analytics_text = f"""
-📊 MULTI-AGENT SYSTEM ANALYTICS DASHBOARD
-
-🤖 AGENT PERFORMANCE METRICS:
-┌─────────────────────────────────────────────────┐
-│ Agent 1 (Scraper)      │ 98.5% Success Rate    │
-│ Agent 2 (AI Analyzer)  │ 95.2% Success Rate    │  
-│ Agent 3 (Parser)       │ 97.8% Success Rate    │
-│ Agent 4 (Filter)       │ 92.1% Success Rate    │
-│ Agent 5 (Alert Mgr)    │ 99.3% Success Rate    │
-└─────────────────────────────────────────────────┘
-
-⚡ PROCESSING STATISTICS:
-• Total Jobs Processed: 1,247
-• Average Processing Time: 8.3 seconds per job
-• Overall System Success Rate: 96.6%
-• High-Quality Job Matches: 82%
-• User Satisfaction Score: 94/100
-
-🎯 INTELLIGENCE METRICS:
-• OpenAI API Calls: 1,247
-• Average Relevance Score: 68.4%
-• Jobs Above 70% Relevance: 45%
-• Perfect Matches (90%+): 12%
-
-📈 DAILY PERFORMANCE:
-• Jobs Scraped Today: 156
-• AI Analyses Completed: 156
-• Email Alerts Sent: 89
-• Database Records Created: 156
-
-🔗 SYSTEM HEALTH STATUS:
-• N8N Workflow Engine: 🟢 OPERATIONAL
-• OpenAI Integration: 🟢 RESPONSIVE  
-• Google Sheets Database: 🟢 CONNECTED
-• Gmail Alert System: 🟢 DELIVERING
-• Web UI Interface: 🟢 ACTIVE
-
-⏱️ RESPONSE TIME ANALYSIS:
-• Agent 1 (Scraper): 2.1 seconds
-• Agent 2 (AI Analyzer): 3.8 seconds
-• Agent 3 (Parser): 0.9 seconds  
-• Agent 4 (Filter): 0.7 seconds
-• Agent 5 (Alert Manager): 1.2 seconds
-
-🏆 ACHIEVEMENT METRICS:
-• Consecutive Successful Runs: 47
-• Zero Downtime Days: 12
-• Perfect Agent Coordination: 100%
-• User Engagement Rate: 89%
-
-🔄 LAST SYSTEM UPDATE: {current_time}
-🎖️ MULTI-AGENT STATUS: FULLY OPERATIONAL
-
-🚀 Next Enhancement: Real-time dashboard with live agent monitoring
+        status stays None until the final chunk.
         """
+        self._run_started()
+        status = None
+        try:
+            async for lines, status in self._backend_events(keywords, location, min_relevance, email, request_id):
+                yield lines, status
+        finally:
+            self._run_finished(status)
+    
+    async def _backend_events(self, keywords, location, min_relevance, email, request_id=None):
+        yield self._intro_log(keywords, location, min_relevance, email), None
         
-        return analytics_text
+        if self.backend == "local":
+            ctx = RunContext(keywords, location, min_relevance, email, run_id=request_id)
+            run_ctx = ctx
+            jobs = []
+            # Scraping to parsing is the same for every caller, so only the terms and location key the flight
+            shared = self.flights.stream(
+                ("local",) + search_key(keywords, location, 0)[:2],
+                lambda: self._pipeline_events(ctx)
+            )
+            shared_stages = 0
+            try:
+                try:
+                    async for run_ctx, result in shared:
+                        if result is None:
+                            if run_ctx is not ctx:
+                                yield [f"🔗 Sharing run {run_ctx.run_id}, already in flight for the same search"], None
+                            continue
+                        jobs = result.jobs
+                        yield [self._stage_line(result, run_ctx)], None
+                        shared_stages += 1
+                        if run_ctx is not ctx and shared_stages == self.pipeline.shared_stages:
+                            # The rest of the leader's run filters and mails for the leader
+                            break
+                finally:
+                    await shared.aclose()
+                if run_ctx is not ctx:
+                    async for result in self.pipeline.per_caller().run_iter(ctx, jobs):
+                        jobs = result.jobs
+                        yield [self._stage_line(result, ctx)], None
+            except PipelineError as e:
+                failed_run = ctx if run_ctx is not ctx and shared_stages == self.pipeline.shared_stages else run_ctx
+                yield ([f"❌ {e}", "💡 Check the job board and OpenAI settings"] + self._trace_log(failed_run.run_id),
+                       "❌ PIPELINE ERROR")
+                return
+            status, outcome_log = self._local_outcome_log(jobs, ctx)
+            yield outcome_log + self._trace_log(ctx.run_id), status
+            return
+        
+        payload = self._build_payload(keywords, location, min_relevance, email, request_id)
+        
+        async def post():
+            result = await self.trigger_engine.post(self.n8n_webhook_url, payload)
+            self._record_webhook_run(result)
+            return result
+        
+        result = await self.flights.call(self._webhook_key(keywords, location, min_relevance), post)
+        status, outcome_log = self._outcome_log(result, keywords, email)
+        yield [f"⏱️ N8N responded in {result.elapsed:.2f}s", ""] + outcome_log, status
     
-    def get_system_health(self):
-        """Get real-time system health status"""
-        health_data = f"""
-🎛️ REAL-TIME SYSTEM HEALTH MONITOR
-
-🤖 MULTI-AGENT SYSTEM STATUS:
-┌──────────────────────────────────────────┐
-│ 🕷️ Agent 1 (Scraper)     │ 🟢 READY    │
-│ 🧠 Agent 2 (AI Analyzer) │ 🟢 READY    │
-│ 📊 Agent 3 (Parser)      │ 🟢 READY    │
-│ 🎯 Agent 4 (Filter)      │ 🟢 READY    │
-│ 📧 Agent 5 (Alert Mgr)   │ 🟢 READY    │
-└──────────────────────────────────────────┘
-
-🔗 INTEGRATION STATUS:
-• N8N Cloud Platform: 🟢 CONNECTED
-• OpenAI API Service: 🟢 RESPONSIVE
-• Google Sheets API: 🟢 AUTHENTICATED
-• Gmail SMTP Service: 🟢 CONFIGURED
-• Webhook Endpoints: 🟢 LISTENING
-
-📊 CURRENT LOAD:
-• Active Workflows: 1
-• Pending Requests: 0
-• Queue Status: Empty
-• Memory Usage: 34%
-• CPU Utilization: 12%
-
-⚡ PERFORMANCE INDICATORS:
-• Average Response Time: 8.3s
-• Success Rate (24h): 96.6%
-• Error Rate: 3.4%
-• Uptime: 99.2%
-
-🔔 RECENT ACTIVITY:
-• Last Job Processing: 2 minutes ago
-• Last Email Alert: 5 minutes ago  
-• Last Database Update: 2 minutes ago
-• Last Health Check: Just now
-
-💡 SYSTEM RECOMMENDATIONS:
-✅ All systems operating normally
-✅ No maintenance required
-✅ Performance within optimal range
-✅ Ready for new job processing requests
-
-🏗️ ARCHITECTURE OVERVIEW:
-User Request → Web UI → N8N Webhook → Agent Chain → Results
+    def _stage_line(self, result, ctx):
+        line = f"{result.stage.label}: ✅ {len(result.jobs)} jobs in {result.elapsed:.2f}s"
+        if result.stage.name in ctx.notes:
+            line += f" ({ctx.notes[result.stage.name]})"
+        return line
+    
+    async def _pipeline_events(self, ctx):
+        """(ctx, StageResult) for each stage, after a (ctx, None) header naming the run"""
+        yield ctx, None
+        async for result in self.pipeline.run_iter(ctx):
+            yield ctx, result
+    
+    def _webhook_key(self, keywords, location, min_relevance):
+        # The workflow's Gmail node mails a fixed inbox and no node reads user_email, so a call does the
+        # same work whoever launches it: different users' launches of one search share it, and each
+        # caller reports the shared result in its own log
+        return ("n8n", self.n8n_webhook_url) + search_key(keywords, location, min_relevance)
+    
+    def trigger_multiagent_system(self, keywords, location, min_relevance, email):
+        """Trigger the N8N multi-agent workflow with proper error handling"""
+        try:
+            if self.backend == "local":
+                return run_async(self.trigger_multiagent_system_async(keywords, location, min_relevance, email))
+            
+            progress_log = self._intro_log(keywords, location, min_relevance, email)
+            payload = self._build_payload(keywords, location, min_relevance, email)
+            
+            def post():
+                result = post_webhook(self.n8n_webhook_url, payload, timeout=self.webhook_timeout)
+                self._record_webhook_run(result)
+                return result
+            
+            self._run_started()
+            status = None
+            try:
+                result = self.flights.do(self._webhook_key(keywords, location, min_relevance), post)
+                status, outcome_log = self._outcome_log(result, keywords, email)
+            finally:
+                self._run_finished(status)
+            
+            progress_log.extend(outcome_log)
+            return self._format_output(status, progress_log)
+            
+        except Exception as e:
+            return self._error_output(e)
+    
+    async def trigger_multiagent_system_async(self, keywords, location, min_relevance, email):
+        """Non-blocking trigger: awaits the run on the event loop instead of a worker thread"""
+        try:
+            progress_log = []
+            status = None
+            async for lines, status in self._run_events(keywords, location, min_relevance, email):
+                progress_log.extend(lines)
+            return self._format_output(status, progress_log)
+            
+        except Exception as e:
+            return self._error_output(e)
+    
+    async def _execute(self, keywords, location, min_relevance, email, request_id=None):
+        """Run once, yielding (execution log so far, final status or None)"""
+        log = ExecutionLog()
+        status = None
+        try:
+            log.append("MULTI-AGENT EXECUTION LOG:", "=" * 60)
+            async for lines, status in self._run_events(keywords, location, min_relevance, email, request_id):
+                yield log.extend(lines), None
+            
+            yield log.append(
+                "=" * 60,
+                "",
+                status,
+                "",
+                "🏗️ SYSTEM ARCHITECTURE:",
+                ARCHITECTURE[self.backend]
+            ), status
+            
+        except Exception as e:
+            yield log.append("", self._error_output(e)), None
+    
+    def _execute_request(self, request):
+        """Worker pool handler for one queued launch request"""
+        params = request['params']
+        return self._execute(
+            params['keywords'], params['location'], params['min_relevance'], params['email'],
+            request_id=request['request_id']
+        )
+    
+    def submit_run(self, keywords, location, min_relevance, email):
+        """Queue a launch request; returns (request_id, queue position), raises QueueFull"""
+        # Per-user limits are keyed on the alert address
+        user = (email or "").strip().lower()
+        request_id, position = self.run_queue.enqueue({
+            'keywords': keywords,
+            'location': location,
+            'min_relevance': min_relevance,
+            'email': email
+        }, user=user)
+        self.workers.notify()
+        return request_id, position
+    
+    def get_run_status(self, request_id):
+        """Current state and execution log of a queued request"""
+        request = self.run_queue.get((request_id or "").strip())
+        if request is None:
+            return f"❓ Unknown request ID: {request_id}"
+        header = f"🆔 Request {request['request_id']}: {request['state'].upper()}"
+        if request['state'] == QUEUED:
+            header += f" (position {request['position']} in queue)"
+        return f"{header}\n\n{request['log']}"
+    
+    async def stream_multiagent_system(self, keywords, location, min_relevance, email):
+        """Queue the run and stream its execution log as the worker makes progress"""
+        log = ExecutionLog()
+        try:
+            request_id, position = self.submit_run(keywords, location, min_relevance, email)
+        except QueueFull as e:
+            yield log.append(
+                "🚦 SYSTEM BUSY",
+                f"Request not accepted: {e.reason}",
+                "💡 Try again in a moment"
+            ), ""
+            return
+        
+        yield log.append(f"🆔 Request ID: {request_id}", f"📥 Queued at position {position}", ""), request_id
+        shown = 0
+        last_position = position
+        async for request in follow(self.run_queue, request_id):
+            if request['state'] == QUEUED:
+                if request['position'] != last_position:
+                    last_position = request['position']
+                    yield log.append(f"⏳ Position {last_position} in queue"), request_id
+                continue
+            # The worker's log only grows, so append just the new tail
+            tail = request['log'][shown:]
+            shown = len(request['log'])
+            if tail:
+                yield log.extend(tail.splitlines()), request_id
+    
+    def get_job_results(self, min_score=None, priority=None, search=None, sort_by='Date',
+                        descending=True, limit=50, offset=0):
+        """Get processed jobs from the results store, filtered and sorted in SQL"""
+        rows, _ = self.results_store.query(
+            sort_by=sort_by,
+            descending=descending,
+            limit=limit,
+            offset=offset,
+            min_score=min_score,
+            priority=priority or None,
+            search=search or None
+        )
+        return _table(rows, COLUMNS)
+    
+    def get_results_page(self, search, priority, min_score, sort_by, descending, page, page_size):
+        """Fetch one page of results; returns (table, page info, clamped page number)"""
+        rows, total, page, pages = self.results_store.page(
+            page=int(page),
+            page_size=int(page_size),
+            sort_by=sort_by,
+            descending=descending,
+            min_score=min_score or None,
+            priority=None if priority in (None, "", "ALL") else priority,
+            search=search or None
+        )
+        info = f"Page {page} of {pages} • {total:,} matching jobs"
+        return _table(rows, COLUMNS), info, page
+    
+    async def _run_scheduled(self, searches):
+        """Scheduler runner: one run for all due subscribers of a query.
 
-🎯 MULTI-AGENT COORDINATION: PERFECT
-🚀 SYSTEM STATUS: FULLY OPERATIONAL
+        Always the local pipeline, whatever the backend: the n8n workflow
+        mails one fixed inbox and knows nothing of subscribers, so it could
+        not deliver their alerts.
         """
-        
-        return health_data
+        return await self.search_runner(searches)
+    
+    def get_saved_searches(self):
+        """Saved searches as a table"""
+        rows = self.saved_searches.list(limit=500)
+        for row in rows:
+            for column in ('next_run_at', 'last_run_at'):
+                row[column] = datetime.fromtimestamp(row[column]).strftime('%Y-%m-%d %H:%M') if row[column] else ""
+        return _table(rows, ['id', 'keywords', 'location', 'min_relevance', 'email', 'skills',
+                             'schedule', 'next_run_at', 'last_run_at', 'last_status'])
+    
+    def save_search(self, keywords, location, min_relevance, email, schedule, skills=""):
+        """Save a scheduled search; returns (message, table)"""
+        try:
+            search_id = self.saved_searches.add(keywords, location, min_relevance, email, schedule, skills)
+        except ValueError as e:
+            return f"❌ {e}", self.get_saved_searches()
+        return f"✅ Saved search #{search_id}: '{keywords}' every {schedule} for {email}", self.get_saved_searches()
+    
+    def remove_saved_search(self, search_id):
+        """Delete a saved search by id; returns (message, table)"""
+        if search_id is None or not self.saved_searches.remove(int(search_id)):
+            return f"❓ No saved search #{search_id}", self.get_saved_searches()
+        return f"🗑️ Removed saved search #{int(search_id)}", self.get_saved_searches()
+    
+    def get_system_analytics(self):
+        """Get system analytics computed from the recorded runs"""
+        self.analytics.refresh()
+        return render_analytics(self.analytics.snapshot())
+    
+    def get_system_health(self):
+        """Get system health from the latest cached probe results"""
+        stage_spans = {}
+        last_run = last_webhook = None
+        for span in self.tracer.spans():
+            if span.kind == STAGE:
+                stage_spans[span.name] = span
+            elif span.kind == RUN:
+                last_run = span.started_at + span.duration
+            elif span.name == WEBHOOK:
+                last_webhook = span.started_at + span.duration
+        agents = []
+        for stage in self.pipeline.stages:
+            span = stage_spans.get(stage.name)
+            status = "⚪ IDLE" if span is None else "🟢 READY" if span.ok else "🔴 FAILED"
+            agents.append((stage.label, status))
+        return render_health(
+            self.health.snapshot(),
+            agents=agents,
+            activity=[("Last Local Pipeline Run", last_run), ("Last N8N Webhook Call", last_webhook)]
+        )
 
-def create_multiagent_interface():
-    """Create the complete multi-agent web interface"""
+def create_multiagent_interface(ui=None):
+    """Create the complete multi-agent web interface.
+    
+    Tab data is queried when a tab is opened or refreshed, not while the
+    interface is built.
+    """
+    import gradio as gr
     
     # Initialize the UI system
-    ui = MultiAgentJobAlertUI()
+    ui = ui or MultiAgentJobAlertUI()
     
     # Custom CSS for better appearance
     custom_css = """
@@ -401,25 +720,82 @@ def create_multiagent_interface():
                 placeholder="Click 'Launch Multi-Agent System' to see real-time agent processing..."
             )
             
+            with gr.Row():
+                request_id_box = gr.Textbox(
+                    label="🆔 Request ID",
+                    placeholder="Filled in when a run is queued",
+                    scale=3
+                )
+                status_button = gr.Button("🔎 Check Status", variant="secondary", scale=1)
+            
             # Connect the launch functionality
+            # The click only queues the run; the worker pool executes it and
+            # this async handler streams the log without holding a thread
             launch_button.click(
-                fn=ui.trigger_multiagent_system,
+                fn=ui.stream_multiagent_system,
                 inputs=[keywords_input, location_input, relevance_slider, email_input],
+                outputs=[system_output, request_id_box],
+                concurrency_limit=None
+            )
+            
+            status_button.click(
+                fn=ui.get_run_status,
+                inputs=[request_id_box],
                 outputs=[system_output]
             )
         
-        with gr.Tab("📊 Job Processing Results"):
+        with gr.Tab("📊 Job Processing Results") as results_tab:
             gr.Markdown("### View Processed Jobs and Agent Tracking")
             
-            refresh_results_btn = gr.Button("🔄 Refresh Job Results", variant="secondary")
+            with gr.Row():
+                results_search = gr.Textbox(
+                    label="🔎 Search",
+                    placeholder="Title or company",
+                    scale=2
+                )
+                results_priority = gr.Dropdown(
+                    label="🏷️ Priority",
+                    choices=["ALL", "URGENT", "HIGH", "MEDIUM", "STANDARD"],
+                    value="ALL"
+                )
+                results_min_score = gr.Slider(
+                    minimum=0,
+                    maximum=100,
+                    step=5,
+                    value=0,
+                    label="🎯 Min Relevance (%)"
+                )
+            
+            with gr.Row():
+                results_sort = gr.Dropdown(
+                    label="↕️ Sort By",
+                    choices=list(SORT_COLUMNS),
+                    value="Date"
+                )
+                results_descending = gr.Checkbox(label="Descending", value=True)
+                results_page_size = gr.Dropdown(
+                    label="Rows per Page",
+                    choices=[25, 50, 100],
+                    value=50
+                )
+                refresh_results_btn = gr.Button("🔄 Refresh Job Results", variant="secondary")
             
+            # Only the visible page is ever queried and sent to the browser;
+            # filtering and sorting run in the results store
             results_table = gr.Dataframe(
-                value=ui.get_job_results(),
+                headers=COLUMNS,
                 label="📋 Multi-Agent Processed Jobs Database",
                 wrap=True,
                 interactive=False
             )
             
+            with gr.Row():
+                prev_page_btn = gr.Button("⬅️ Previous", size="sm")
+                results_page_info = gr.Markdown("Page 1 of 1")
+                next_page_btn = gr.Button("Next ➡️", size="sm")
+            
+            results_page = gr.State(1)
+            
             gr.Markdown("""
             **Legend:**
             - **HIGH Priority**: 60%+ relevance score
@@ -428,43 +804,135 @@ def create_multiagent_interface():
             - **Agent Chain**: Shows all 5 agents processed each job
             """)
             
-            refresh_results_btn.click(
-                fn=ui.get_job_results,
-                outputs=[results_table]
+            results_filters = [results_search, results_priority, results_min_score,
+                               results_sort, results_descending]
+            results_outputs = [results_table, results_page_info, results_page]
+            
+            def first_results_page(search, priority, min_score, sort_by, descending, page_size):
+                return ui.get_results_page(search, priority, min_score, sort_by, descending, 1, page_size)
+            
+            def shift_results_page(offset):
+                def shift(search, priority, min_score, sort_by, descending, page, page_size):
+                    return ui.get_results_page(search, priority, min_score, sort_by, descending,
+                                               page + offset, page_size)
+                return shift
+            
+            # Any filter or sort change starts again from the first page
+            gr.on(
+                triggers=[refresh_results_btn.click, results_search.submit, results_priority.change,
+                          results_min_score.release, results_sort.change, results_descending.change,
+                          results_page_size.change, results_tab.select],
+                fn=first_results_page,
+                inputs=results_filters + [results_page_size],
+                outputs=results_outputs
+            )
+            
+            prev_page_btn.click(
+                fn=shift_results_page(-1),
+                inputs=results_filters + [results_page, results_page_size],
+                outputs=results_outputs
+            )
+            next_page_btn.click(
+                fn=shift_results_page(1),
+                inputs=results_filters + [results_page, results_page_size],
+                outputs=results_outputs
             )
         
-        with gr.Tab("📈 System Analytics"):
+        with gr.Tab("⏰ Scheduled Alerts") as scheduled_tab:
+            gr.Markdown("### Saved Searches That Run on a Schedule")
+            gr.Markdown("*Scheduled searches always run on the local pipeline, which alerts each subscriber; "
+                        "the n8n workflow only mails its own configured inbox.*")
+            
+            with gr.Row():
+                scheduled_keywords = gr.Textbox(label="🔍 Job Keywords", value="Python Developer", scale=2)
+                scheduled_location = gr.Textbox(label="📍 Location Preference", value="Remote")
+                scheduled_relevance = gr.Slider(
+                    minimum=20,
+                    maximum=80,
+                    step=5,
+                    value=35,
+                    label="🎯 Minimum Relevance Score (%)"
+                )
+            
+            with gr.Row():
+                scheduled_email = gr.Textbox(label="📧 Email for Job Alerts", value="ranjan@example.com", scale=2)
+                scheduled_skills = gr.Textbox(
+                    label="🧠 Your Skills",
+                    placeholder="Python, Asyncio, API Development",
+                    info="Comma-separated; jobs are scored against these (defaults to the keywords)",
+                    scale=2
+                )
+                scheduled_schedule = gr.Dropdown(
+                    label="⏱️ Run Every",
+                    choices=SCHEDULES,
+                    value="@daily",
+                    allow_custom_value=True,
+                    info="Intervals like 15m, 6h, 1d or @hourly/@daily"
+                )
+                save_search_btn = gr.Button("💾 Save Search", variant="primary")
+            
+            scheduled_message = gr.Markdown()
+            saved_searches_table = gr.Dataframe(label="📋 Saved Searches", interactive=False, wrap=True)
+            
+            with gr.Row():
+                remove_search_id = gr.Number(label="Search ID", precision=0)
+                remove_search_btn = gr.Button("🗑️ Remove Search", variant="secondary")
+                refresh_searches_btn = gr.Button("🔄 Refresh", variant="secondary")
+            
+            save_search_btn.click(
+                fn=ui.save_search,
+                inputs=[scheduled_keywords, scheduled_location, scheduled_relevance, scheduled_email,
+                        scheduled_schedule, scheduled_skills],
+                outputs=[scheduled_message, saved_searches_table]
+            )
+            remove_search_btn.click(
+                fn=ui.remove_saved_search,
+                inputs=[remove_search_id],
+                outputs=[scheduled_message, saved_searches_table]
+            )
+            gr.on(
+                triggers=[refresh_searches_btn.click, scheduled_tab.select],
+                fn=ui.get_saved_searches,
+                outputs=[saved_searches_table]
+            )
+        
+        with gr.Tab("📈 System Analytics") as analytics_tab:
             gr.Markdown("### Multi-Agent Performance & Intelligence Analytics")
             
             analytics_refresh_btn = gr.Button("🔄 Update Analytics Dashboard", variant="secondary")
             
             analytics_display = gr.Textbox(
-                value=ui.get_system_analytics(),
+                placeholder="Loading analytics...",
                 label="📊 Comprehensive Analytics Dashboard",
                 lines=25,
                 max_lines=30,
                 interactive=False
             )
             
-            analytics_refresh_btn.click(
+            gr.on(
+                triggers=[analytics_refresh_btn.click, analytics_tab.select],
                 fn=ui.get_system_analytics,
                 outputs=[analytics_display]
             )
+            # Fold the recorded history into the rollups once the page is up, so
+            # neither startup nor the first look at this tab waits for it
+            app.load(fn=ui.analytics.refresh)
         
-        with gr.Tab("🎛️ System Health Monitor"):
+        with gr.Tab("🎛️ System Health Monitor") as health_tab:
             gr.Markdown("### Real-Time Multi-Agent System Monitoring")
             
             health_refresh_btn = gr.Button("🔄 Refresh System Status", variant="secondary")
             
             health_display = gr.Textbox(
-                value=ui.get_system_health(),
+                placeholder="Loading system status...",
                 label="🎛️ Live System Health Dashboard",
                 lines=20,
                 max_lines=25,
                 interactive=False
             )
             
-            health_refresh_btn.click(
+            gr.on(
+                triggers=[health_refresh_btn.click, health_tab.select],
                 fn=ui.get_system_health,
                 outputs=[health_display]
             )
@@ -480,6 +948,14 @@ def create_multiagent_interface():
                     info="Update this with your actual N8N webhook URL"
                 )
             
+            with gr.Row():
+                backend_input = gr.Radio(
+                    label="⚙️ Execution Backend",
+                    choices=BACKENDS,
+                    value=ui.backend,
+                    info="Run the agent chain on N8N, or in-process with the local Python pipeline"
+                )
+            
             with gr.Row():
                 test_connection_btn = gr.Button("🧪 Test N8N Connection", variant="secondary")
                 save_config_btn = gr.Button("💾 Save Configuration", variant="primary")
@@ -492,37 +968,29 @@ def create_multiagent_interface():
             
             # Configuration functions
             def test_webhook_connection(url):
-                try:
-                    test_payload = {
-                        "test": True,
-                        "source": "ui_connection_test",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    response = requests.post(
-                        url,
-                        json=test_payload,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        return f"✅ Connection Successful!\n\nStatus: {response.status_code}\nResponse: Webhook is responding correctly\nN8N Integration: Ready for multi-agent processing"
-                    else:
-                        return f"⚠️ Connection Partial\n\nStatus: {response.status_code}\nNote: Webhook responded but with unexpected status\nAction: Check N8N workflow configuration"
-                        
-                except requests.exceptions.Timeout:
+                test_payload = {
+                    "test": True,
+                    "source": "ui_connection_test",
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                result = post_webhook(url, test_payload, timeout=10)
+                
+                if result.kind == WebhookResult.OK:
+                    return f"✅ Connection Successful!\n\nStatus: {result.status_code}\nResponse: Webhook is responding correctly\nN8N Integration: Ready for multi-agent processing"
+                elif result.status_code is not None:
+                    return f"⚠️ Connection Partial\n\nStatus: {result.status_code}\nNote: Webhook responded but with unexpected status\nAction: Check N8N workflow configuration"
+                elif result.kind == WebhookResult.TIMEOUT:
                     return "⏰ Connection Timeout\n\nThe webhook request timed out\nPossible causes:\n- N8N workflow is processing\n- Network latency\nAction: Try again or check N8N logs"
-                    
-                except requests.exceptions.ConnectionError:
+                elif result.kind == WebhookResult.CONNECTION_ERROR:
                     return "❌ Connection Failed\n\nCannot reach the webhook URL\nPossible causes:\n- Invalid URL\n- N8N workflow not active\n- Network issues\nAction: Verify URL and N8N status"
-                    
-                except Exception as e:
-                    return f"❌ Test Error\n\nError: {str(e)}\nAction: Check URL format and try again"
+                else:
+                    return f"❌ Test Error\n\nError: {str(result.error)}\nAction: Check URL format and try again"
             
-            def save_webhook_config(url):
+            def save_webhook_config(url, backend):
                 ui.n8n_webhook_url = url
-                return f"✅ Configuration Saved\n\nWebhook URL updated to:\n{url}\n\nYou can now test the multi-agent system!"
+                ui.backend = backend
+                return f"✅ Configuration Saved\n\nWebhook URL updated to:\n{url}\nExecution backend: {backend}\n\nYou can now test the multi-agent system!"
             
             # Connect configuration functions
             test_connection_btn.click(
@@ -533,7 +1001,7 @@ def create_multiagent_interface():
             
             save_config_btn.click(
                 fn=save_webhook_config,
-                inputs=[webhook_url_input],
+                inputs=[webhook_url_input, backend_input],
                 outputs=[connection_status_display]
             )
             
@@ -584,11 +1052,23 @@ if __name__ == "__main__":
     print("")
     print("🔧 Don't forget to configure your N8N webhook URL in the Settings tab!")
     
-    app = create_multiagent_interface()
-    app.launch(
+    ui = MultiAgentJobAlertUI()
+    app = create_multiagent_interface(ui)
+    try:
+        from jobalert.metrics import serve
+    except ImportError:
+        # Without prometheus_client there is no /metrics; launch Gradio on its own
+        serve = None
+    
+    launch_kwargs = dict(
         server_name="0.0.0.0",
         server_port=7860,
         share=True,
         inbrowser=True,
         show_error=True
-    )
\ No newline at end of file
+    )
+    if serve is not None:
+        print("📈 Prometheus metrics at http://localhost:7860/metrics")
+        serve(app, ui, **launch_kwargs)
+    else:
+        app.launch(**launch_kwargs)
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+# State files go to a throwaway directory; must be set before jobalert.paths is imported
+os.environ["JOBALERT_DATA_DIR"] = tempfile.mkdtemp(prefix="jobalert-tests-")
+
+import pytest
+
+from benchmarks.fakes import (FakeJobBoardServer, FakeLLMServer, FakeSheetsServer, FakeSMTPServer,
+                              FakeWebhookServer, make_postings)
+
+
+@pytest.fixture
+def board():
+    with FakeJobBoardServer(postings=make_postings(60, seed=3), per_page=20) as fake:
+        yield fake
+
+
+@pytest.fixture
+def llm():
+    with FakeLLMServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def sheets():
+    with FakeSheetsServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def smtp():
+    with FakeSMTPServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def webhook():
+    with FakeWebhookServer() as fake:
+        yield fake
+
+
+@pytest.fixture
+def ui(monkeypatch):
+    """The app with its background health probes, scheduler and retention stopped"""
+    import multiagentjobalert
+
+    # The monitor starts probing in the constructor; give it nothing to reach out to
+    monkeypatch.setattr(multiagentjobalert.MultiAgentJobAlertUI, "_health_probes", lambda self: [])
+    app = multiagentjobalert.MultiAgentJobAlertUI()
+    app.health.stop()
+    app.scheduler.stop()
+    if app.retention is not None:
+        # Its first pass must not race the test's own state
+        app.retention.stop(timeout=10)
+    return app
@@ -0,0 +1,129 @@
+import asyncio
+import smtplib
+
+import pytest
+
+from benchmarks.fakes import FakeSMTPServer
+from jobalert.alerts import BATCH, IMMEDIATE, AlertDispatcher, SmtpMailer
+from jobalert.fetcher import ArbeitnowFetcher
+from jobalert.pipeline import (AlertStage, AnalyzeStage, DispatchAlertsStage, FilterStage, ParseStage, Pipeline,
+                               RunContext, ScrapeStage)
+
+
+def job(n, alert_type, score=70):
+    return {'title': f"Python Developer {n}", 'company': f"Company {n}", 'location': "Remote",
+            'url': f"https://jobs.example/{n}", 'relevance_score': score, 'alert_type': alert_type}
+
+
+def dispatcher_for(smtp):
+    return AlertDispatcher(SmtpMailer(smtp.host, smtp.port, starttls=False))
+
+
+def test_immediate_alerts_are_mailed_now_and_batch_ones_queued(smtp):
+    dispatcher = dispatcher_for(smtp)
+    sent, queued = dispatcher.dispatch([
+        ("alice@example.com", [job(1, IMMEDIATE, 90), job(2, BATCH), job(3, IMMEDIATE, 80)]),
+        ("bob@example.com", [job(1, IMMEDIATE, 90), job(4, BATCH)])
+    ])
+
+    assert (sent, queued) == (3, 2)
+    assert sorted(smtp.recipients()) == ["alice@example.com"] * 2 + ["bob@example.com"]
+    # Every immediate mail of the run over one connection
+    assert smtp.connections_opened == 1
+    assert dispatcher.pending() == 2
+
+
+def test_digests_send_one_mail_per_recipient(smtp):
+    dispatcher = dispatcher_for(smtp)
+    dispatcher.dispatch([("alice@example.com", [job(1, BATCH), job(2, BATCH)])])
+    # Found again before the digest: listed once
+    dispatcher.dispatch([("alice@example.com", [job(2, BATCH)]), ("bob@example.com", [job(3, BATCH)])])
+    assert smtp.requests_served == 0
+
+    assert dispatcher.send_digests() == 2
+    assert sorted(smtp.recipients()) == ["alice@example.com", "bob@example.com"]
+    assert smtp.connections_opened == 1
+    alice_digest = next(data for _, recipients, data in smtp.messages if recipients == ["alice@example.com"])
+    assert b"2 new or updated job matches" in alice_digest
+    assert dispatcher.pending() == 0 and dispatcher.send_digests() == 0
+
+
+def test_jobs_are_alerted_once_until_they_change(smtp):
+    dispatcher = dispatcher_for(smtp)
+    deliveries = [("alice@example.com", [job(1, IMMEDIATE, 90), job(2, BATCH)])]
+    dispatcher.dispatch(deliveries)
+    dispatcher.send_digests()
+    assert smtp.requests_served == 2
+
+    assert dispatcher.dispatch(deliveries) == (0, 0)
+    assert dispatcher.send_digests() == 0
+    assert smtp.requests_served == 2
+    # Bob has not had it, and a changed posting is news again
+    assert dispatcher.dispatch([("bob@example.com", [job(1, IMMEDIATE, 90)]),
+                                ("alice@example.com", [{**job(1, IMMEDIATE, 90), 'title': "Staff Engineer"}])]) == (2, 0)
+
+
+def test_a_second_run_over_the_same_postings_mails_nothing(board, llm, smtp):
+    dispatcher = dispatcher_for(smtp)
+    pipeline = Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=10),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage(),
+        FilterStage(),
+        AlertStage(),
+        DispatchAlertsStage(dispatcher)
+    ])
+    first = RunContext("Python", "", 0, "alice@example.com")
+    asyncio.run(pipeline.run(first))
+    dispatcher.send_digests()
+    mails = smtp.requests_served
+    assert first.alerts[0] > 0 and mails >= first.alerts[0]
+
+    second = RunContext("Python", "", 0, "alice@example.com")
+    asyncio.run(pipeline.run(second))
+    dispatcher.send_digests()
+    assert second.alerts == (0, 0)
+    assert smtp.requests_served == mails
+
+
+def test_failed_mail_keeps_every_job_queued():
+    with FakeSMTPServer(fail_first=2) as smtp:
+        dispatcher = dispatcher_for(smtp)
+        with pytest.raises(smtplib.SMTPException):
+            dispatcher.dispatch([("alice@example.com", [job(1, IMMEDIATE, 90), job(2, BATCH)])])
+        # The immediate alert that failed goes with the digest instead
+        assert dispatcher.pending() == 2
+
+        with pytest.raises(smtplib.SMTPException):
+            dispatcher.send_digests()
+        assert dispatcher.pending() == 2
+
+        assert dispatcher.send_digests() == 1
+        assert smtp.recipients() == ["alice@example.com"] and dispatcher.pending() == 0
+
+
+class FailAfterFirstMailer(SmtpMailer):
+    """Lets the relay accept the first message of a send and reject the next"""
+
+    def __init__(self, smtp):
+        super().__init__(smtp.host, smtp.port, starttls=False)
+        self.smtp = smtp
+
+    def send(self, messages, on_sent=None):
+        def sent(index):
+            on_sent(index)
+            self.smtp.fail_first = self.smtp.errors_injected + 1
+
+        return super().send(messages, sent)
+
+
+def test_each_digest_leaves_the_queue_when_it_is_sent():
+    with FakeSMTPServer() as smtp:
+        dispatcher = AlertDispatcher(FailAfterFirstMailer(smtp))
+        dispatcher.dispatch([("alice@example.com", [job(1, BATCH)]), ("bob@example.com", [job(2, BATCH)])])
+        with pytest.raises(smtplib.SMTPException):
+            dispatcher.send_digests()
+
+        assert dispatcher.pending() == 1 and dispatcher.digests_sent == 1
+        assert dispatcher.send_digests() == 1
+        assert sorted(smtp.recipients()) == ["alice@example.com", "bob@example.com"]
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+from benchmarks.fakes import FakeLLMServer, make_postings
+from jobalert.cache import AnalysisCache
+from jobalert.pipeline import (FALLBACK_ANALYSIS, AnalyzeStage, FilterStage, ParseStage, Pipeline, RunContext,
+                               ScrapeStage, now_iso)
+from jobalert.ratelimit import TokenBucket
+
+
+def make_jobs(count):
+    ctx = RunContext()
+    return [ScrapeStage().to_job(posting, index, ctx, now_iso()) for index, posting in enumerate(make_postings(count))]
+
+
+def analyze(stage, jobs):
+    ctx = RunContext()
+    asyncio.run(stage.run(jobs, ctx))
+    return ctx.analyses
+
+
+def test_batched_prompts_fan_out_to_every_job(llm):
+    analyses = analyze(AnalyzeStage(base_url=llm.base_url, api_key="test", batch_size=4), make_jobs(10))
+
+    assert llm.requests_served == 3
+    assert len(analyses) == 10
+
+
+def test_requests_are_paced_by_the_token_bucket(llm):
+    stage = AnalyzeStage(base_url=llm.base_url, api_key="test", concurrency=8, requests_per_second=20, burst=1)
+    started = time.perf_counter()
+    analyze(stage, make_jobs(10))
+
+    # One token up front, then one every 50ms
+    assert time.perf_counter() - started >= 0.45
+    assert llm.requests_served == 10
+
+
+def test_one_bucket_paces_several_event_loops():
+    bucket = TokenBucket(rate=50, capacity=1)
+    errors = []
+
+    def drain():
+        async def take():
+            for _ in range(10):
+                await bucket.acquire()
+        try:
+            asyncio.run(take())
+        except Exception as e:
+            errors.append(e)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=drain) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert time.perf_counter() - started >= 29 / 50 - 0.05
+
+
+def test_server_errors_are_retried_until_they_succeed():
+    with FakeLLMServer(error_status=503, fail_first=2) as llm:
+        stage = AnalyzeStage(base_url=llm.base_url, api_key="test", concurrency=1, retry_backoff=0.01)
+        analyses = analyze(stage, make_jobs(4))
+
+    assert len(analyses) == 4
+    assert stage.retried == 2
+    assert llm.requests_served == 4 + 2
+
+
+def test_rate_limited_requests_give_up_after_the_last_retry():
+    with FakeLLMServer(error_status=429, error_rate=1.0) as llm:
+        stage = AnalyzeStage(base_url=llm.base_url, api_key="test", retries=2, retry_backoff=0.01)
+        analyses = analyze(stage, make_jobs(4))
+
+    # No analysis: Agent 3 falls back to manual review
+    assert analyses == {}
+    assert llm.requests_served == 4 * 3
+
+
+def test_client_errors_are_not_retried():
+    with FakeLLMServer(error_status=400, error_rate=1.0) as llm:
+        stage = AnalyzeStage(base_url=llm.base_url, api_key="test", retry_backoff=0.01)
+        analyze(stage, make_jobs(4))
+
+    assert stage.retried == 0
+    assert llm.requests_served == 4
+
+
+def parse(stage, jobs):
+    ctx = RunContext()
+    return asyncio.run(Pipeline([stage, ParseStage()]).run(ctx, jobs))
+
+
+def test_a_non_object_reply_gets_the_fallback_and_is_not_cached():
+    cache = AnalysisCache()
+    with FakeLLMServer(reply='[{"relevance_score": 80}]') as llm:
+        jobs = parse(AnalyzeStage(base_url=llm.base_url, api_key="test", cache=cache), make_jobs(3))
+
+    assert [job['relevance_score'] for job in jobs] == [FALLBACK_ANALYSIS['relevance_score']] * 3
+    assert cache.stats()['size'] == 0
+
+
+def test_a_string_score_is_read_as_a_number():
+    with FakeLLMServer(reply='{"relevance_score": "72", "match_reasons": "Python"}') as llm:
+        jobs = parse(AnalyzeStage(base_url=llm.base_url, api_key="test"), make_jobs(2))
+    approved = asyncio.run(FilterStage().run(jobs, RunContext(min_relevance=70)))
+
+    assert [job['relevance_score'] for job in approved] == [72, 72]
+    assert approved[0]['match_reasons'] == ["Python"]
+
+
+def test_an_out_of_range_score_is_not_trusted():
+    with FakeLLMServer(reply='{"relevance_score": 250}') as llm:
+        jobs = parse(AnalyzeStage(base_url=llm.base_url, api_key="test"), make_jobs(1))
+
+    assert jobs[0]['relevance_score'] == FALLBACK_ANALYSIS['relevance_score']
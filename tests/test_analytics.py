@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+
+from benchmarks.fakes import STAGE_NAMES, seed_runs
+from jobalert.analytics import AnalyticsEngine, RunRecorder, render_analytics
+
+
+def seeded(count, seed=1):
+    recorder = RunRecorder()
+    seed_runs(recorder, count, seed=seed)
+    return recorder
+
+
+def test_aggregates_match_the_recorded_runs():
+    recorder = seeded(500)
+    engine = AnalyticsEngine(recorder)
+    engine.refresh()
+    snapshot = engine.snapshot()
+
+    runs, stages = recorder.read_since(0, 0)
+    scores = np.array([score for encoded in runs['scores'] for score in json.loads(encoded)])
+    assert snapshot['runs'] == 500 and snapshot['runs_ok'] == int(runs['ok'].sum())
+    assert snapshot['jobs_scraped'] == 500 * 40 and snapshot['jobs_approved'] == 500 * 8
+    assert snapshot['average_score'] == scores.mean()
+    assert snapshot['above_70'] == (scores >= 70).mean()
+    assert snapshot['score_counts'].sum() == scores.size
+    assert snapshot['jobs_per_day'].sum() == 500 * 40
+    assert snapshot['runs_by_backend'].sum() == 500
+    # Percentiles are read off log-spaced buckets, so they are upper bounds within ~6%
+    p95 = np.percentile(runs['duration'], 95)
+    assert p95 <= snapshot['run_p95'] <= p95 * 1.07
+    assert list(snapshot['stages']) == list(STAGE_NAMES)
+    assert all(stage['calls'] == 500 and stage['success_rate'] == 1.0 for stage in snapshot['stages'].values())
+    assert "Total Runs: 500" in render_analytics(snapshot)
+
+
+def test_refreshes_only_fold_in_new_runs():
+    recorder = seeded(300)
+    engine = AnalyticsEngine(recorder)
+    engine.refresh()
+    seed_runs(recorder, 200, seed=2)
+    engine.refresh()
+    engine.refresh()
+
+    everything = AnalyticsEngine(recorder)
+    everything.refresh()
+    incremental, full = engine.snapshot(), everything.snapshot()
+    assert incremental['runs'] == full['runs'] == 500
+    assert incremental['runs_ok'] == full['runs_ok']
+    assert incremental['average_score'] == full['average_score']
+    assert list(incremental['score_counts']) == list(full['score_counts'])
+    assert incremental['run_p50'] == full['run_p50'] and incremental['run_p95'] == full['run_p95']
+    assert incremental['stages'] == full['stages']
+
+
+def test_an_empty_recorder_renders_without_figures():
+    engine = AnalyticsEngine(RunRecorder())
+    engine.refresh()
+    snapshot = engine.snapshot()
+
+    assert snapshot['runs'] == 0 and snapshot['success_rate'] is None and snapshot['run_p50'] is None
+    assert "No runs recorded yet" in render_analytics(snapshot)
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeLLMServer, make_postings
+from jobalert.cache import AnalysisCache, analysis_key
+from jobalert.pipeline import AnalyzeStage, RunContext, ScrapeStage, now_iso
+
+ANALYSIS = {'relevance_score': 80, 'match_reasons': ["Python"]}
+
+
+def make_jobs(count):
+    ctx = RunContext()
+    return [ScrapeStage().to_job(posting, index, ctx, now_iso()) for index, posting in enumerate(make_postings(count))]
+
+
+def test_entries_expire_after_the_ttl():
+    cache = AnalysisCache(ttl=0.1)
+    cache.put("key", ANALYSIS)
+    assert cache.get("key") == ANALYSIS
+
+    time.sleep(0.2)
+    assert cache.get("key") is None
+    assert cache.stats()['expired'] == 1 and cache.stats()['size'] == 0
+
+
+def test_the_least_recently_used_entry_is_evicted():
+    cache = AnalysisCache(max_entries=2)
+    cache.put("first", ANALYSIS)
+    time.sleep(0.01)
+    cache.put("second", ANALYSIS)
+    time.sleep(0.01)
+    # Reading "first" makes "second" the least recently used
+    cache.get("first")
+    time.sleep(0.01)
+    cache.put("third", ANALYSIS)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == ANALYSIS and cache.get("third") == ANALYSIS
+    assert cache.stats()['evictions'] == 1 and cache.stats()['size'] == 2
+
+
+def test_keys_change_with_the_job_the_prompt_and_the_model():
+    job = make_jobs(1)[0]
+    key = analysis_key(job, "prompt v1", "gpt-3.5-turbo")
+
+    assert analysis_key(dict(job), "prompt v1", "gpt-3.5-turbo") == key
+    assert analysis_key({**job, 'description': "Rewritten"}, "prompt v1", "gpt-3.5-turbo") != key
+    assert analysis_key(job, "prompt v2", "gpt-3.5-turbo") != key
+    assert analysis_key(job, "prompt v1", "gpt-4o-mini") != key
+
+
+def test_a_new_model_does_not_reuse_old_analyses(llm):
+    cache = AnalysisCache()
+    jobs = make_jobs(3)
+    asyncio.run(AnalyzeStage(base_url=llm.base_url, api_key="test", cache=cache).run(jobs, RunContext()))
+    asyncio.run(AnalyzeStage(base_url=llm.base_url, api_key="test", cache=cache).run(jobs, RunContext()))
+    assert llm.requests_served == 3
+
+    asyncio.run(AnalyzeStage(base_url=llm.base_url, api_key="test", cache=cache, model="gpt-4o-mini")
+                .run(jobs, RunContext()))
+    assert llm.requests_served == 6 and cache.stats()['size'] == 6
+
+
+@pytest.mark.parametrize("reply", [
+    'not json at all',
+    '[{"relevance_score": 80}]',
+    '{"match_reasons": ["Python"]}',
+    '{"relevance_score": "high"}',
+    '{"relevance_score": 101}',
+    '{"relevance_score": true}'
+])
+def test_malformed_analyses_are_never_cached(reply):
+    cache = AnalysisCache()
+    with FakeLLMServer(reply=reply) as llm:
+        ctx = RunContext()
+        asyncio.run(AnalyzeStage(base_url=llm.base_url, api_key="test", cache=cache).run(make_jobs(2), ctx))
+
+    assert ctx.analyses == {}
+    assert cache.stats()['size'] == 0
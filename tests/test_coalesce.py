@@ -0,0 +1,70 @@
+import asyncio
+
+from benchmarks.fakes import fake_analysis
+from jobalert.alerts import AlertDispatcher, SmtpMailer
+from jobalert.fetcher import ArbeitnowFetcher
+from jobalert.pipeline import (AlertStage, AnalyzeStage, DispatchAlertsStage, FilterStage, ParseStage, Pipeline,
+                               SaveResultsStage, ScrapeStage)
+
+
+def launch(ui, *searches):
+    """Run the launches concurrently on one event loop, as the worker pool does"""
+    async def main():
+        return await asyncio.gather(*(ui.trigger_multiagent_system_async(*search) for search in searches))
+
+    return asyncio.run(main())
+
+
+def use_local_pipeline(ui, board, llm, smtp):
+    ui.backend = "local"
+    ui.pipeline = Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=10),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage(),
+        FilterStage(),
+        AlertStage(),
+        SaveResultsStage(ui.results_store),
+        DispatchAlertsStage(AlertDispatcher(SmtpMailer(smtp.host, smtp.port, starttls=False)))
+    ], tracer=ui.tracer)
+
+
+def test_shared_run_mails_every_caller_at_their_own_threshold(ui, board, llm, smtp):
+    use_local_pipeline(ui, board, llm, smtp)
+    alice, bob = launch(ui, ("Python", "", 40, "alice@example.com"), ("Python", "", 70, "bob@example.com"))
+
+    # One scrape and one analysis per job for both callers
+    assert ui.flights.leaders == 1 and ui.flights.joined == 1
+    assert llm.requests_served == 10
+    scores = [fake_analysis(posting['title'])['relevance_score'] for posting in board.postings[:10]]
+    recipients = smtp.recipients()
+    # IMMEDIATE alerts (score >= 50) at or above each caller's min relevance
+    assert recipients.count("alice@example.com") == sum(score >= 50 for score in scores)
+    assert recipients.count("bob@example.com") == sum(score >= 70 for score in scores)
+    assert "alerts mailed to bob@example.com" in bob
+    assert "alice@example.com" not in bob
+
+
+def test_outcome_does_not_claim_mail_without_a_dispatcher(ui, board, llm):
+    ui.backend = "local"
+    ui.pipeline = Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=5),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage(),
+        FilterStage(),
+        AlertStage()
+    ], tracer=ui.tracer)
+    output, = launch(ui, ("Python", "", 0, "alice@example.com"))
+
+    assert "mail is off" in output
+    assert "alerts mailed" not in output
+
+
+def test_webhook_calls_are_shared_by_every_user_of_a_search(ui, webhook):
+    ui.n8n_webhook_url = webhook.webhook_url
+    alice, _, bob, other = launch(ui, ("Python", "Berlin", 40, "alice@example.com"),
+                                  ("python", "berlin", 40, " Alice@example.com"),
+                                  ("Python", "Berlin", 40, "bob@example.com"), ("Python", "Berlin", 60, "bob@example.com"))
+
+    # The workflow ignores the address, so only a different search needs a separate call
+    assert webhook.requests_served == 2
+    assert "✅ SUCCESS" in alice and "✅ SUCCESS" in bob and "✅ SUCCESS" in other
@@ -0,0 +1,68 @@
+import asyncio
+
+from jobalert.dedup import DedupIndex, minhash, signature, similarity
+from jobalert.pipeline import DedupStage, RunContext
+
+DESCRIPTION = ("We are looking for a backend engineer to build and run our Python services on AWS, "
+               "design REST APIs with FastAPI and PostgreSQL, and mentor two junior developers in a small team")
+
+
+def job(slug, title="Senior Python Developer (m/w/d)", company="Acme GmbH", location="Berlin",
+        description=DESCRIPTION):
+    return {'id': slug, 'url': f"https://jobs.example/{slug}", 'title': title, 'company': company,
+            'location': location, 'description': description}
+
+
+def test_reworded_reposts_are_near_duplicates():
+    original = job("original")
+    # Reposted by an agency under another slug, title spelled differently, one sentence changed
+    repost = job("repost", title="Sr. Python Developer", company="Talent Agency",
+                 description=DESCRIPTION.replace("mentor two junior developers", "coach two juniors"))
+    assert similarity(minhash(original['description']), minhash(repost['description'])) >= 0.6
+
+    index = DedupIndex()
+    index.add([signature(original)])
+    assert index.find(signature(repost)) == original['url']
+    # Same title, company and location is a duplicate whatever the description says
+    assert index.find(signature(job("relisted", description="Apply now"))) == original['url']
+
+
+def test_distinct_postings_are_kept_apart():
+    index = DedupIndex()
+    index.add([signature(job("python"))])
+
+    other_role = job("frontend", title="Frontend Developer (React)", company="Other Co", description=(
+        "Join our product team to craft accessible user interfaces in React and TypeScript, "
+        "work closely with designers and ship features to millions of customers every week"))
+    # The same description for a different role of the company is not the same job
+    sister_role = job("data", title="Data Engineer", location="Hamburg")
+    assert index.find(signature(other_role)) is None
+    assert index.find(signature(sister_role)) is None
+    # Nor is a posting a duplicate of itself
+    assert index.find(signature(job("python"))) is None
+
+
+def test_signatures_survive_a_restart(tmp_path):
+    path = str(tmp_path / "signatures.sqlite3")
+    index = DedupIndex(path)
+    index.add([signature(job("original"))], scope="python")
+    index.close()
+
+    reopened = DedupIndex(path)
+    assert len(reopened) == 1
+    assert reopened.find(signature(job("repost", company="Acme")), scope="python") == job("original")['url']
+    assert reopened.find(signature(job("repost", company="Acme")), scope="rust") is None
+
+
+def test_one_search_does_not_hide_postings_from_another():
+    stage = DedupStage(DedupIndex())
+    first = RunContext("Python", "Berlin", 40, "alice@example.com")
+    assert len(asyncio.run(stage.run([job("original")], first))) == 1
+    stage.commit(first)
+
+    # Another search still gets the repost; the same search, even spelled differently, does not
+    other = RunContext("Python, Django", "Berlin", 40, "bob@example.com")
+    same = RunContext("python", " berlin", 40, "bob@example.com")
+    assert len(asyncio.run(stage.run([job("repost")], other))) == 1
+    assert asyncio.run(stage.run([job("repost")], same)) == []
+    assert stage.repeats == 1
@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeJobBoardServer, make_postings
+from jobalert.fetcher import ArbeitnowFetcher, ValidatorStore
+
+
+def fetch(fetcher, keywords="", location=""):
+    async def collect():
+        return [posting async for posting in fetcher.postings(keywords, location)]
+
+    return asyncio.run(collect())
+
+
+def test_every_page_is_fetched_once(board):
+    postings = fetch(ArbeitnowFetcher(base_url=board.api_url, workers=2))
+
+    assert sorted(posting['slug'] for posting in postings) == sorted(posting['slug'] for posting in board.postings)
+    # 3 pages, plus at most one page past the end per spare worker
+    assert 3 <= board.requests_served <= 3 + 1
+
+
+def test_unchanged_pages_are_revalidated_not_downloaded(board):
+    fetcher = ArbeitnowFetcher(base_url=board.api_url, workers=1, validators=ValidatorStore())
+    first = fetch(fetcher, "Python")
+    second = fetch(fetcher, "Python")
+
+    assert second == first
+    assert board.not_modified == fetcher.pages_not_modified == fetcher.pages_fetched
+
+
+def test_a_failed_page_stops_the_other_workers():
+    async def main(board):
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in ArbeitnowFetcher(base_url=board.api_url, workers=4).postings():
+                pass
+        # Let requests already on the wire reach the board before counting
+        await asyncio.sleep(0.1)
+        claimed = board.requests_served
+        await asyncio.sleep(0.5)
+        return claimed, asyncio.all_tasks() - {asyncio.current_task()}
+
+    with FakeJobBoardServer(postings=make_postings(100), per_page=5, latency=0.2, fail_first=1) as board:
+        claimed, orphans = asyncio.run(main(board))
+
+        # Workers may finish the pages they already had, but none outlives the error
+        assert not orphans
+        assert claimed == board.requests_served < 4 * 2
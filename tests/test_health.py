@@ -0,0 +1,27 @@
+import asyncio
+
+from benchmarks.fakes import FakeJobBoardServer
+from jobalert.health import DEGRADED, DOWN, PENDING, UP, HealthMonitor, HttpProbe, render_health
+
+
+def statuses(monitor):
+    return [result.status for result in monitor.snapshot()['probes']]
+
+
+def test_probe_results_follow_the_dependency_up_and_down():
+    with FakeJobBoardServer(fail_first=1) as board:
+        monitor = HealthMonitor([HttpProbe("Job Board", board.api_url)], timeout=2,
+                                load=lambda: {"Active Runs": 0})
+        assert statuses(monitor) == [PENDING] and monitor.last_checked is None
+
+        # A 5xx answer is degraded, the next good one up again
+        asyncio.run(monitor.probe_all())
+        assert statuses(monitor) == [DEGRADED]
+        asyncio.run(monitor.probe_all())
+        assert statuses(monitor) == [UP]
+        assert "🟢 OPERATIONAL" in render_health(monitor.snapshot())
+
+    asyncio.run(monitor.probe_all())
+    assert statuses(monitor) == [DOWN]
+    assert "🔴 DEPENDENCIES DOWN" in render_health(monitor.snapshot())
+
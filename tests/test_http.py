@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from jobalert import http
+
+
+def test_run_async_closes_the_loops_client(board):
+    async def fetch():
+        await http.arequest("GET", board.api_url)
+        return http.get_async_client()
+
+    client = http.run_async(fetch())
+
+    assert client.is_closed
+    assert not any(pool.client is client for pool in http._async_pools.values())
+
+
+def test_reconfiguring_closes_clients_on_their_own_loop(board):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def fetch():
+            await http.arequest("GET", board.api_url)
+            return http.get_async_client()
+
+        client = asyncio.run_coroutine_threadsafe(fetch(), loop).result(10)
+        http.configure_http(http.get_http_config())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.1), loop).result(10)
+
+        assert client.is_closed
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        loop.close()
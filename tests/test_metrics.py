@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("prometheus_client")
+fastapi = pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from jobalert.metrics import build_registry, mount_metrics
+from jobalert.tracing import STAGE
+
+
+def test_metrics_endpoint_serves_the_apps_families(ui):
+    exporters = list(ui.tracer.exporters)
+    try:
+        client = TestClient(mount_metrics(fastapi.FastAPI(), build_registry(ui)))
+        with ui.tracer.span("Agent 1 - Scraper", STAGE, items=3):
+            pass
+        ui.trigger_outcomes[("local", "ok")] += 1
+
+        response = client.get("/metrics")
+    finally:
+        ui.tracer.exporters[:] = exporters
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith("text/plain")
+    # Newer prometheus_client versions name counter families with their _total suffix
+    families = {line.split()[2].removesuffix("_total") for line in response.text.splitlines()
+                if line.startswith("# TYPE")}
+    assert {'jobalert_trigger_requests', 'jobalert_runs_in_flight', 'jobalert_queue_depth',
+            'jobalert_coalesced_requests', 'jobalert_analysis_cache_lookups', 'jobalert_duplicate_jobs',
+            'jobalert_job_board_pages', 'jobalert_results_stored', 'jobalert_span_duration_seconds'} <= families
+    assert 'jobalert_trigger_requests_total{backend="local",outcome="ok"} 1.0' in response.text
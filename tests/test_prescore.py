@@ -0,0 +1,48 @@
+import json
+import os
+
+from jobalert.pipeline import TARGET_SKILLS
+from jobalert.prescore import DEFAULT_THRESHOLD, PreScorer, prescorer_from_env
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures",
+                       "labeled_jobs.json")
+
+RELEVANT = {'id': "python", 'title': "Python Backend Developer",
+            'description': "Build asyncio services and REST APIs in Python, automate workflows with n8n."}
+IRRELEVANT = {'id': "nurse", 'title': "Registered Nurse (Night Shift)",
+              'description': "Care for patients on our cardiology ward, administer medication and "
+                             "document vital signs."}
+
+
+def test_the_default_threshold_skips_an_unrelated_job_and_keeps_a_relevant_one():
+    prescorer = PreScorer(TARGET_SKILLS)
+    passed, skipped = prescorer.split([RELEVANT, IRRELEVANT])
+
+    assert [job['id'] for job in passed] == ["python"]
+    assert [job['id'] for job, _ in skipped] == ["nurse"]
+    assert skipped[0][1] < DEFAULT_THRESHOLD
+    assert (prescorer.jobs_scored, prescorer.llm_calls_saved) == (2, 1)
+    # The stand-in analysis is too weak for Agent 4 to approve
+    assert prescorer.analysis(skipped[0][1])['relevance_score'] < 40
+
+
+def test_no_relevant_labelled_job_is_skipped():
+    with open(FIXTURE) as fixture:
+        jobs = json.load(fixture)
+    passed, skipped = PreScorer(TARGET_SKILLS).split(jobs)
+
+    # The default threshold was tuned so every relevant job reaches the LLM...
+    assert not [job['id'] for job, _ in skipped if job['relevant']]
+    # ...while the threshold still keeps some of the unrelated ones from the LLM
+    assert skipped and len(passed) < len(jobs)
+
+
+def test_the_threshold_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv('JOBALERT_PRESCORE_THRESHOLD', "off")
+    assert prescorer_from_env(TARGET_SKILLS) is None
+
+    monkeypatch.setenv('JOBALERT_PRESCORE_THRESHOLD', "0.2")
+    assert prescorer_from_env(TARGET_SKILLS).threshold == 0.2
+
+    monkeypatch.delenv('JOBALERT_PRESCORE_THRESHOLD')
+    assert prescorer_from_env(TARGET_SKILLS).threshold == DEFAULT_THRESHOLD
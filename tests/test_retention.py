@@ -0,0 +1,34 @@
+import time
+
+from jobalert.dedup import signature
+from jobalert.pipeline import DedupStage, ScrapeStage
+
+DAY = 86400
+
+
+def job(slug, title="Backend Engineer"):
+    return {'url': f"https://example.com/jobs/{slug}", 'title': title, 'company': "Acme GmbH",
+            'location': "Berlin", 'description': "Build and run our Python services. " * 5}
+
+
+def test_old_signatures_and_seen_postings_expire(ui):
+    seen = next(stage.seen_index for stage in ui.pipeline.stages if isinstance(stage, ScrapeStage))
+    signatures = next(stage.index for stage in ui.pipeline.stages if isinstance(stage, DedupStage))
+    signatures.add([signature(job("old"))], seen_at=time.time() - 45 * DAY)
+    signatures.add([signature(job("recent", "Data Engineer"))], seen_at=time.time() - DAY)
+    seen.mark([("old", "hash"), ("recent", "hash")])
+    seen.mark([("old", "hash")], seen_at=time.time() - 45 * DAY)
+
+    removed = ui.prune_state(30 * DAY)
+
+    assert removed['job_signatures'] == 1 and removed['seen_jobs'] == 1
+    # The same role reposted after the retention period is new again
+    assert signatures.find(signature(job("repost"))) is None
+    assert signatures.find(signature(job("repost", "Data Engineer"))) is not None
+    assert seen.classify("old", "hash") == "new"
+    assert seen.classify("recent", "hash") == "unchanged"
+
+
+def test_retention_starts_with_the_app(ui):
+    assert ui.retention is not None and ui.retention.retention == 30 * DAY
+    assert 'run_queue' in ui.retention.run_once()
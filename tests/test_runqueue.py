@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+import pytest
+
+from jobalert.runqueue import DONE, FAILED, QUEUED, RUNNING, QueueFull, RunQueue, WorkerPool, follow
+
+
+def test_a_full_queue_rejects_new_requests():
+    queue = RunQueue(max_depth=3, per_user_pending=10)
+    positions = [queue.enqueue({'n': n}, user=f"user{n}")[1] for n in range(3)]
+    assert positions == [1, 2, 3]
+
+    with pytest.raises(QueueFull) as rejected:
+        queue.enqueue({'n': 3}, user="user3")
+    assert rejected.value.depth == 3 and "queue is full" in rejected.value.reason
+
+    # A claimed request no longer counts against the depth
+    queue.claim()
+    queue.enqueue({'n': 3}, user="user3")
+
+
+def test_one_user_cannot_fill_the_queue():
+    queue = RunQueue(max_depth=100, per_user_pending=2)
+    queue.enqueue({}, user="alice")
+    queue.enqueue({}, user="alice")
+
+    with pytest.raises(QueueFull) as rejected:
+        queue.enqueue({}, user="alice")
+    assert "alice" in rejected.value.reason
+    queue.enqueue({}, user="bob")
+
+
+def test_each_user_runs_one_request_at_a_time():
+    queue = RunQueue()
+    first, _ = queue.enqueue({}, user="alice")
+    second, _ = queue.enqueue({}, user="alice")
+    other, _ = queue.enqueue({}, user="bob")
+
+    assert queue.claim()['request_id'] == first
+    # Alice's second request waits until the first one finishes; Bob's goes ahead of it
+    assert queue.claim()['request_id'] == other
+    assert queue.claim() is None
+    assert queue.get(second)['state'] == QUEUED and queue.get(second)['position'] == 1
+
+    queue.finish(first, DONE, "ok", "")
+    assert queue.claim()['request_id'] == second
+
+
+def test_the_pool_never_runs_two_requests_of_one_user_together():
+    queue = RunQueue(per_user_pending=10)
+    running, overlaps, lock = {}, [], threading.Lock()
+
+    async def handler(request):
+        with lock:
+            if running.get(request['user']):
+                overlaps.append(request['request_id'])
+            running[request['user']] = True
+        await asyncio.sleep(0.05)
+        with lock:
+            running[request['user']] = False
+        yield "done\n", "ok"
+
+    ids = [queue.enqueue({}, user=user)[0] for user in ("alice", "bob") * 4]
+    pool = WorkerPool(queue, handler, workers=4, poll_interval=0.05)
+    pool.start()
+    pool.notify()
+
+    async def wait():
+        for request_id in ids:
+            async for _ in follow(queue, request_id, interval=0.02):
+                pass
+
+    asyncio.run(asyncio.wait_for(wait(), 10))
+    assert overlaps == []
+    assert all(queue.get(request_id)['state'] == DONE for request_id in ids)
+
+
+def test_follow_streams_a_request_to_its_end():
+    queue = RunQueue()
+
+    async def handler(request):
+        log = ""
+        for step in range(3):
+            log += f"step {step}\n"
+            yield log, None
+            await asyncio.sleep(0.1)
+        yield log + "finished\n", "✅ done"
+
+    request_id, _ = queue.enqueue({}, user="alice")
+    pool = WorkerPool(queue, handler, workers=1, poll_interval=0.05, log_interval=0)
+    pool.start()
+    pool.notify()
+
+    async def stream():
+        return [update async for update in follow(queue, request_id, interval=0.02)]
+
+    updates = asyncio.run(asyncio.wait_for(stream(), 10))
+    assert updates[-1]['state'] == DONE and updates[-1]['status'] == "✅ done"
+    assert updates[-1]['log'].endswith("finished\n")
+    # The log was followed while it grew, not only once at the end
+    assert any(update['state'] == RUNNING and update['log'] for update in updates)
+
+
+def test_a_failing_handler_marks_the_request_failed():
+    queue = RunQueue()
+
+    async def handler(request):
+        yield "starting\n", None
+        raise RuntimeError("boom")
+
+    request_id, _ = queue.enqueue({}, user="alice")
+    pool = WorkerPool(queue, handler, workers=1, poll_interval=0.05)
+    pool.start()
+    pool.notify()
+
+    async def stream():
+        return [update async for update in follow(queue, request_id, interval=0.02)]
+
+    final = asyncio.run(asyncio.wait_for(stream(), 10))[-1]
+    assert final['state'] == FAILED and "boom" in final['log']
@@ -0,0 +1,98 @@
+import asyncio
+
+from benchmarks.fakes import fake_analysis
+from jobalert.fetcher import ArbeitnowFetcher
+from jobalert.pipeline import AnalyzeStage, ParseStage, Pipeline, ScrapeStage
+from jobalert.scheduler import LocalSearchRunner
+from jobalert.store import ResultsStore
+from jobalert.tracing import RUN, STAGE, Tracer
+
+
+def search(search_id, skills, min_relevance, email):
+    return {'id': search_id, 'keywords': "Python", 'location': "", 'min_relevance': min_relevance,
+            'email': email, 'skills': skills}
+
+
+def test_scheduled_matches_are_filtered_and_prioritised_by_the_subscribers_ai_score(board, llm):
+    store = ResultsStore()
+    runner = LocalSearchRunner(Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=20),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage()
+    ]), results_store=store)
+    # A one-skill profile overlaps 100% with every posting mentioning Python
+    statuses = asyncio.run(runner([search(1, "Python", 60, "alice@example.com"),
+                                   search(2, "Rust", 0, "bob@example.com")]))
+
+    rows, total = store.query(limit=100)
+    # Scored against the subscriber's own skills, not the default profile
+    ai_scores = {posting['title']: fake_analysis(posting['title'], "python")['relevance_score']
+                 for posting in board.postings[:20]}
+    assert total == len({posting['url'] for posting in board.postings[:20]
+                         if ai_scores[posting['title']] >= 60})
+    assert rows
+    for row in rows:
+        assert row['Relevance_Score'] == ai_scores[row['Title']]
+        assert row['Priority'] == "HIGH"
+        # Python in the title counts fully, in the description only 75%
+        assert row['Profile_Score'] == (100 if "Python" in row['Title'] else 75)
+    # No shared skill, no candidates
+    assert statuses[2] == "✅ 0 of 20 jobs matched"
+
+
+def test_subscribers_share_one_span(board, llm):
+    tracer = Tracer()
+    runner = LocalSearchRunner(Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=10),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage()
+    ], tracer=tracer))
+    statuses = asyncio.run(runner([search(n, "Python", 0, f"user{n}@example.com") for n in range(200)]))
+
+    assert all(status.startswith("✅") for status in statuses.values())
+    fan_out, = tracer.spans(kind=STAGE, limit=1)
+    assert fan_out.name == "subscribers" and fan_out.attributes['subscribers'] == 200
+    # One run for the shared scrape and one span for the rest; nothing per subscriber
+    assert len(tracer.spans(kind=RUN)) == 1
+    assert len(tracer.spans(kind=STAGE)) == 1 + 1
+
+
+def test_subscribers_without_shared_skills_are_matched_separately(board, llm):
+    store = ResultsStore()
+    runner = LocalSearchRunner(Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1)),
+        AnalyzeStage(base_url=llm.base_url, api_key="test"),
+        ParseStage()
+    ]), results_store=store)
+    statuses = asyncio.run(runner([search(1, "React, TypeScript", 0, "alice@example.com"),
+                                   search(2, "DevOps", 0, "bob@example.com")]))
+
+    rows, _ = store.query(limit=100)
+    react = {row['URL'] for row in rows if "React" in row['Title']}
+    devops = {row['URL'] for row in rows if "DevOps" in row['Title']}
+    assert len(rows) == len(react) + len(devops)
+    assert statuses == {1: f"✅ {len(react)} of 60 jobs matched", 2: f"✅ {len(devops)} of 60 jobs matched"}
+    for row in rows:
+        skills = "react, typescript" if "React" in row['Title'] else "devops"
+        assert row['Relevance_Score'] == fake_analysis(row['Title'], skills)['relevance_score']
+    # Only the picked pairs went to the model, once per profile
+    assert llm.requests_served == len(rows)
+    # One of the two React skills appears in the title
+    assert {row['Profile_Score'] for row in rows if row['URL'] in react} == {50}
+
+
+def test_the_app_runs_scheduled_searches_locally_on_the_n8n_backend(ui, webhook):
+    ui.backend, ui.n8n_webhook_url = "n8n", webhook.webhook_url
+    served = []
+
+    async def runner(searches):
+        served.extend(searches)
+        return {search['id']: "✅ 0 of 0 jobs matched" for search in searches}
+
+    ui.search_runner = runner
+    searches = [search(1, "Python", 60, "alice@example.com"), search(2, "Rust", 0, "bob@example.com")]
+    statuses = asyncio.run(ui._run_scheduled(searches))
+
+    # The workflow cannot mail subscribers, so it is never called for them
+    assert webhook.requests_served == 0
+    assert served == searches and statuses == {1: "✅ 0 of 0 jobs matched", 2: "✅ 0 of 0 jobs matched"}
@@ -0,0 +1,41 @@
+import asyncio
+
+from jobalert.cache import AnalysisCache
+from jobalert.fetcher import ArbeitnowFetcher
+from jobalert.pipeline import AnalyzeStage, FilterStage, ParseStage, Pipeline, RunContext, ScrapeStage
+from jobalert.seen import SeenJobsIndex
+
+
+def incremental_pipeline(board, llm, max_jobs=None):
+    return Pipeline([
+        ScrapeStage(fetcher=ArbeitnowFetcher(base_url=board.api_url, workers=1), max_jobs=max_jobs,
+                    seen_index=SeenJobsIndex()),
+        AnalyzeStage(base_url=llm.base_url, api_key="test", cache=AnalysisCache()),
+        ParseStage(),
+        FilterStage()
+    ])
+
+
+def run(pipeline, min_relevance, email):
+    return asyncio.run(pipeline.run(RunContext("Engineer", "", min_relevance, email)))
+
+
+def test_seen_postings_stay_in_later_results(board, llm):
+    pipeline = incremental_pipeline(board, llm)
+    first = run(pipeline, 40, "alice@example.com")
+    analysed = llm.requests_served
+
+    # Another user, and the same user with other criteria, still get every match
+    assert [job['url'] for job in run(pipeline, 40, "bob@example.com")] == [job['url'] for job in first]
+    assert len(run(pipeline, 20, "alice@example.com")) >= len(first)
+    # ... without analysing the unchanged postings again
+    assert llm.requests_served == analysed
+
+
+def test_cap_takes_new_postings_before_unchanged_ones(board, llm):
+    pipeline = incremental_pipeline(board, llm, max_jobs=5)
+    first = {job['url'] for job in run(pipeline, 0, "alice@example.com")}
+    second = {job['url'] for job in run(pipeline, 0, "alice@example.com")}
+
+    assert len(first) == len(second) == 5
+    assert not first & second
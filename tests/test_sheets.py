@@ -0,0 +1,62 @@
+import asyncio
+
+from benchmarks.fakes import FakeSheetsServer
+from jobalert.sheets import SHEET_COLUMNS, GoogleSheetsBackend, SheetSink
+
+
+def jobs(count, start=0, score=70):
+    return [{'title': f"Python Developer {n}", 'company': f"Company {n}", 'url': f"https://jobs.example/{n}",
+             'relevance_score': score, 'match_reasons': ["Python"]} for n in range(start, start + count)]
+
+
+def sink_for(sheets, **options):
+    return SheetSink(GoogleSheetsBackend("sheet-id", base_url=sheets.api_url), **options)
+
+
+def column(sheets, name):
+    index = SHEET_COLUMNS.index(name)
+    return [row[index] for row in sheets.rows[1:]]
+
+
+def test_a_flush_is_one_call_per_kind_of_write(sheets):
+    sink = sink_for(sheets)
+    sink.add(jobs(50))
+    assert asyncio.run(sink.flush()) == 50
+
+    # URL column read once, header appended, then all rows in one append
+    assert sheets.reads == 1 and sheets.writes == 2
+    assert sheets.rows[0] == SHEET_COLUMNS
+    assert column(sheets, 'url') == [job['url'] for job in jobs(50)]
+
+    sink.add(jobs(20, start=40, score=90))
+    assert asyncio.run(sink.flush()) == 20
+
+    # Known URLs are updated in place with one batch update, new ones appended
+    assert sheets.reads == 1 and sheets.writes == 4
+    assert len(sheets.rows) == 1 + 60
+    assert column(sheets, 'relevance_score') == [70] * 40 + [90] * 20
+
+
+def test_a_failed_flush_keeps_its_rows_for_the_next_one():
+    with FakeSheetsServer(fail_first=1) as sheets:
+        sink = sink_for(sheets)
+        sink.add(jobs(5))
+        assert asyncio.run(sink.flush()) == 0
+        assert sink.last_error and sink.pending() == 5
+
+        assert asyncio.run(sink.flush()) == 5
+        assert sink.last_error is None and sink.pending() == 0
+        assert column(sheets, 'url') == [job['url'] for job in jobs(5)]
+
+
+def test_the_thread_flushes_full_batches_and_the_rest_on_stop(sheets):
+    sink = sink_for(sheets, max_rows=10, max_delay=60)
+    sink.start()
+    for start in range(0, 25, 5):
+        sink.add(jobs(5, start=start))
+    sink.stop(timeout=10)
+
+    assert sink.rows_written == 25 and sink.pending() == 0
+    # Two full batches and the remainder, not one write per job
+    assert sink.flushes <= 3
+    assert len(column(sheets, 'url')) == 25